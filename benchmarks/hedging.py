@@ -0,0 +1,115 @@
+"""Compare request tail latency with and without hedging.
+
+Sends GET requests through ElviaApiClient to an in-process session with a
+heavy-tailed latency: most answers in 20-60 ms, a few slow gateway answers of
+300-900 ms. Prints caller-side latency percentiles, the share of requests that
+were hedged and the adaptive timeout each run ended with.
+
+    python benchmarks/hedging.py --requests 400 --slow 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import random
+import sys
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# pylint: disable=wrong-import-position
+from custom_components.elvia.api import ElviaApiClient  # noqa: E402
+from custom_components.elvia.const import MAX_HOURS_PATH  # noqa: E402
+
+BODY = (ROOT / "tests" / "schemas" / "maxhours.json").read_bytes()
+
+
+class TailSession:
+    """Answers after a random, heavy-tailed delay."""
+
+    def __init__(self, slow: float, seed: int) -> None:
+        self.slow = slow
+        self.random = random.Random(seed)
+
+    async def request(self, method, url, headers=None, data=None):
+        if self.random.random() < self.slow:
+            delay = self.random.uniform(0.3, 0.9)
+        else:
+            delay = self.random.uniform(0.02, 0.06)
+        await asyncio.sleep(delay)
+        return self
+
+    status = 200
+
+    async def read(self) -> bytes:
+        return BODY
+
+
+async def run(
+    hedge: bool, requests: int, slow: float, concurrency: int
+) -> dict[str, float]:
+    """Send `requests` GETs and return latency percentiles in ms."""
+    api = ElviaApiClient("key", "mpid", "token", TailSession(slow, seed=1), hedge=hedge)
+    latencies: list[float] = []
+    queue = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in queue:
+            start = perf_counter()
+            await api.get(MAX_HOURS_PATH)
+            latencies.append((perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    ordered = sorted(latencies)
+
+    def percentile(quantile: float) -> float:
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    return {
+        "p50 ms": percentile(0.5),
+        "p95 ms": percentile(0.95),
+        "p99 ms": percentile(0.99),
+        "max ms": ordered[-1],
+        "hedged %": 100
+        * api.metrics.counters[("hedged_requests", "maxhours")]
+        / requests,
+        "hedge wins %": 100
+        * api.metrics.counters[("hedge_wins", "maxhours")]
+        / requests,
+        "timeout s": api.timeout_for("maxhours"),
+    }
+
+
+def main() -> None:
+    """Print the comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument(
+        "--slow", type=float, default=0.05, help="share of slow answers"
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    rows = {
+        hedge: asyncio.run(run(hedge, args.requests, args.slow, args.concurrency))
+        for hedge in (False, True)
+    }
+    columns = list(rows[False])
+    print(" | ".join(["hedging", *columns]))
+    for hedge, row in rows.items():
+        print(
+            " | ".join(
+                [
+                    "on" if hedge else "off",
+                    *(f"{row[column]:.1f}" for column in columns),
+                ]
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
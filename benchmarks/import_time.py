@@ -0,0 +1,107 @@
+"""Measure how long importing the Elvia integration adds to Home Assistant boot.
+
+Home Assistant's own modules are imported first, as they would be at boot, so
+only the integration and what it pulls in beyond core are measured. Each run
+is a fresh interpreter.
+
+    python benchmarks/import_time.py [--runs 5] [--budget-ms 50]
+
+Exits non-zero when the median exceeds the budget or a deferred module (see
+DEFERRED) is loaded at import.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Loaded by Home Assistant before any integration.
+BASELINE = (
+    "homeassistant.core",
+    "homeassistant.config_entries",
+    "homeassistant.helpers.config_validation",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.components.sensor",
+)
+
+INTEGRATION = ("custom_components.elvia", "custom_components.elvia.sensor")
+
+# Only needed by opt-in features; must not load with the integration.
+DEFERRED = (
+    "homeassistant.components.recorder",
+    "sqlalchemy",
+    "cProfile",
+    "tracemalloc",
+    "multiprocessing",
+    "concurrent.futures.process",
+)
+
+PROBE = """
+import importlib, json, sys, time
+for name in {baseline!r}:
+    importlib.import_module(name)
+before = set(sys.modules)
+start = time.perf_counter()
+for name in {integration!r}:
+    importlib.import_module(name)
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "modules": sorted(set(sys.modules) - before)}}))
+"""
+
+
+def measure() -> dict:
+    """Import the integration once in a fresh interpreter."""
+    probe = PROBE.format(baseline=BASELINE, integration=INTEGRATION)
+    output = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main() -> int:
+    """Run the benchmark and check it against the budget."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    results = [measure() for _ in range(args.runs)]
+    timings = sorted(result["ms"] for result in results)
+    median = statistics.median(timings)
+    modules = results[-1]["modules"]
+    external = [name for name in modules if not name.startswith("custom_components")]
+    deferred = [
+        name
+        for name in modules
+        if any(name == root or name.startswith(f"{root}.") for root in DEFERRED)
+    ]
+
+    print(
+        f"import time: median {median:.1f} ms, min {timings[0]:.1f} ms, max {timings[-1]:.1f} ms"
+    )
+    print(f"modules loaded: {len(modules)} ({len(external)} outside the integration)")
+    for name in external:
+        print(f"  {name}")
+
+    if deferred:
+        print(f"deferred modules loaded at import: {', '.join(deferred)}")
+        return 1
+    if median > args.budget_ms:
+        print(f"over budget of {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Measure the memory held by parsed tariff models per 1,000 MPID-days.
+
+Builds one day of tariffquery payload per metering point and day from
+tests/schemas/tariffquery.json, parses each from its own bytes (as separate
+refreshes would) and keeps the GridTariff models alive. Prints the traced
+memory they hold and how many distinct price and string objects are behind
+their hours.
+
+    python benchmarks/model_memory.py --mpid-days 1000 --resolution 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+from datetime import datetime, timedelta
+import gc
+import json
+from pathlib import Path
+import sys
+import tracemalloc
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# pylint: disable=wrong-import-position
+from custom_components.elvia.parsing import parse_tariffquery  # noqa: E402
+
+TEMPLATE = json.loads((ROOT / "tests" / "schemas" / "tariffquery.json").read_text())
+START = datetime(2025, 1, 1)
+
+
+def payload(day: int, slot_minutes: int) -> bytes:
+    """Return a tariffquery body for one day, with Elvia-like ids and units."""
+    body = copy.deepcopy(TEMPLATE)
+    tariff_price = body["gridTariff"]["tariffPrice"]
+    template_hour = tariff_price["hours"][0]
+    slot = timedelta(minutes=slot_minutes)
+    hours = []
+    for index in range(24 * 60 // slot_minutes):
+        start = START + timedelta(days=day) + index * slot
+        night = start.hour < 6 or start.hour >= 22
+        hour = copy.deepcopy(template_hour)
+        hour["startTime"] = start.isoformat()
+        hour["expiredAt"] = (start + slot).isoformat()
+        hour["shortName"] = "Natt" if night else "Dag"
+        hour["isPublicHoliday"] = False
+        hour["fixedPrice"] = {"id": "fixedprice_2025", "hourId": "fixedprice_2025_hour"}
+        hour["powerPrice"] = None
+        hour["energyPrice"] = {
+            "id": "energyprice_2025_night" if night else "energyprice_2025_day",
+            "total": 0.3 if night else 0.4,
+            "totalExVat": 0.24 if night else 0.32,
+        }
+        hours.append(hour)
+    tariff_price["hours"] = hours
+    for price in tariff_price["priceInfo"]["energyPrices"]:
+        price.update(currency="NOK", monetaryUnitOfMeasure="kWh")
+    for fixed_price in tariff_price["priceInfo"]["fixedPrices"]:
+        for level in fixed_price["priceLevels"]:
+            level.update(
+                currency="NOK", monetaryUnitOfMeasure="kWh", valueUnitOfMeasure="kW"
+            )
+    body["gridTariff"]["tariffType"]["resolution"] = slot_minutes
+    return json.dumps(body).encode()
+
+
+def main() -> None:
+    """Print the benchmark table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mpid-days", type=int, default=1000)
+    parser.add_argument("--resolution", type=int, default=60, help="slot minutes")
+    args = parser.parse_args()
+
+    # Each MPID-day is its own response; a day's payload repeats across meters.
+    bodies = [payload(index % 365, args.resolution) for index in range(args.mpid_days)]
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tariffs = [parse_tariffquery(body) for body in bodies]
+    gc.collect()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    hours = [hour for tariff in tariffs for hour in tariff.tariffPrice.hours]
+    per_thousand = (after - before) / args.mpid_days * 1000
+    rows = {
+        "MPID-days": args.mpid_days,
+        "hours": len(hours),
+        "KiB per 1000 MPID-days": round(per_thousand / 1024),
+        "peak KiB": round((peak - before) / 1024),
+        "EnergyPriceHour objects": len({id(hour.energyPrice) for hour in hours}),
+        "FixedPriceHour objects": len({id(hour.fixedPrice) for hour in hours}),
+        "shortName strings": len({id(hour.shortName) for hour in hours}),
+    }
+    for name, value in rows.items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Estimate recorder bytes written per day for Elvia sensor attributes.
+
+Simulates one day of state writes for the daily tariff sensor (with today's
+prices as an attribute) and the current-month average sensor (with 24 months
+of history), at hourly and 15-minute resolution. It uses the recorder's own
+encoding and exclusion rules, and its deduplication: a state_changed event is
+only recorded when the state or attributes change, and an attribute blob is
+only stored once.
+
+The states rows themselves are the same for both layouts and are not counted.
+
+Two layouts are compared:
+- legacy: prices as a list of {"startTime", "endTime", "total"} dicts, recorded
+- current: prices as parallel arrays, and both large attributes unrecorded
+
+    python benchmarks/recorder_bytes.py
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# pylint: disable=wrong-import-position
+from homeassistant.components.recorder.db_schema import StateAttributes  # noqa: E402
+from homeassistant.const import EVENT_STATE_CHANGED  # noqa: E402
+from homeassistant.core import Event, State  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from custom_components.elvia.sensor import ElviaBaseSensor  # noqa: E402
+from custom_components.elvia.timeline import TariffSlot, TariffTimeline  # noqa: E402
+
+START = datetime(2025, 3, 4, tzinfo=dt_util.UTC)
+HISTORY = [
+    {"month": f"2023-{month:02d}", "average": 4.2 + month / 10}
+    for month in range(1, 13)
+] * 2
+
+
+def day_timeline(slot_minutes: int) -> TariffTimeline:
+    """Return a day of night/day prices."""
+    slot = timedelta(minutes=slot_minutes)
+    slots = []
+    for index in range(24 * 60 // slot_minutes):
+        start = START + index * slot
+        night = start.hour < 6 or start.hour >= 22
+        slots.append(
+            TariffSlot(
+                start,
+                start + slot,
+                0.3 if night else 0.4,
+                None,
+                None,
+                None,
+                "Dag",
+                False,
+            )
+        )
+    return TariffTimeline(slots)
+
+
+def recorded_bytes(
+    writes: list[tuple[str, dict]], unrecorded: frozenset[str]
+) -> tuple[int, int]:
+    """Return (events recorded, attribute bytes stored) for a sequence of writes."""
+    events = 0
+    stored: set[bytes] = set()
+    total = 0
+    previous = None
+    for state, attributes in writes:
+        if (state, attributes) == previous:
+            continue
+        previous = (state, attributes)
+        events += 1
+        new_state = State(
+            "sensor.elvia",
+            state,
+            attributes,
+            state_info={"unrecorded_attributes": unrecorded},
+        )
+        blob = StateAttributes.shared_attrs_bytes_from_event(
+            Event(EVENT_STATE_CHANGED, {"new_state": new_state}), None
+        )
+        if blob not in stored:
+            stored.add(blob)
+            total += len(blob)
+    return events, total
+
+
+def main() -> None:
+    """Print the comparison."""
+    current_unrecorded = (
+        ElviaBaseSensor._unrecorded_attributes
+    )  # pylint: disable=protected-access
+    print(
+        "resolution | sensor | layout | attribute size B | events/day | attribute bytes/day"
+    )
+    for slot_minutes in (60, 15):
+        timeline = day_timeline(slot_minutes)
+        layouts = {
+            "legacy": (timeline.as_price_list(), frozenset()),
+            "current": (timeline.as_compact(), current_unrecorded),
+        }
+        for layout, (prices, unrecorded) in layouts.items():
+            tariff_writes = [
+                (str(slot.energy_price), {"Prices": prices}) for slot in timeline.slots
+            ]
+            history_writes = [("5.1", {"History": HISTORY})] * len(timeline.slots)
+            for sensor, writes in (
+                ("daily_tariff", tariff_writes),
+                ("avg_max", history_writes),
+            ):
+                size = len(
+                    StateAttributes.shared_attrs_bytes_from_event(
+                        Event(
+                            EVENT_STATE_CHANGED,
+                            {"new_state": State("sensor.elvia", "0", writes[0][1])},
+                        ),
+                        None,
+                    )
+                )
+                events, written = recorded_bytes(writes, unrecorded)
+                print(
+                    f"{slot_minutes} min | {sensor} | {layout} | {size} | {events} | {written}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Replay a recorded API session through ElviaApiClient, offline.
+
+Record one with the "Record API traffic" option; the file is written to
+.storage/elvia/traffic/<entry id>.jsonl. Each exchange is sent again through the
+client and answered from the recording with its recorded latency, so parse
+and decode costs are measured on real payloads.
+
+    python benchmarks/replay.py traffic.jsonl --parse-mode thread --speed 0
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# pylint: disable=wrong-import-position
+from custom_components.elvia.api import ElviaApiClient, endpoint_name  # noqa: E402
+from custom_components.elvia.const import PARSE_MODES  # noqa: E402
+from custom_components.elvia.parsing import (  # noqa: E402
+    ParseRunner,
+    parse_maxhours,
+    parse_meteringpoint,
+    parse_tariffquery,
+    parse_tarifftypes,
+    shutdown_process_pool,
+)
+from custom_components.elvia.recording import (
+    ReplaySession,
+    load_recording,
+)  # noqa: E402
+
+PARSERS = {
+    "tarifftype": parse_tarifftypes,
+    "tariffquery": parse_tariffquery,
+    "meteringpointsgridtariffs": parse_meteringpoint,
+    "maxhours": parse_maxhours,
+}
+
+
+async def replay(
+    path: str, parse_mode: str, speed: float, pace: bool
+) -> ElviaApiClient:
+    """Send every recorded request once, in order. Returns the client with its metrics."""
+    exchanges = load_recording(path)
+    api = ElviaApiClient(
+        api_key="replay",
+        metering_point_id=None,
+        token="replay",
+        session=ReplaySession(exchanges, speed=speed),
+        parser=ParseRunner(parse_mode),
+    )
+
+    started = perf_counter()
+    for exchange in exchanges:
+        if pace:
+            # Keep the recorded spacing between requests.
+            delay = exchange["offset_ms"] / 1000 * speed - (perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        parse = PARSERS.get(endpoint_name(exchange["url"]))
+        try:
+            if exchange["method"] == "POST":
+                await api.post(exchange["url"], exchange["request"], parse=parse)
+            else:
+                await api.get(exchange["url"], parse=parse)
+        except Exception as error:  # pylint: disable=broad-except
+            print(f"{exchange['method']} {endpoint_name(exchange['url'])}: {error}")
+    return api
+
+
+def main() -> None:
+    """Print per-endpoint metrics for a replayed recording."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("recording")
+    parser.add_argument("--parse-mode", choices=PARSE_MODES, default=PARSE_MODES[0])
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="latency factor, 0 for none"
+    )
+    parser.add_argument(
+        "--pace", action="store_true", help="keep the recorded request spacing"
+    )
+    args = parser.parse_args()
+
+    api = asyncio.run(replay(args.recording, args.parse_mode, args.speed, args.pace))
+    shutdown_process_pool()
+
+    header = (
+        "endpoint",
+        "requests",
+        "p50 KiB",
+        "latency p50 ms",
+        "parse p50 ms",
+        "parse max ms",
+    )
+    print(" | ".join(header))
+    for endpoint in sorted({label for _, label in api.metrics.counters}):
+        size = api.metrics.histogram("response_bytes", endpoint)
+        latency = api.metrics.histogram("request_latency_ms", endpoint)
+        parse = api.metrics.histogram("parse_ms", endpoint)
+        print(
+            " | ".join(
+                str(value)
+                for value in (
+                    endpoint,
+                    api.metrics.counters[("requests", endpoint)],
+                    round(size.percentile(0.5) / 1024, 1) if size else "-",
+                    round(latency.percentile(0.5), 1) if latency else "-",
+                    round(parse.percentile(0.5), 2) if parse else "-",
+                    round(parse.maximum, 2) if parse else "-",
+                )
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""Simulate weeks of coordinator operation on a virtual clock.
+
+Drives N coordinators against an in-process fake Elvia API, ticking a
+VirtualClock through the simulated period. Tariff days follow the local time
+zone (Europe/Oslo), so 23- and 25-hour days at DST switches are included.
+Reports API calls, events, CPU time and growth in live objects after the
+first day, per half of the period, to catch leaks and refresh regressions.
+`--trace-memory` adds allocated bytes from tracemalloc, at several times the
+run time.
+
+    python benchmarks/simulate.py --meters 100 --days 30 --tick 5
+
+100 meters over 30 days at 5-minute ticks take about 20 s.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+from datetime import date, datetime, timedelta
+import gc
+import json
+from pathlib import Path
+import sys
+import tempfile
+from time import perf_counter, process_time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# pylint: disable=wrong-import-position
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from custom_components.elvia.clock import VirtualClock  # noqa: E402
+from custom_components.elvia.coordinator import ElviaDataUpdateCoordinator  # noqa: E402
+from custom_components.elvia.metrics import ElviaMetrics  # noqa: E402
+from custom_components.elvia.parsing import (  # noqa: E402
+    parse_maxhours,
+    parse_meteringpoint,
+    parse_tarifftypes,
+)
+
+SCHEMAS = ROOT / "tests" / "schemas"
+TIME_ZONE = "Europe/Oslo"
+# Spans the spring DST switch (2025-03-30)
+DEFAULT_START = date(2025, 3, 15)
+
+STORE_MODULES = ("catalog", "coordinator", "history", "synthesis")
+
+
+def _schema(name: str) -> dict[str, Any]:
+    return json.loads((SCHEMAS / name).read_text())
+
+
+class MemoryStore:
+    """In-memory stand-in for homeassistant.helpers.storage.Store."""
+
+    def __init__(
+        self, hass: Any, version: int, key: str, *args: Any, **kwargs: Any
+    ) -> None:
+        self.key = key
+        self.data: Any = None
+
+    async def async_load(self) -> Any:
+        return self.data
+
+    async def async_save(self, data: Any) -> None:
+        self.data = data
+
+    def async_delay_save(self, data_func: Any, delay: float = 0) -> None:
+        self.data = data_func()
+
+
+class FakeHass:
+    """The parts of HomeAssistant the coordinator uses."""
+
+    def __init__(self, storage: str) -> None:
+        self.data: dict[str, Any] = {}
+        self.events: dict[str, int] = {}
+        self.loop = asyncio.get_running_loop()
+        self.config = SimpleNamespace(path=lambda *parts: str(Path(storage, *parts)))
+        self.bus = SimpleNamespace(
+            async_fire=self._fire, async_listen_once=lambda *args: lambda: None
+        )
+
+    def _fire(self, event_type: str, data: Any = None) -> None:
+        self.events[event_type] = self.events.get(event_type, 0) + 1
+
+    async def async_add_executor_job(self, target: Any, *args: Any) -> Any:
+        return target(*args)
+
+
+class FakeElviaApi:
+    """Serves tariffs for the virtual clock's current day, counting calls.
+
+    Responses are built as JSON and parsed like real ones.
+    """
+
+    METERINGPOINT = _schema("meteringpointsgridtariffs.json")
+    MAXHOURS = _schema("maxhours.json")
+    TARIFFTYPES = _schema("tarifftype.json")
+
+    def __init__(self, index: int, clock: VirtualClock, resolution: int) -> None:
+        self._metering_point_id = f"7070575000{index:08d}"
+        self.index = index
+        self.clock = clock
+        self.resolution = resolution
+        self.metrics = ElviaMetrics()
+        self.calls: dict[str, int] = {}
+
+    def _count(self, endpoint: str) -> None:
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+
+    def tariff_type(self) -> dict[str, Any]:
+        tariff_type = copy.deepcopy(self.TARIFFTYPES["tariffTypes"][0])
+        tariff_type.update(
+            tariffKey="standard",
+            title="Nettleie",
+            companyName="Elvia AS",
+            lastUpdated="2024-01-01T00:00:00+01:00",
+            resolution=self.resolution,
+        )
+        return tariff_type
+
+    async def tarifftypes(self) -> list[Any]:
+        self._count("tarifftypes")
+        return parse_tarifftypes(
+            json.dumps({"tariffTypes": [self.tariff_type()]}).encode()
+        )
+
+    async def meteringpoint(self) -> Any:
+        self._count("meteringpoint")
+        body = copy.deepcopy(self.METERINGPOINT)
+        collection = body["gridTariffCollections"][0]
+        grid_tariff = collection["gridTariff"]
+        grid_tariff["tariffType"] = self.tariff_type()
+
+        template = grid_tariff["tariffPrice"]["hours"][0]
+        today = self.clock.now().date()
+        start = dt_util.start_of_local_day(today)
+        end = dt_util.start_of_local_day(today + timedelta(days=1))
+        slot = timedelta(minutes=self.resolution)
+        hours = []
+        while start < end:
+            local = dt_util.as_local(start)
+            night = local.hour < 6 or local.hour >= 22 or local.weekday() >= 5
+            hour = copy.deepcopy(template)
+            hour.update(
+                startTime=local.isoformat(),
+                expiredAt=dt_util.as_local(start + slot).isoformat(),
+                shortName="Natt/helg" if night else "Dag",
+                isPublicHoliday=False,
+            )
+            hour["fixedPrice"]["id"] = "fixed"
+            hour["energyPrice"].update(
+                id="night" if night else "day", total=0.31 if night else 0.43
+            )
+            hours.append(hour)
+            start += slot
+        grid_tariff["tariffPrice"]["hours"] = hours
+
+        price_info = grid_tariff["tariffPrice"]["priceInfo"]
+        energy_template = price_info["energyPrices"][0]
+        price_info["energyPrices"] = [
+            {
+                **energy_template,
+                "id": price_id,
+                "startDate": f"{today.year}-01-01",
+                "endDate": f"{today.year}-12-31",
+                "total": total,
+            }
+            for price_id, total in (("day", 0.43), ("night", 0.31))
+        ]
+        fixed = price_info["fixedPrices"][0]
+        level_template = fixed["priceLevels"][0]
+        fixed.update(
+            id="fixed", startDate=f"{today.year}-01-01", endDate=f"{today.year}-12-31"
+        )
+        fixed["priceLevels"] = [
+            {
+                **copy.deepcopy(level_template),
+                "id": f"level-{number}",
+                "valueMin": low,
+                "valueMax": high,
+                "monthlyTotal": monthly,
+                "levelInfo": f"{low}-{high} kWh",
+                "hourPrices": [
+                    {**level_template["hourPrices"][0], "total": monthly / 720}
+                ],
+            }
+            for number, (low, high, monthly) in enumerate(
+                ((0, 2, 130), (2, 5, 190), (5, 10, 280), (10, 15, 415))
+            )
+        ]
+        levels = collection["meteringPointsAndPriceLevels"][0]
+        levels["currentFixedPriceLevel"]["levelId"] = "level-2"
+        levels["meteringPoints"][0]["meteringPointId"] = self._metering_point_id
+        return parse_meteringpoint(json.dumps(body).encode())
+
+    async def maxhours(self) -> Any:
+        self._count("maxhours")
+        body = copy.deepcopy(self.MAXHOURS)
+        meteringpoint = body["meteringpoints"][0]
+        template = meteringpoint["maxHoursAggregate"][0]
+        now = self.clock.now()
+        first = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        previous = (first - timedelta(days=1)).replace(day=1)
+
+        def aggregate(
+            month_start: datetime, days: int, months_back: int
+        ) -> dict[str, Any]:
+            values = [3.0 + (self.index + day) % 5 for day in range(1, days + 1)]
+            top = sorted(range(days), key=lambda day: values[day], reverse=True)[:3]
+            max_hours = []
+            for day in sorted(top):
+                start = dt_util.as_local(month_start + timedelta(days=day, hours=18))
+                max_hours.append(
+                    {
+                        **template["maxHours"][0],
+                        "startTime": start.isoformat(),
+                        "endTime": (start + timedelta(hours=1)).isoformat(),
+                        "value": values[day],
+                        "noOfMonthsBack": months_back,
+                    }
+                )
+            average = (
+                sum(hour["value"] for hour in max_hours) / len(max_hours)
+                if max_hours
+                else 0.0
+            )
+            return {
+                **template,
+                "averageValue": average,
+                "maxHours": max_hours,
+                "noOfMonthsBack": months_back,
+            }
+
+        meteringpoint.update(
+            meteringPointId=self._metering_point_id,
+            maxHoursCalculatedTime=now.replace(
+                minute=0, second=0, microsecond=0
+            ).isoformat(),
+            maxHoursAggregate=[
+                aggregate(first, now.day - 1, 0),
+                aggregate(previous, 28, 1),
+            ],
+        )
+        return parse_maxhours(json.dumps(body).encode())
+
+
+async def async_simulate(
+    meters: int = 10,
+    days: int = 30,
+    start: date = DEFAULT_START,
+    tick: timedelta = timedelta(minutes=1),
+    resolution: int = 60,
+    trace_memory: bool = False,
+) -> dict[str, Any]:
+    """Run the simulation and return the report."""
+
+    time_zone = dt_util.DEFAULT_TIME_ZONE
+    dt_util.set_default_time_zone(dt_util.get_time_zone(TIME_ZONE))
+    try:
+        with tempfile.TemporaryDirectory() as storage, _memory_stores():
+            return await _async_run(
+                storage, meters, days, start, tick, resolution, trace_memory
+            )
+    finally:
+        dt_util.set_default_time_zone(time_zone)
+
+
+class _memory_stores:
+    """Patch the integration's Store with MemoryStore."""
+
+    def __enter__(self) -> None:
+        self._patches = [
+            patch(f"custom_components.elvia.{module}.Store", MemoryStore)
+            for module in STORE_MODULES
+        ]
+        for patcher in self._patches:
+            patcher.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        for patcher in self._patches:
+            patcher.stop()
+
+
+async def _async_run(
+    storage: str,
+    meters: int,
+    days: int,
+    start: date,
+    tick: timedelta,
+    resolution: int,
+    trace_memory: bool,
+) -> dict[str, Any]:
+    hass = FakeHass(storage)
+    clock = VirtualClock(dt_util.start_of_local_day(start))
+    apis = [FakeElviaApi(index, clock, resolution) for index in range(meters)]
+    coordinators = []
+    for api in apis:
+        tariff_type = parse_tarifftypes(
+            json.dumps({"tariffTypes": [api.tariff_type()]}).encode()
+        )[0]
+        coordinators.append(
+            ElviaDataUpdateCoordinator(
+                hass=hass, api=api, tariffType=tariff_type, clock=clock
+            )
+        )
+
+    errors = 0
+
+    async def refresh_all() -> None:
+        nonlocal errors
+        for coordinator in coordinators:
+            try:
+                coordinator.data = await coordinator._async_update_data()
+            except Exception:  # pylint: disable=broad-except
+                errors += 1
+
+    def measure() -> tuple[int, int]:
+        traced = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+        return len(gc.get_objects()), traced
+
+    if trace_memory:
+        tracemalloc.start()
+    wall, cpu = perf_counter(), process_time()
+    ticks = 0
+    end = clock.now() + timedelta(days=days)
+    # After the first day (warm-up), at the midpoint and at the end
+    checkpoints = [
+        clock.now() + timedelta(days=1),
+        clock.now() + timedelta(days=max(1, days // 2)),
+    ]
+    memory: list[tuple[int, int]] = []
+
+    await refresh_all()
+    while clock.now() < end:
+        clock.advance(tick)
+        ticks += 1
+        await refresh_all()
+        while (
+            len(memory) < len(checkpoints) and clock.now() >= checkpoints[len(memory)]
+        ):
+            memory.append(measure())
+
+    cpu, wall = process_time() - cpu, perf_counter() - wall
+    memory.extend([measure()] * (3 - len(memory)))
+    if trace_memory:
+        tracemalloc.stop()
+
+    for coordinator in coordinators:
+        await coordinator.local_store.async_close()
+
+    calls: dict[str, int] = {}
+    for api in apis:
+        for endpoint, number in api.calls.items():
+            calls[endpoint] = calls.get(endpoint, 0) + number
+
+    report = {
+        "meters": meters,
+        "days": days,
+        "ticks": ticks,
+        "errors": errors,
+        "api_calls": calls,
+        "api_calls_per_meter_day": round(sum(calls.values()) / meters / days, 2),
+        "events": dict(hass.events),
+        "pending_timers": clock.pending_timers,
+        "cpu_s": round(cpu, 3),
+        "wall_s": round(wall, 3),
+        "objects_after_first_day": memory[0][0],
+        # Bounded caches fill in the first half; a leak keeps growing in the second.
+        "objects_growth_first_half": memory[1][0] - memory[0][0],
+        "objects_growth_second_half": memory[2][0] - memory[1][0],
+    }
+    if trace_memory:
+        report.update(
+            memory_after_first_day_kib=round(memory[0][1] / 1024, 1),
+            memory_growth_first_half_kib=round((memory[1][1] - memory[0][1]) / 1024, 1),
+            memory_growth_second_half_kib=round(
+                (memory[2][1] - memory[1][1]) / 1024, 1
+            ),
+        )
+    return report
+
+
+def main() -> None:
+    """Run from the command line and print the report."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--meters", type=int, default=10)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--start", type=date.fromisoformat, default=DEFAULT_START)
+    parser.add_argument(
+        "--tick", type=int, default=1, help="minutes between coordinator ticks"
+    )
+    parser.add_argument("--resolution", type=int, default=60, choices=(15, 60))
+    parser.add_argument("--trace-memory", action="store_true")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        async_simulate(
+            meters=args.meters,
+            days=args.days,
+            start=args.start,
+            tick=timedelta(minutes=args.tick),
+            resolution=args.resolution,
+            trace_memory=args.trace_memory,
+        )
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Compare refresh and lookup costs of hourly and 15-minute tariffs.
+
+Builds synthetic tariffquery payloads from tests/schemas/tariffquery.json and
+times, per resolution:
+
+- parse + index: one day's payload to a TariffTimeline (the daily refresh)
+- lookup: slot_at and next_change on a day and on a year of slots (every tick)
+- store range: one day out of a year of slots in the columnar store
+
+    python benchmarks/timeline.py
+"""
+
+from __future__ import annotations
+
+import copy
+from datetime import datetime, timedelta
+import json
+from pathlib import Path
+import sys
+import tempfile
+from timeit import Timer
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# pylint: disable=wrong-import-position
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from custom_components.elvia.columnar import ColumnarStore  # noqa: E402
+from custom_components.elvia.parsing import parse_tariffquery  # noqa: E402
+from custom_components.elvia.timeline import TariffTimeline  # noqa: E402
+
+TEMPLATE = json.loads((ROOT / "tests" / "schemas" / "tariffquery.json").read_text())
+START = datetime(2025, 1, 1, tzinfo=dt_util.UTC)
+
+
+def payload(days: int, slot_minutes: int) -> bytes:
+    """Return a tariffquery body with `days` of slots."""
+    body = copy.deepcopy(TEMPLATE)
+    template_hour = body["gridTariff"]["tariffPrice"]["hours"][0]
+    slot = timedelta(minutes=slot_minutes)
+    hours = []
+    for index in range(days * 24 * 60 // slot_minutes):
+        start = START + index * slot
+        hour = copy.deepcopy(template_hour)
+        night = start.hour < 6 or start.hour >= 22
+        hour["startTime"] = start.isoformat()
+        hour["expiredAt"] = (start + slot).isoformat()
+        hour["shortName"] = "Natt" if night else "Dag"
+        hour["energyPrice"]["total"] = 0.3 if night else 0.4
+        hours.append(hour)
+    body["gridTariff"]["tariffPrice"]["hours"] = hours
+    body["gridTariff"]["tariffType"]["resolution"] = slot_minutes
+    return json.dumps(body).encode()
+
+
+def best_us(statement, number: int) -> float:
+    """Return the best per-call time in microseconds over a few repeats."""
+    return min(Timer(statement).repeat(repeat=5, number=number)) / number * 1e6
+
+
+def main() -> None:
+    """Print the benchmark table."""
+    rows = []
+    for slot_minutes in (60, 15):
+        day_body = payload(1, slot_minutes)
+        build = best_us(
+            lambda body=day_body: TariffTimeline.from_grid_tariff(
+                parse_tariffquery(body)
+            ),
+            20,
+        )
+
+        year = TariffTimeline.from_grid_tariff(
+            parse_tariffquery(payload(365, slot_minutes))
+        )
+        day = TariffTimeline(year.slots[: 24 * 60 // slot_minutes])
+        noon = START + timedelta(hours=12, minutes=7)
+        late = START + timedelta(days=300, hours=12, minutes=7)
+        lookup_day = best_us(lambda: day.slot_at(noon), 10000)
+        lookup_year = best_us(lambda: year.slot_at(late), 10000)
+        change_year = best_us(lambda: year.next_change(late), 10000)
+
+        with tempfile.TemporaryDirectory() as path:
+            store = ColumnarStore(path)
+            store.write(
+                [int(slot.start.timestamp()) for slot in year.slots],
+                [slot.energy_price for slot in year.slots],
+            )
+            first = int(late.timestamp())
+            store_range = best_us(lambda: store.range(first, first + 86400), 1000)
+            store.close()
+
+        rows.append(
+            (
+                f"{slot_minutes} min",
+                len(day),
+                len(year),
+                len(day_body) / 1024,
+                build,
+                lookup_day,
+                lookup_year,
+                change_year,
+                store_range,
+            )
+        )
+
+    header = (
+        "resolution",
+        "slots/day",
+        "slots/year",
+        "payload KiB",
+        "parse+index us",
+        "slot_at day us",
+        "slot_at year us",
+        "next_change us",
+        "store day us",
+    )
+    print(" | ".join(header))
+    for row in rows:
+        print(
+            " | ".join(
+                f"{value:.1f}" if isinstance(value, float) else str(value)
+                for value in row
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
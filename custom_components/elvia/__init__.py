@@ -2,43 +2,154 @@
 
 from __future__ import annotations
 
+import asyncio
+from time import perf_counter
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.const import CONF_API_KEY
+from homeassistant.const import CONF_API_KEY, EVENT_HOMEASSISTANT_STOP
+from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-from .api import ElviaApiClient
-from .const import CONF_METERING_POINT_ID, CONF_TOKEN, DOMAIN, LOGGER, PLATFORMS
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .api import ApiClientException, ElviaApiClient
+from .catalog import async_get_catalog
+from .const import (
+    CONF_HEDGE_REQUESTS,
+    CONF_METERING_POINT_ID,
+    CONF_PARSE_MODE,
+    CONF_RECORD_TRAFFIC,
+    CONF_SETUP_MODE,
+    CONF_TARIFF_KEY,
+    CONF_TOKEN,
+    DATA_METRICS_VIEW,
+    DATA_SETUP_SEMAPHORE,
+    DOMAIN,
+    LOGGER,
+    PARSE_MODE_INLINE,
+    PARSE_MODE_PROCESS,
+    PLATFORMS,
+    SETUP_CONCURRENCY,
+    SETUP_MODE_BACKGROUND,
+    SETUP_MODE_BLOCKING,
+)
 from .coordinator import ElviaDataUpdateCoordinator
+from .parsing import ParseRunner, shutdown_process_pool
+from .recording import Redactor, TrafficRecorder
+from .request_queue import async_get_request_queue
+from .services import async_setup_services, async_unload_services
+from .views import ElviaMetricsView
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Elvia from a config entry."""
 
+    setup_started = perf_counter()
     hass.data.setdefault(DOMAIN, {})
 
+    parse_mode = entry.options.get(CONF_PARSE_MODE, PARSE_MODE_INLINE)
+    if parse_mode == PARSE_MODE_PROCESS:
+        entry.async_on_unload(
+            hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, lambda _: shutdown_process_pool()
+            )
+        )
+
+    recorder = None
+    if entry.options.get(CONF_RECORD_TRAFFIC):
+        recorder = TrafficRecorder(
+            hass.config.path(STORAGE_DIR, DOMAIN, "traffic", f"{entry.entry_id}.jsonl"),
+            Redactor(
+                [entry.data[CONF_API_KEY], entry.data[CONF_TOKEN]],
+                entry.data[CONF_METERING_POINT_ID],
+            ),
+        )
+
     api = ElviaApiClient(
         api_key=entry.data[CONF_API_KEY],
         metering_point_id=entry.data[CONF_METERING_POINT_ID],
         token=entry.data[CONF_TOKEN],
         session=async_get_clientsession(hass),
+        parser=ParseRunner(parse_mode),
+        recorder=recorder,
+        hedge=entry.options.get(CONF_HEDGE_REQUESTS, False),
+        queue=async_get_request_queue(hass, entry.data[CONF_API_KEY]),
     )
 
-    data = await api.meteringpoint()
-
+    # Tariff metadata comes from the shared catalog; only entries created before
+    # the tariff key was stored need a meteringpoint round trip.
+    catalog = async_get_catalog(hass)
+    tariff_type = None
+    try:
+        if tariff_key := entry.data.get(CONF_TARIFF_KEY):
+            await catalog.async_load()
+            tariff_type = catalog.get(tariff_key) or await catalog.async_get(
+                api, tariff_key
+            )
+
+        if tariff_type is None:
+            data = await api.meteringpoint()
+    except ApiClientException as error:
+        # Home Assistant retries the setup later.
+        raise ConfigEntryNotReady(f"Could not reach Elvia: {error}") from error
+
+    if tariff_type is None:
+        if data is None:
+            raise ConfigEntryNotReady("Elvia returned no tariff for the metering point")
+        tariff_type = data.gridTariff.tariffType
+        catalog.add(tariff_type)
+        hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_TARIFF_KEY: tariff_type.tariffKey}
+        )
 
     coordinator = ElviaDataUpdateCoordinator(
         hass=hass,
         api=api,
-        tariffType=data.gridTariff.tariffType,
+        tariffType=tariff_type,
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    restored = await coordinator.async_restore()
+
+    setup_mode = entry.options.get(CONF_SETUP_MODE, SETUP_MODE_BACKGROUND)
+    if setup_mode == SETUP_MODE_BLOCKING:
+        await coordinator.async_config_entry_first_refresh()
+    else:
+        # The first refresh runs after setup returns so Home Assistant startup does
+        # not wait on the API. Until then, sensors show the saved timeline or their
+        # restored state.
+        coordinator.last_update_success = restored
+        semaphore = hass.data.setdefault(
+            DATA_SETUP_SEMAPHORE, asyncio.Semaphore(SETUP_CONCURRENCY)
+        )
+        entry.async_create_background_task(
+            hass,
+            coordinator.async_initial_refresh(semaphore),
+            f"{DOMAIN} initial refresh {entry.entry_id}",
+        )
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
+    if hass.http is not None and DATA_METRICS_VIEW not in hass.data:
+        hass.data[DATA_METRICS_VIEW] = True
+        hass.http.register_view(ElviaMetricsView(hass))
+
+    async_setup_services(hass)
+
+    # Pick up a backfill that was interrupted by a restart.
+    entry.async_create_background_task(
+        hass,
+        coordinator.backfill.async_resume(coordinator.tariffType.tariffKey),
+        f"{DOMAIN} backfill {entry.entry_id}",
+    )
+
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
+    coordinator.metrics.observe(
+        "setup_ms", setup_mode, (perf_counter() - setup_started) * 1000
+    )
+
     return True
 
 
@@ -48,7 +159,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.local_store.async_close()
+        async_unload_services(hass)
 
     return unload_ok
 
@@ -56,5 +169,5 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
 
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    # Through the config entries manager, so async_on_unload callbacks run.
+    await hass.config_entries.async_reload(entry.entry_id)
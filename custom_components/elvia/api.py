@@ -1,16 +1,25 @@
 """Elvia library."""
 
 from http import HTTPStatus
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 import asyncio
 import async_timeout
 import aiohttp
+import json
 import socket
+from time import perf_counter
 
-from datetime import timedelta, date
+from datetime import datetime
+from urllib.parse import urlencode
 
 from .const import (
+    ADAPTIVE_MIN_SAMPLES,
+    HEDGE_MIN_DELAY,
+    REQUEST_TIMEOUT,
+    REQUEST_TIMEOUT_MIN,
+    REQUEST_TIMEOUT_P99_FACTOR,
+    DATE_FORMAT,
     LOGGER,
     PING_PATH,
     SECURE_PATH,
@@ -20,17 +29,33 @@ from .const import (
     API_HEADERS,
     MAX_HOURS_PATH,
 )
+from .metrics import ElviaMetrics
 from .models import (
     TariffType,
     GridTariff,
     GridTariffCollection,
+    MaxHours,
 )
+from .parsing import (
+    ParseRunner,
+    parse_maxhours,
+    parse_meteringpoint,
+    parse_tariffquery,
+    parse_tarifftypes,
+)
+from .recording import TrafficRecorder
+from .request_queue import PRIORITY_NAMES, RequestQueue, current_priority
 
 
 class ApiClientException(Exception):
     """Api Client Exception."""
 
 
+def endpoint_name(url: str) -> str:
+    """Return a short metrics label for a url, e.g. `maxhours`."""
+    return url.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1].lower()
+
+
 class ElviaApiClient:
     """Main class for handling connection with."""
 
@@ -40,89 +65,225 @@ class ElviaApiClient:
         metering_point_id: str,
         token: str,
         session: Optional[aiohttp.client.ClientSession] = None,
+        metrics: Optional[ElviaMetrics] = None,
+        parser: Optional[ParseRunner] = None,
+        recorder: Optional[TrafficRecorder] = None,
+        hedge: bool = False,
+        queue: Optional[RequestQueue] = None,
     ) -> None:
-        """Initialize connection with Elvia."""
+        """Initialize connection with Elvia.
+
+        `session` can be a recording.ReplaySession to answer from recorded traffic.
+        Clients using the same API key should share one `queue`.
+        """
 
         self._session = session
+        self.metrics = metrics or ElviaMetrics()
+        self.parser = parser or ParseRunner()
+        self.recorder = recorder
+        self.hedge = hedge
+        self.queue = queue or RequestQueue()
         self._api_key = api_key
         self._metering_point_id = metering_point_id
         self._token = token
 
-    async def get(self, url: str, headers: dict | None = None) -> Any:
+    async def get(
+        self,
+        url: str,
+        headers: dict | None = None,
+        parse: Callable[[bytes], Any] | None = None,
+    ) -> Any:
         """Get request."""
         t = self.headers_with_api_key() if headers is None else headers
         return await self.api_wrapper(
             method="GET",
             url=url,
             headers=t,
+            parse=parse,
         )
 
-    async def post(self, url: str, data: Any = None) -> Any:
+    async def post(
+        self,
+        url: str,
+        data: Any = None,
+        parse: Callable[[bytes], Any] | None = None,
+    ) -> Any:
         """Post request."""
         return await self.api_wrapper(
-            method="POST", url=url, headers=self.headers_with_api_key(), data=data
+            method="POST",
+            url=url,
+            headers=self.headers_with_api_key(),
+            data=data,
+            parse=parse,
+        )
+
+    def timeout_for(self, endpoint: str) -> float:
+        """Return the request timeout for an endpoint, in seconds.
+
+        A few times the observed p99 latency, within REQUEST_TIMEOUT_MIN and
+        REQUEST_TIMEOUT; REQUEST_TIMEOUT until there are enough samples.
+        """
+        histogram = self.metrics.histogram("request_latency_ms", endpoint)
+        if histogram is None or len(histogram.recent) < ADAPTIVE_MIN_SAMPLES:
+            return REQUEST_TIMEOUT.total_seconds()
+        timeout = histogram.percentile(0.99) / 1000 * REQUEST_TIMEOUT_P99_FACTOR
+        return min(
+            max(timeout, REQUEST_TIMEOUT_MIN.total_seconds()),
+            REQUEST_TIMEOUT.total_seconds(),
         )
 
+    def hedge_delay(self, endpoint: str) -> float | None:
+        """Return how long to wait before hedging a GET, in seconds, or None not to."""
+        histogram = self.metrics.histogram("request_latency_ms", endpoint)
+        if (
+            not self.hedge
+            or histogram is None
+            or len(histogram.recent) < ADAPTIVE_MIN_SAMPLES
+        ):
+            return None
+        return max(histogram.percentile(0.95) / 1000, HEDGE_MIN_DELAY.total_seconds())
+
+    async def _request(
+        self, method: str, url: str, headers: dict, data: Any, timeout: float
+    ) -> tuple[int, bytes]:
+        """Make one request and return the status and body."""
+        async with async_timeout.timeout(timeout):
+            response = await self._session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                data=data,
+            )
+
+            status = response.status
+            self.queue.observe_response(status, getattr(response, "headers", None))
+            if status == HTTPStatus.OK:
+                LOGGER.debug("Status 200 OK")
+            elif status == HTTPStatus.UNAUTHORIZED:
+                # TODO throw specialized exception
+                LOGGER.debug("Status 401 Unauthorized")
+            elif status == HTTPStatus.FORBIDDEN:
+                # TODO throw specialized exception
+                LOGGER.debug("Status 403 Forbidden")
+            else:
+                LOGGER.debug("Status=%s", status)
+
+            return status, await response.read()
+
+    async def _hedged_request(
+        self, endpoint: str, delay: float, *args: Any
+    ) -> tuple[int, bytes]:
+        """Make a request, and a second one if the first is slower than `delay`.
+
+        The first successful answer wins and the other request is cancelled.
+        """
+        first = asyncio.ensure_future(self._request(*args))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        self.metrics.increment("hedged_requests", endpoint)
+        second = asyncio.ensure_future(self._request(*args))
+        pending = {first, second}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if (error := task.exception()) is None:
+                        if task is second:
+                            self.metrics.increment("hedge_wins", endpoint)
+                        return task.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
     async def api_wrapper(
         self,
         method: str,
         url: str,
         data: Any = None,
         headers: dict | None = None,
-    ) -> dict[str, Any] | None:
-        """Wrap request."""
-
-        LOGGER.debug(
-            "%s-request to url=%s. data=%s. headers=%s",
-            method,
-            url,
-            data,
-            headers,
-        )
+        parse: Callable[[bytes], Any] | None = None,
+    ) -> Any:
+        """Wrap request.
+
+        The request waits for a queue slot at the priority of the calling
+        context. Without `parse` the body is decoded as JSON on the event loop.
+        With it, the parser turns the raw body into models through the ParseRunner.
+        """
+
+        endpoint = endpoint_name(url)
+
+        # Never log header values or payloads, they carry the API key and token.
+        LOGGER.debug("%s-request to endpoint=%s", method, endpoint)
 
+        self.metrics.increment("requests", endpoint)
+        priority = current_priority()
+        queued = perf_counter()
         try:
             # Avoid mutable default pitfalls
             data = data or {}
             headers = headers or {}
-            async with async_timeout.timeout(20):
-                response = await self._session.request(
-                    method=method,
-                    url=url,
-                    headers=headers,
-                    data=data,
+            async with self.queue.slot(priority):
+                self.metrics.observe(
+                    "queue_wait_ms",
+                    PRIORITY_NAMES[priority],
+                    (perf_counter() - queued) * 1000,
                 )
-
-                # LOGGER.debug("response=%s", response)
-
-                status = response.status
-                if status == HTTPStatus.OK:
-                    LOGGER.debug("Status 200 OK")
-                elif (
-                    status == HTTPStatus.UNAUTHORIZED
-                ):
-                    # TODO throw specialized exception
-                    LOGGER.debug("Status 401 Unauthorized")
-                elif status == HTTPStatus.FORBIDDEN:
-                    # TODO throw specialized exception
-                    LOGGER.debug("Status 403 Forbidden")
+                timeout = self.timeout_for(endpoint)
+                self.metrics.observe("timeout_ms", endpoint, timeout * 1000)
+                start = perf_counter()
+                # Only GETs are safe to send twice; the hedge shares the slot.
+                delay = self.hedge_delay(endpoint) if method == "GET" else None
+                if delay is not None:
+                    status, body = await self._hedged_request(
+                        endpoint, delay, method, url, headers, data, timeout
+                    )
                 else:
-                    LOGGER.debug("Status=%s", status)
+                    status, body = await self._request(
+                        method, url, headers, data, timeout
+                    )
+
+            if status == HTTPStatus.TOO_MANY_REQUESTS:
+                self.metrics.increment("throttled", endpoint)
+
+            elapsed_ms = (perf_counter() - start) * 1000
+            self.metrics.observe("request_latency_ms", endpoint, elapsed_ms)
+            if self.recorder is not None:
+                # Headers are not passed on; the recorder redacts secrets from the rest.
+                self.recorder.record(method, url, data, status, elapsed_ms, body)
+            self.metrics.observe("response_bytes", endpoint, len(body))
 
-                return await response.json()
+            if parse is not None:
+                with self.metrics.timer("parse_ms", endpoint):
+                    return await self.parser.run(parse, body)
+
+            with self.metrics.timer("decode_ms", endpoint):
+                return json.loads(body)
 
         except asyncio.TimeoutError as exception:
+            self.metrics.increment("errors", endpoint)
+            # Count the timeout as a sample, so the timeout grows when latency shifts up.
+            self.metrics.observe("request_latency_ms", endpoint, timeout * 1000)
             raise ApiClientException(
                 f"Timeout error fetching information from {url}"
             ) from exception
-        except (KeyError, TypeError) as exception:
+        except (KeyError, TypeError, ValueError) as exception:
+            self.metrics.increment("errors", endpoint)
             raise ApiClientException(
                 f"Error parsing information from {url} - {exception}"
             ) from exception
         except (aiohttp.ClientError, socket.gaierror) as exception:
+            self.metrics.increment("errors", endpoint)
             raise ApiClientException(
                 f"Error fetching information from {url} - {exception}"
             ) from exception
         except Exception as exception:  # pylint: disable=broad-except
+            self.metrics.increment("errors", endpoint)
             raise ApiClientException(exception) from exception
 
     async def ping(self) -> bool:
@@ -136,26 +297,47 @@ class ElviaApiClient:
 
     async def tarifftypes(self) -> List[TariffType]:
         """Get all available private tariff types."""
-        return (
-            TariffType.from_dict(tariffType)
-            for tariffType in await self.get(TARIFFTYPES_PATH)["tariffKey"]
-        )
+        return await self.get(TARIFFTYPES_PATH, parse=parse_tarifftypes)
 
-    async def tariffquery(self) -> GridTariff:
-        """Get tariff data/prices for a given tariff for a given timeperiod."""
-        return GridTariff.from_dict(await self.get(TARIFFQUERY_PATH))
+    async def tariffquery(
+        self,
+        tariff_key: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        range_: str | None = None,
+    ) -> GridTariff:
+        """Get tariff data/prices for a given tariff for a given timeperiod.
+
+        Give either a named `range_` (e.g. "today", "yesterday") or `start`/`end`.
+        """
+        params = {"TariffKey": tariff_key}
+        if range_ is not None:
+            params["Range"] = range_
+        if start is not None:
+            params["StartTime"] = start.strftime(DATE_FORMAT)
+        if end is not None:
+            params["EndTime"] = end.strftime(DATE_FORMAT)
+        return await self.get(
+            f"{TARIFFQUERY_PATH}?{urlencode(params)}", parse=parse_tariffquery
+        )
 
     async def meteringpoint(self) -> GridTariffCollection:
         """Returns tariff(s) and MPID(s) for the MPIDs(MeteringpointId/Målepunkt-Id) given as input."""
-        response = await self.post(
+        return await self.post(
             METERINGPOINT_PATH,
-            '{ "range": "today", "meteringPointIds": [ "' + str(self._metering_point_id) + '" ] }',
+            '{ "range": "today", "meteringPointIds": [ "'
+            + str(self._metering_point_id)
+            + '" ] }',
+            parse=parse_meteringpoint,
         )
-        for collection in response["gridTariffCollections"]:
-            return GridTariffCollection.from_dict(collection)
 
-    async def maxhours(self):
-        return await self.get(f"{MAX_HOURS_PATH}?meteringPointIds={str(self._metering_point_id)}", headers=self.headers_with_token())
+    async def maxhours(self) -> MaxHours:
+        """Get max-hours for the current and previous month."""
+        return await self.get(
+            f"{MAX_HOURS_PATH}?meteringPointIds={str(self._metering_point_id)}",
+            headers=self.headers_with_token(),
+            parse=parse_maxhours,
+        )
 
     def headers_with_api_key(self) -> Dict[str, str]:
         """Get headers with api_key added."""
@@ -0,0 +1,207 @@
+"""Historical grid tariff backfill for the Elvia integration.
+
+The tariffquery endpoint is paged through in bounded windows with limited
+concurrency. Each page is handed to the sinks (statistics import and local
+stores) as soon as it arrives, and a checkpoint of the contiguous range done so
+far is persisted, so an interrupted backfill resumes after a restart.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Protocol
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import ElviaApiClient
+from .const import (
+    BACKFILL_CONCURRENCY,
+    BACKFILL_WINDOW,
+    DOMAIN,
+    LOGGER,
+    STORAGE_VERSION,
+)
+from .request_queue import PRIORITY_BACKGROUND, request_priority
+from .timeline import TariffSlot, TariffTimeline
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.models import StatisticMetaData
+
+
+class TariffSink(Protocol):
+    """Receives backfilled tariff slots, one page at a time."""
+
+    async def async_write(self, slots: list[TariffSlot]) -> None:
+        """Store a page of slots."""
+
+
+class StatisticsSink:
+    """Import energy prices as hourly external statistics.
+
+    The recorder (and SQLAlchemy with it) is imported on the first write, not
+    when the integration loads.
+    """
+
+    def __init__(self, hass: HomeAssistant, metering_point_id: str) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._metadata: StatisticMetaData = {
+            "has_mean": True,
+            "has_sum": False,
+            "name": f"Elvia grid tariff {metering_point_id}",
+            "source": DOMAIN,
+            "statistic_id": f"{DOMAIN}:grid_tariff_{metering_point_id}".lower(),
+            "unit_of_measurement": "NOK/kWh",
+        }
+
+    async def async_write(self, slots: list[TariffSlot]) -> None:
+        """Import a page of slots, aggregated per hour."""
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder.models import StatisticData
+
+        # pylint: disable-next=import-outside-toplevel
+        from homeassistant.components.recorder.statistics import (
+            async_add_external_statistics,
+        )
+
+        hours: dict[datetime, list[float]] = {}
+        for slot in slots:
+            hour = dt_util.as_utc(slot.start).replace(minute=0, second=0, microsecond=0)
+            hours.setdefault(hour, []).append(slot.energy_price)
+
+        statistics = [
+            StatisticData(
+                start=hour,
+                mean=sum(prices) / len(prices),
+                min=min(prices),
+                max=max(prices),
+            )
+            for hour, prices in sorted(hours.items())
+        ]
+        if statistics:
+            async_add_external_statistics(self._hass, self._metadata, statistics)
+
+
+class TariffBackfill:
+    """Page historical tariffs into sinks, resuming from a checkpoint."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: ElviaApiClient,
+        metering_point_id: str,
+        sinks: list[TariffSink],
+        window: timedelta = BACKFILL_WINDOW,
+        concurrency: int = BACKFILL_CONCURRENCY,
+    ) -> None:
+        """Initialize."""
+        self._api = api
+        self._sinks = sinks
+        self._window = window
+        self._concurrency = concurrency
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.backfill.{metering_point_id}"
+        )
+        self._lock = asyncio.Lock()
+        self.progress: dict[str, Any] = {}
+
+    @property
+    def running(self) -> bool:
+        """Return True while a backfill is in progress."""
+        return self._lock.locked()
+
+    def add_sink(self, sink: TariffSink) -> None:
+        """Add a sink for pages fetched from now on."""
+        self._sinks.append(sink)
+
+    async def async_resume(self, tariff_key: str) -> None:
+        """Continue an interrupted backfill, if any."""
+        stored = await self._store.async_load()
+        if not stored or stored.get("done_until") == stored.get("end"):
+            return
+        start = dt_util.parse_datetime(stored["done_until"])
+        end = dt_util.parse_datetime(stored["end"])
+        if start is None or end is None:
+            return
+        LOGGER.debug("Resuming tariff backfill from %s to %s", start, end)
+        await self.async_run(tariff_key, start, end)
+
+    async def async_run(self, tariff_key: str, start: datetime, end: datetime) -> None:
+        """Backfill [start, end) in windows, at most `concurrency` in flight."""
+
+        async with self._lock:
+            windows: list[tuple[datetime, datetime]] = []
+            cursor = start
+            while cursor < end:
+                windows.append((cursor, min(cursor + self._window, end)))
+                cursor += self._window
+
+            self.progress = {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "done_until": start.isoformat(),
+                "windows": len(windows),
+                "failed": 0,
+            }
+            await self._async_save_checkpoint()
+
+            semaphore = asyncio.Semaphore(self._concurrency)
+            done = [False] * len(windows)
+            contiguous = 0
+
+            async def fetch(index: int) -> tuple[int, list[TariffSlot] | None]:
+                window_start, window_end = windows[index]
+                try:
+                    async with semaphore:
+                        # Refreshes and service calls on the same key go first.
+                        with request_priority(PRIORITY_BACKGROUND):
+                            grid_tariff = await self._api.tariffquery(
+                                tariff_key, start=window_start, end=window_end
+                            )
+                    timeline = await self._api.parser.run(
+                        TariffTimeline.from_grid_tariff, grid_tariff
+                    )
+                except Exception as error:  # pylint: disable=broad-except
+                    LOGGER.warning(
+                        "Backfill of %s - %s failed: %s",
+                        window_start,
+                        window_end,
+                        error,
+                    )
+                    return index, None
+                return index, timeline.slots
+
+            tasks = [asyncio.ensure_future(fetch(i)) for i in range(len(windows))]
+            try:
+                for next_page in asyncio.as_completed(tasks):
+                    index, slots = await next_page
+                    if slots is None:
+                        self.progress["failed"] += 1
+                        continue
+
+                    try:
+                        for sink in self._sinks:
+                            await sink.async_write(slots)
+                    except Exception as error:  # pylint: disable=broad-except
+                        LOGGER.warning("Storing backfilled tariffs failed: %s", error)
+                        self.progress["failed"] += 1
+                        continue
+
+                    done[index] = True
+                    while contiguous < len(windows) and done[contiguous]:
+                        contiguous += 1
+                    done_until = windows[contiguous - 1][1] if contiguous else start
+                    self.progress["done_until"] = done_until.isoformat()
+                    await self._async_save_checkpoint()
+            finally:
+                # Stop windows still in flight if the run is cancelled or fails.
+                for task in tasks:
+                    task.cancel()
+
+    async def _async_save_checkpoint(self) -> None:
+        await self._store.async_save(
+            {key: self.progress[key] for key in ("start", "end", "done_until")}
+        )
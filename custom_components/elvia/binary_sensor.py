@@ -0,0 +1,172 @@
+"""Elvia binary sensors for Home Assistant."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_CONSUMPTION_SENSOR,
+    DOMAIN,
+    EVENT_CAPACITY_GUARD,
+    GUARD_UPDATE_INTERVAL,
+)
+from .coordinator import ElviaDataUpdateCoordinator
+from .cost import READING_POWER, reading_from_state
+from .guard import GuardStatus
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the capacity guard when a consumption sensor is linked."""
+    coordinator = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    consumption_sensor = entry.options.get(CONF_CONSUMPTION_SENSOR)
+    if (
+        coordinator is None
+        or not consumption_sensor
+        or not hasattr(coordinator, "guard")
+    ):
+        return
+
+    async_add_entities(
+        [
+            ElviaCapacityGuardSensor(
+                coordinator=coordinator,
+                source_entity_id=consumption_sensor,
+                key_prefix="elvia",
+            )
+        ]
+    )
+
+
+class ElviaCapacityGuardSensor(CoordinatorEntity, BinarySensorEntity):
+    """On while the current hour is projected to near the capacity level limit.
+
+    Reacts to every reading of the linked meter sensor, so automations can
+    shed load before the hour ends. Between readings the projection is
+    refreshed every minute and at each hour boundary.
+    """
+
+    _attr_has_entity_name = True
+    _attr_name = "Elvia Capacity Guard"
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+    # Changes with every reading; the state itself is enough history.
+    _unrecorded_attributes = frozenset({"HourEnergy", "Projected", "HeadroomPower"})
+
+    def __init__(
+        self,
+        coordinator: ElviaDataUpdateCoordinator,
+        source_entity_id: str,
+        key_prefix: str,
+    ) -> None:
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{DOMAIN}_{key_prefix}_capacity_guard"
+        self._source_entity_id = source_entity_id
+        self._status: GuardStatus | None = None
+        self._cancel_update: CALLBACK_TYPE | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the source sensor and the clock."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            async_track_state_change_event(
+                self.hass, [self._source_entity_id], self._async_source_changed
+            )
+        )
+        self._schedule_update(self.coordinator.clock.now())
+        self.async_on_remove(self._cancel_scheduled_update)
+
+    @callback
+    def _cancel_scheduled_update(self) -> None:
+        if self._cancel_update is not None:
+            self._cancel_update()
+            self._cancel_update = None
+
+    @callback
+    def _schedule_update(self, now: datetime) -> None:
+        """Re-project after the update interval, or at the next hour if sooner."""
+        # Norwegian UTC offsets are whole hours, so UTC hours are local hours.
+        next_hour = dt_util.as_utc(now).replace(
+            minute=0, second=0, microsecond=0
+        ) + timedelta(hours=1)
+        self._cancel_update = self.coordinator.clock.track_point_in_time(
+            self.hass,
+            self._async_scheduled_update,
+            min(now + GUARD_UPDATE_INTERVAL, next_hour),
+        )
+
+    @callback
+    def _async_scheduled_update(self, now: datetime) -> None:
+        self._schedule_update(now)
+        # Nothing to project before the first reading.
+        if self._status is not None:
+            self._set_status(self.coordinator.guard.status(now))
+
+    @callback
+    def _async_source_changed(self, event: Event) -> None:
+        new_state = event.data.get("new_state")
+        if (reading := reading_from_state(new_state)) is None:
+            return
+
+        kind, value = reading
+        guard = self.coordinator.guard
+        if kind == READING_POWER:
+            status = guard.add_power(new_state.last_updated, value)
+        else:
+            status = guard.add_energy(new_state.last_updated, value)
+        self._set_status(status)
+
+    @callback
+    def _set_status(self, status: GuardStatus) -> None:
+        """Show `status`, firing the event when the warning turns on or off."""
+        previous, self._status = self._status, status
+        if previous is None or previous.warning != status.warning:
+            self.hass.bus.async_fire(
+                EVENT_CAPACITY_GUARD,
+                {
+                    "config_entry_id": getattr(
+                        self.coordinator.config_entry, "entry_id", None
+                    ),
+                    "warning": status.warning,
+                    "exceeding": status.exceeding,
+                    "hour_start": status.hour_start.isoformat(),
+                    "hour_energy": status.hour_energy,
+                    "projected": status.projected,
+                    "limit": status.limit,
+                    "headroom_power": status.headroom_power,
+                },
+            )
+        self.async_write_ha_state()
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True while the hour is projected near or over the limit."""
+        return None if self._status is None else self._status.warning
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the projection of the current hour."""
+        status = self._status
+        if status is None:
+            return {}
+        return {
+            "HourEnergy": status.hour_energy,
+            "Projected": status.projected,
+            "Limit": status.limit,
+            "HeadroomPower": status.headroom_power,
+            "Exceeding": status.exceeding,
+        }
@@ -0,0 +1,173 @@
+"""End-of-month capacity tariff projection for the Elvia integration.
+
+The capacity (fixed price) level of a month is decided by the average of its
+three highest daily max hours. That average can only grow as the month goes on,
+so the current value is a hard lower bound. The rest of the month is estimated
+from the monthly averages in the max-hours history, weighted by how much of the
+month is left.
+
+History statistics are kept as running sums and the current month is at most
+three values, so each hourly projection is O(1).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from math import sqrt
+from typing import Iterable, NamedTuple
+
+from homeassistant.util import dt as dt_util
+
+from .models import GridTariffCollection
+
+# Upper bound is mean + this many standard deviations of past months
+UPPER_BOUND_SIGMAS = 2.0
+
+
+class CapacityLevel(NamedTuple):
+    """One step of the capacity tariff."""
+
+    level_id: str
+    value_min: float
+    value_max: float  # inf for the top level
+    monthly_total: float
+    level_info: str
+
+
+class CapacityProjection(NamedTuple):
+    """Projected end-of-month capacity average and cost, with bounds."""
+
+    average: float
+    average_low: float
+    average_high: float
+    level_info: str | None
+    monthly_cost: float | None
+    monthly_cost_low: float | None
+    monthly_cost_high: float | None
+    month_progress: float
+
+
+def _as_float(value: str | None, default: float) -> float:
+    try:
+        return float(value) if value not in (None, "") else default
+    except ValueError:
+        return default
+
+
+def levels_from_collection(collection: GridTariffCollection) -> list[CapacityLevel]:
+    """Return the capacity levels of the fixed price our level belongs to."""
+
+    fixed_prices = collection.gridTariff.tariffPrice.priceInfo.fixedPrices
+    if not fixed_prices:
+        return []
+
+    level_id = None
+    if collection.meteringPointsAndPriceLevels:
+        level_id = collection.meteringPointsAndPriceLevels[
+            0
+        ].currentFixedPriceLevel.levelId
+    fixed_price = next(
+        (
+            fixed_price
+            for fixed_price in fixed_prices
+            if any(level.id == level_id for level in fixed_price.priceLevels)
+        ),
+        fixed_prices[0],
+    )
+
+    return sorted(
+        (
+            CapacityLevel(
+                level_id=level.id,
+                value_min=_as_float(level.valueMin, 0.0),
+                value_max=_as_float(level.valueMax, float("inf")),
+                monthly_total=level.monthlyTotal,
+                level_info=level.levelInfo,
+            )
+            for level in fixed_price.priceLevels
+        ),
+        key=lambda level: level.value_min,
+    )
+
+
+def month_progress(now: datetime) -> float:
+    """Return how much of the local month has passed, 0-1."""
+    local = dt_util.as_local(now)
+    start = dt_util.start_of_local_day(local.replace(day=1))
+    next_month = (local.replace(day=1) + timedelta(days=32)).replace(day=1)
+    end = dt_util.start_of_local_day(next_month)
+    return min(1.0, max(0.0, (local - start) / (end - start)))
+
+
+class CapacityProjector:
+    """Incremental end-of-month capacity projection for one metering point."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.levels: list[CapacityLevel] = []
+        self._count = 0
+        self._sum = 0.0
+        self._sum_squares = 0.0
+
+    def set_levels(self, levels: list[CapacityLevel]) -> None:
+        """Use the capacity levels from the latest tariff."""
+        self.levels = levels
+
+    def set_history(self, averages: Iterable[float]) -> None:
+        """Replace the past monthly averages the estimate is based on."""
+        self._count, self._sum, self._sum_squares = 0, 0.0, 0.0
+        for average in averages:
+            self.add_month(average)
+
+    def add_month(self, average: float) -> None:
+        """Add one finished month."""
+        self._count += 1
+        self._sum += average
+        self._sum_squares += average * average
+
+    def _history_mean_std(self, fallback: float) -> tuple[float, float]:
+        if not self._count:
+            return fallback, 0.0
+        mean = self._sum / self._count
+        variance = max(0.0, self._sum_squares / self._count - mean * mean)
+        return mean, sqrt(variance)
+
+    def level_for(self, average: float) -> CapacityLevel | None:
+        """Return the level an average falls in."""
+        for level in self.levels:
+            if level.value_min <= average < level.value_max:
+                return level
+        return (
+            self.levels[-1]
+            if self.levels and average >= self.levels[-1].value_min
+            else None
+        )
+
+    def project(self, current_average: float, now: datetime) -> CapacityProjection:
+        """Project the month from its current top-3 average."""
+
+        progress = month_progress(now)
+        mean, std = self._history_mean_std(current_average)
+        remaining = 1.0 - progress
+
+        # The top-3 average never decreases within a month.
+        low = current_average
+        average = max(low, progress * current_average + remaining * mean)
+        high = max(
+            average,
+            progress * current_average + remaining * (mean + UPPER_BOUND_SIGMAS * std),
+        )
+
+        level = self.level_for(average)
+        level_low = self.level_for(low)
+        level_high = self.level_for(high)
+        return CapacityProjection(
+            average=round(average, 3),
+            average_low=round(low, 3),
+            average_high=round(high, 3),
+            level_info=level.level_info if level else None,
+            monthly_cost=level.monthly_total if level else None,
+            monthly_cost_low=level_low.monthly_total if level_low else None,
+            monthly_cost_high=level_high.monthly_total if level_high else None,
+            month_progress=round(progress, 3),
+        )
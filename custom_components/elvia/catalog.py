@@ -0,0 +1,132 @@
+"""Tariff-type catalog shared by all Elvia config entries.
+
+Tariff types are the same for every metering point, so one cached copy keyed by
+`tariffKey` serves the config flow and every coordinator. The cache lives as
+long as the catalog looks stable: the longer since Elvia last changed a tariff
+type (`lastUpdated`), the longer we trust it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any
+
+import attr
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .api import ElviaApiClient
+from .const import (
+    DATA_TARIFF_CATALOG,
+    DOMAIN,
+    LOGGER,
+    STORAGE_VERSION,
+    TARIFFTYPE_CATALOG_MAX_TTL,
+    TARIFFTYPE_CATALOG_MIN_TTL,
+)
+from .models import TariffType
+
+
+class TariffTypeCatalog:
+    """Cached tariff types keyed by tariffKey."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self._store: Store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.tariff_catalog")
+        self._types: dict[str, TariffType] = {}
+        self._fetched: datetime | None = None
+        self._lock = asyncio.Lock()
+        self._loaded = False
+
+    @property
+    def expires_at(self) -> datetime | None:
+        """Return when the cached catalog should be refetched."""
+        if self._fetched is None:
+            return None
+        return self._fetched + self._ttl()
+
+    def _ttl(self) -> timedelta:
+        updated = [
+            parsed
+            for tariff_type in self._types.values()
+            if (parsed := dt_util.parse_datetime(tariff_type.lastUpdated or ""))
+        ]
+        if not updated or self._fetched is None:
+            return TARIFFTYPE_CATALOG_MIN_TTL
+        age = self._fetched - max(updated)
+        return min(max(age / 2, TARIFFTYPE_CATALOG_MIN_TTL), TARIFFTYPE_CATALOG_MAX_TTL)
+
+    def is_fresh(self, now: datetime | None = None) -> bool:
+        """Return True if the cache can be used without a fetch."""
+        expires_at = self.expires_at
+        return expires_at is not None and (now or dt_util.utcnow()) < expires_at
+
+    def get(self, tariff_key: str) -> TariffType | None:
+        """Return a cached tariff type without fetching."""
+        return self._types.get(tariff_key)
+
+    def add(self, tariff_type: TariffType) -> None:
+        """Seed the catalog, e.g. from a meteringpoint response."""
+        self._types[tariff_type.tariffKey] = tariff_type
+
+    async def async_load(self) -> None:
+        """Load the persisted catalog once."""
+        if self._loaded:
+            return
+        self._loaded = True
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        try:
+            for data in stored["tariffTypes"]:
+                self.add(TariffType.from_dict(data))
+            self._fetched = dt_util.parse_datetime(stored["fetched"])
+        except (KeyError, TypeError, ValueError) as error:
+            LOGGER.debug("Ignoring stored tariff catalog: %s", error)
+
+    async def async_refresh(self, api: ElviaApiClient, force: bool = False) -> None:
+        """Fetch all tariff types unless the cache is still fresh."""
+        async with self._lock:
+            await self.async_load()
+            if not force and self.is_fresh():
+                api.metrics.increment("cache_hits", "tariff_catalog")
+                return
+            api.metrics.increment("cache_misses", "tariff_catalog")
+
+            tariff_types = await api.tarifftypes()
+            self._types = {
+                tariff_type.tariffKey: tariff_type for tariff_type in tariff_types
+            }
+            self._fetched = dt_util.utcnow()
+            self._store.async_delay_save(self._data_to_save)
+
+    async def async_get(
+        self, api: ElviaApiClient, tariff_key: str
+    ) -> TariffType | None:
+        """Return a tariff type, fetching the catalog if stale or missing the key."""
+        await self.async_refresh(api)
+        if tariff_key not in self._types and not self._recently_fetched():
+            await self.async_refresh(api, force=True)
+        return self._types.get(tariff_key)
+
+    def _recently_fetched(self) -> bool:
+        return (
+            self._fetched is not None
+            and dt_util.utcnow() - self._fetched < TARIFFTYPE_CATALOG_MIN_TTL
+        )
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "fetched": self._fetched.isoformat() if self._fetched else None,
+            "tariffTypes": [attr.asdict(t) for t in self._types.values()],
+        }
+
+
+def async_get_catalog(hass: HomeAssistant) -> TariffTypeCatalog:
+    """Return the catalog shared by all config entries."""
+    if DATA_TARIFF_CATALOG not in hass.data:
+        hass.data[DATA_TARIFF_CATALOG] = TariffTypeCatalog(hass)
+    return hass.data[DATA_TARIFF_CATALOG]
@@ -0,0 +1,80 @@
+"""Time source for the Elvia integration.
+
+The coordinator reads the time and arms its timers through a clock, so a
+simulation can run weeks of operation in seconds with a VirtualClock.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import heapq
+from itertools import count
+from typing import Any, Callable
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.helpers.event import async_track_point_in_time
+from homeassistant.util import dt as dt_util
+
+
+class Clock:
+    """Wall clock and Home Assistant timers."""
+
+    def now(self) -> datetime:
+        """Return the current local time."""
+        return dt_util.now()
+
+    def track_point_in_time(
+        self,
+        hass: HomeAssistant,
+        action: Callable[[datetime], Any],
+        point_in_time: datetime,
+    ) -> CALLBACK_TYPE:
+        """Call `action` at `point_in_time`. Returns a function that cancels it."""
+        return async_track_point_in_time(hass, action, point_in_time)
+
+
+class VirtualClock(Clock):
+    """Clock that only moves when advanced; timers fire in order as it passes them."""
+
+    def __init__(self, start: datetime) -> None:
+        """Initialize."""
+        self._now = dt_util.as_utc(start)
+        self._timers: list[tuple[float, int, list[Any]]] = []
+        self._sequence = count()
+
+    def now(self) -> datetime:
+        """Return the virtual local time."""
+        return dt_util.as_local(self._now)
+
+    def track_point_in_time(
+        self,
+        hass: HomeAssistant,
+        action: Callable[[datetime], Any],
+        point_in_time: datetime,
+    ) -> CALLBACK_TYPE:
+        """Call `action` once the clock reaches `point_in_time`."""
+        entry = [action, dt_util.as_utc(point_in_time)]
+        heapq.heappush(
+            self._timers, (entry[1].timestamp(), next(self._sequence), entry)
+        )
+
+        def cancel() -> None:
+            entry[0] = None
+
+        return cancel
+
+    def advance(self, delta: timedelta) -> None:
+        """Move the clock forward, firing the timers it passes."""
+        target = self._now + delta
+        while self._timers and self._timers[0][0] <= target.timestamp():
+            _, _, (action, when) = heapq.heappop(self._timers)
+            if action is None:
+                continue
+            self._now = max(self._now, when)
+            action(dt_util.as_local(self._now))
+        self._now = target
+
+    @property
+    def pending_timers(self) -> int:
+        """Return how many timers are armed, for leak checks."""
+        return sum(1 for _, _, (action, _) in self._timers if action is not None)
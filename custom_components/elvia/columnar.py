@@ -0,0 +1,309 @@
+"""Compact columnar history of prices and consumption for the Elvia integration.
+
+Each metering point gets one file per column: slot start (int64 epoch seconds),
+energy price and consumption (float64, NaN when unknown), in native byte
+order. New slots are appended and values for stored slots are overwritten in
+place; only new slots that land before the last stored slot rewrite the files. A rewrite writes every column to a temporary file and
+then a marker; once the marker exists the new set is committed, and an
+interrupted swap is finished on the next load. Reads memory-map the files, and range queries return
+memoryview slices of the maps, so nothing is copied.
+
+A month of hourly slots is about 17 KiB.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from functools import partial
+from math import isnan
+import mmap
+import os
+import threading
+from typing import Iterable, NamedTuple, Sequence
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .const import DOMAIN, LOGGER
+from .timeline import TariffSlot
+
+NAN = float("nan")
+
+# column name -> array typecode
+COLUMNS = {"start": "q", "price": "d", "consumption": "d"}
+
+
+class ColumnSlice(NamedTuple):
+    """Zero-copy view of a range of rows."""
+
+    start: memoryview
+    price: memoryview
+    consumption: memoryview
+
+
+class ColumnarStore:
+    """Append-only columns for one metering point. Thread safe, blocking I/O."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize."""
+        self._path = path
+        self._lock = threading.Lock()
+        self._maps: dict[str, mmap.mmap] = {}
+        self._views: dict[str, memoryview] | None = None
+
+    def _file(self, column: str) -> str:
+        return os.path.join(self._path, f"{column}.{COLUMNS[column]}1")
+
+    def _marker(self) -> str:
+        return os.path.join(self._path, "merge.commit")
+
+    def _columns(self) -> dict[str, memoryview]:
+        """Return memoryviews over the mapped columns, mapping them on first use."""
+        if self._views is not None:
+            return self._views
+
+        self._repair()
+        views: dict[str, memoryview] = {}
+        for column, typecode in COLUMNS.items():
+            try:
+                with open(self._file(column), "rb") as file:
+                    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                # Missing or empty file
+                views[column] = memoryview(array(typecode))
+                continue
+            self._maps[column] = mapped
+            views[column] = memoryview(mapped).cast(typecode)
+        self._views = views
+        return views
+
+    def _repair(self) -> None:
+        """Finish an interrupted merge, then truncate the columns to whole rows.
+
+        A merge stopped between column swaps is rolled forward from its temporary
+        files; one stopped before its marker was written is discarded. An append
+        interrupted by a crash can leave columns of different lengths or a partial
+        item at the end of a file.
+        """
+        committed = os.path.exists(self._marker())
+        for column in COLUMNS:
+            temporary = f"{self._file(column)}.tmp"
+            if not os.path.exists(temporary):
+                continue
+            if committed:
+                LOGGER.warning(
+                    "Finishing an interrupted merge of %s", self._file(column)
+                )
+                os.replace(temporary, self._file(column))
+            else:
+                os.remove(temporary)
+        if committed:
+            os.remove(self._marker())
+
+        sizes: dict[str, int] = {}
+        for column in COLUMNS:
+            try:
+                sizes[column] = os.path.getsize(self._file(column))
+            except FileNotFoundError:
+                sizes[column] = 0
+        rows = min(
+            sizes[column] // array(typecode).itemsize
+            for column, typecode in COLUMNS.items()
+        )
+        for column, typecode in COLUMNS.items():
+            length = rows * array(typecode).itemsize
+            if sizes[column] != length:
+                LOGGER.warning(
+                    "Truncating %s from %s to %s bytes",
+                    self._file(column),
+                    sizes[column],
+                    length,
+                )
+                os.truncate(self._file(column), length)
+
+    def _invalidate(self) -> None:
+        """Drop the maps after a write; they are remapped on the next read."""
+        views, maps = self._views or {}, self._maps
+        self._views, self._maps = None, {}
+        for view in views.values():
+            try:
+                view.release()
+            except BufferError:
+                pass
+        for mapped in maps.values():
+            try:
+                mapped.close()
+            except BufferError:
+                # A caller still holds a slice; the map is freed with it.
+                pass
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._columns()["start"])
+
+    def last_start(self) -> int | None:
+        """Return the newest stored slot start."""
+        with self._lock:
+            starts = self._columns()["start"]
+            return starts[-1] if len(starts) else None
+
+    def range(self, start: int, end: int) -> ColumnSlice:
+        """Return rows with start <= slot start < end, without copying."""
+        with self._lock:
+            columns = self._columns()
+            starts = columns["start"]
+            first = bisect_left(starts, start)
+            last = bisect_left(starts, end, first)
+            return ColumnSlice(
+                starts[first:last],
+                columns["price"][first:last],
+                columns["consumption"][first:last],
+            )
+
+    def write(
+        self,
+        starts: Sequence[int],
+        prices: Sequence[float] | None = None,
+        consumption: Sequence[float] | None = None,
+    ) -> None:
+        """Store rows. NaN (or a missing column) keeps the stored value."""
+
+        count = len(starts)
+        if not count:
+            return
+        rows = sorted(
+            zip(
+                starts,
+                prices if prices is not None else [NAN] * count,
+                consumption if consumption is not None else [NAN] * count,
+            )
+        )
+
+        with self._lock:
+            stored = self._columns()["start"]
+            if not len(stored) or rows[0][0] > stored[-1]:
+                self._append(rows)
+            elif (indexes := self._indexes(rows)) is not None:
+                self._update(indexes, rows)
+            else:
+                self._merge(rows)
+            self._invalidate()
+
+    def _append(self, rows: list[tuple[int, float, float]]) -> None:
+        os.makedirs(self._path, exist_ok=True)
+        for index, (column, typecode) in enumerate(COLUMNS.items()):
+            with open(self._file(column), "ab") as file:
+                file.write(array(typecode, (row[index] for row in rows)).tobytes())
+
+    def _indexes(self, rows: list[tuple[int, float, float]]) -> list[int] | None:
+        """Return the row index of each start, or None if any is not stored."""
+        starts = self._columns()["start"]
+        indexes = []
+        for row in rows:
+            index = bisect_left(starts, row[0])
+            if index == len(starts) or starts[index] != row[0]:
+                return None
+            indexes.append(index)
+        return indexes
+
+    def _update(self, indexes: list[int], rows: list[tuple[int, float, float]]) -> None:
+        """Overwrite the known values of stored rows; each value is one aligned write."""
+        for position, column in ((1, "price"), (2, "consumption")):
+            itemsize = array(COLUMNS[column]).itemsize
+            changes = [
+                (index, row[position])
+                for index, row in zip(indexes, rows)
+                if not isnan(row[position])
+            ]
+            if not changes:
+                continue
+            with open(self._file(column), "r+b") as file:
+                for index, value in changes:
+                    file.seek(index * itemsize)
+                    file.write(array(COLUMNS[column], (value,)).tobytes())
+
+    def _merge(self, rows: list[tuple[int, float, float]]) -> None:
+        columns = self._columns()
+        merged: dict[int, list[float]] = {
+            start: [price, used]
+            for start, price, used in zip(
+                columns["start"], columns["price"], columns["consumption"]
+            )
+        }
+        for start, price, used in rows:
+            existing = merged.setdefault(start, [NAN, NAN])
+            if not isnan(price):
+                existing[0] = price
+            if not isnan(used):
+                existing[1] = used
+
+        ordered = sorted(merged.items())
+        data = {
+            "start": array("q", (start for start, _ in ordered)),
+            "price": array("d", (values[0] for _, values in ordered)),
+            "consumption": array("d", (values[1] for _, values in ordered)),
+        }
+
+        # Release our maps before replacing the files underneath them.
+        self._invalidate()
+        for column, values in data.items():
+            with open(f"{self._file(column)}.tmp", "wb") as file:
+                file.write(values.tobytes())
+                file.flush()
+                os.fsync(file.fileno())
+        # All columns are written; from here on the merge is finished on load if cut short.
+        with open(self._marker(), "wb") as file:
+            os.fsync(file.fileno())
+        for column in data:
+            os.replace(f"{self._file(column)}.tmp", self._file(column))
+        os.remove(self._marker())
+
+    def close(self) -> None:
+        """Unmap the files."""
+        with self._lock:
+            self._invalidate()
+
+
+class LocalTariffStore:
+    """Async front for a ColumnarStore, usable as a backfill sink."""
+
+    def __init__(self, hass: HomeAssistant, metering_point_id: str) -> None:
+        """Initialize."""
+        self._hass = hass
+        self._metering_point_id = metering_point_id
+        self._store: ColumnarStore | None = None
+
+    @property
+    def store(self) -> ColumnarStore:
+        """Return the store, created on first use."""
+        if self._store is None:
+            self._store = ColumnarStore(
+                self._hass.config.path(STORAGE_DIR, DOMAIN, self._metering_point_id)
+            )
+        return self._store
+
+    async def async_write(self, slots: Iterable[TariffSlot]) -> None:
+        """Store the energy price of each slot."""
+        slots = list(slots)
+        await self._hass.async_add_executor_job(
+            self.store.write,
+            [int(slot.start.timestamp()) for slot in slots],
+            [slot.energy_price for slot in slots],
+        )
+
+    async def async_write_consumption(self, energy: dict[int, float]) -> None:
+        """Store the energy (kWh) used in each slot, keyed by slot start."""
+        starts = sorted(energy)
+        await self._hass.async_add_executor_job(
+            partial(
+                self.store.write,
+                starts,
+                consumption=[energy[start] for start in starts],
+            )
+        )
+
+    async def async_close(self) -> None:
+        """Unmap the files."""
+        if self._store is not None:
+            await self._hass.async_add_executor_job(self._store.close)
@@ -10,16 +10,37 @@ from homeassistant import config_entries
 from homeassistant.const import CONF_API_KEY
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import selector
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .api import ElviaApiClient
-from .const import CONF_METERING_POINT_ID, DOMAIN, CONF_TOKEN
+from .catalog import async_get_catalog
+from .const import (
+    CONF_CONSUMPTION_SENSOR,
+    CONF_HEDGE_REQUESTS,
+    CONF_METERING_POINT_ID,
+    CONF_PARSE_MODE,
+    CONF_RECORD_TRAFFIC,
+    CONF_SETUP_MODE,
+    CONF_TARIFF_KEY,
+    CONF_TOKEN,
+    DOMAIN,
+    PARSE_MODE_INLINE,
+    PARSE_MODES,
+    SETUP_MODE_BACKGROUND,
+    SETUP_MODES,
+)
+from .request_queue import (
+    PRIORITY_INTERACTIVE,
+    async_get_request_queue,
+    request_priority,
+)
 
 SCHEMA = vol.Schema(
     {
         vol.Required(CONF_API_KEY): str,
         vol.Required(CONF_METERING_POINT_ID): str,
-        vol.Required(CONF_TOKEN): str
+        vol.Required(CONF_TOKEN): str,
     }
 )
 
@@ -29,6 +50,14 @@ class ElviaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> ElviaOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return ElviaOptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -45,10 +74,13 @@ class ElviaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                 metering_point_id=metering_point_id,
                 token=token,
                 session=async_get_clientsession(self.hass),
+                queue=async_get_request_queue(self.hass, api_key),
             )
 
             try:
-                await api.meteringpoint()
+                # The user is waiting; go ahead of any background work on this key.
+                with request_priority(PRIORITY_INTERACTIVE):
+                    collection = await api.meteringpoint()
             except Exception:
                 return self.async_show_form(
                     step_id="user",
@@ -56,9 +88,16 @@ class ElviaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
                     errors={"base": "cannot_connect"},
                 )
 
+            # Seed the shared catalog so setup can skip the meteringpoint fetch.
+            data = dict(user_input)
+            if collection is not None:
+                tariff_type = collection.gridTariff.tariffType
+                async_get_catalog(self.hass).add(tariff_type)
+                data[CONF_TARIFF_KEY] = tariff_type.tariffKey
+
             return self.async_create_entry(
                 title="Elvia",
-                data=user_input,
+                data=data,
             )
 
         return self.async_show_form(
@@ -66,3 +105,49 @@ class ElviaFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=SCHEMA,
             errors={},
         )
+
+
+class ElviaOptionsFlowHandler(config_entries.OptionsFlow):
+    """Options flow for Elvia."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        # The flow handler is the entry id; works with and without OptionsFlow.config_entry.
+        options = self.hass.config_entries.async_get_entry(self.handler).options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_PARSE_MODE,
+                        default=options.get(CONF_PARSE_MODE, PARSE_MODE_INLINE),
+                    ): vol.In(PARSE_MODES),
+                    vol.Optional(
+                        CONF_SETUP_MODE,
+                        default=options.get(CONF_SETUP_MODE, SETUP_MODE_BACKGROUND),
+                    ): vol.In(SETUP_MODES),
+                    vol.Optional(
+                        CONF_CONSUMPTION_SENSOR,
+                        description={
+                            "suggested_value": options.get(CONF_CONSUMPTION_SENSOR)
+                        },
+                    ): selector.EntitySelector(
+                        selector.EntitySelectorConfig(domain="sensor")
+                    ),
+                    vol.Optional(
+                        CONF_HEDGE_REQUESTS,
+                        default=options.get(CONF_HEDGE_REQUESTS, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_RECORD_TRAFFIC,
+                        default=options.get(CONF_RECORD_TRAFFIC, False),
+                    ): bool,
+                }
+            ),
+        )
@@ -1,22 +1,122 @@
 """Constants for the Elvia integration."""
 
+from datetime import timedelta
 from logging import Logger, getLogger
 
 LOGGER: Logger = getLogger(__package__)
 
 DOMAIN = "elvia"
-PLATFORMS = ["sensor"]
+PLATFORMS = ["binary_sensor", "sensor"]
 
 CONF_TOKEN = "token"
 CONF_METERING_POINT_ID = "metering_point_id"
+CONF_TARIFF_KEY = "tariff_key"
+
+# Options
+CONF_PARSE_MODE = "parse_mode"
+PARSE_MODE_INLINE = "inline"
+PARSE_MODE_THREAD = "thread"
+PARSE_MODE_PROCESS = "process"
+PARSE_MODES = [PARSE_MODE_INLINE, PARSE_MODE_THREAD, PARSE_MODE_PROCESS]
+PROCESS_PARSE_MIN_BYTES = 1_000_000
+CONF_CONSUMPTION_SENSOR = "consumption_sensor"
+CONF_HEDGE_REQUESTS = "hedge_requests"
+CONF_RECORD_TRAFFIC = "record_traffic"
+CONF_SETUP_MODE = "setup_mode"
+SETUP_MODE_BACKGROUND = "background"
+SETUP_MODE_BLOCKING = "blocking"
+SETUP_MODES = [SETUP_MODE_BACKGROUND, SETUP_MODE_BLOCKING]
+# Initial refreshes in flight across all entries during background setup
+SETUP_CONCURRENCY = 2
+
+DATA_TARIFF_CATALOG = f"{DOMAIN}_tariff_catalog"
+DATA_METRICS_VIEW = f"{DOMAIN}_metrics_view"
+DATA_SETUP_SEMAPHORE = f"{DOMAIN}_setup_semaphore"
+DATA_REQUEST_QUEUES = f"{DOMAIN}_request_queues"
+
+# Fired at each tariff slot boundary where the price changes
+EVENT_PRICE_CHANGED = f"{DOMAIN}_price_changed"
+# Fired when the capacity guard's warning turns on or off
+EVENT_CAPACITY_GUARD = f"{DOMAIN}_capacity_guard"
 
 DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
 
+# Services
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+SERVICE_BACKFILL_TARIFFS = "backfill_tariffs"
+SERVICE_GET_TARIFF_PRICES = "get_tariff_prices"
+ATTR_TIMES = "times"
+ATTR_FETCH = "fetch"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_TOP_N = "top_n"
+ATTR_FORCE_FETCH = "force_fetch"
+
+STORAGE_VERSION = 1
+
+# Historical tariff backfill, see backfill.py
+BACKFILL_WINDOW = timedelta(days=7)
+BACKFILL_CONCURRENCY = 2
+BACKFILL_MAX_DAYS = 5 * 366
+
+# Distinct fixed/energy price objects kept for sharing between parsed hours
+FLYWEIGHT_CACHE_SIZE = 1024
+
+# API traffic recordings, see recording.py
+RECORD_MAX_BYTES = 50_000_000
+
+# get_tariff_prices limits
+PRICE_QUERY_MAX_SLOTS = 31 * 96  # a month of 15-minute slots
+PRICE_QUERY_MAX_FETCH = timedelta(days=31)
+
+# Longest list included per field in the diagnostics download
+DIAGNOSTICS_MAX_ITEMS = 100
+
+MAXHOURS_HISTORY_MONTHS = 24
+MAXHOURS_HISTORY_SAVE_DELAY = 30  # seconds
+TARIFF_PATTERN_SAVE_DELAY = 30  # seconds
+COST_SAVE_DELAY = 60  # seconds
+# How often the capacity guard re-projects the hour between readings
+GUARD_UPDATE_INTERVAL = timedelta(minutes=1)
+
+# Length of one tariff slot when the tariff type has no resolution
+SLOT_SECONDS = 3600
+
+# Refresh cadences, see scheduler.py
+SOURCE_TARIFF = "tariff"
+SOURCE_MAXHOURS = "maxhours"
+SOURCE_TARIFFTYPE = "tarifftype"
+
+TARIFF_REFRESH_OFFSET = timedelta(minutes=1)  # after local midnight
+MAXHOURS_REFRESH_INTERVAL = timedelta(hours=1)
+MAXHOURS_REFRESH_DELAY = timedelta(minutes=10)  # after maxHoursCalculatedTime
+TARIFFTYPE_REFRESH_INTERVAL = timedelta(days=7)
+REFRESH_RETRY_DELAY = timedelta(minutes=5)
+
+TARIFFTYPE_CATALOG_MIN_TTL = timedelta(hours=1)
+TARIFFTYPE_CATALOG_MAX_TTL = TARIFFTYPE_REFRESH_INTERVAL
+
+# Request timeouts adapt to each endpoint's p99 latency once enough samples exist.
+REQUEST_TIMEOUT = timedelta(seconds=20)  # upper bound, and the default
+REQUEST_TIMEOUT_MIN = timedelta(seconds=3)
+REQUEST_TIMEOUT_P99_FACTOR = 3
+ADAPTIVE_MIN_SAMPLES = 20
+# A hedged GET is sent again after the endpoint's p95 latency, but not sooner than this.
+HEDGE_MIN_DELAY = timedelta(milliseconds=200)
+
+# Request slots per API key, see request_queue.py
+API_CONCURRENCY = 4
+# Background requests pause below this share of the rate limit left ...
+BACKGROUND_MIN_HEADROOM = 0.2
+# ... or after a 429, for the advertised reset or Retry-After, else this long.
+QUOTA_PAUSE = timedelta(seconds=60)
+
 # API
 API_BASE: str = "https://elvia.azure-api.net"
 
 METER_VALUE_API_URL: str = f"{API_BASE}/customer/metervalues"
-MAX_HOURS_PATH = f"{METER_VALUE_API_URL}/api/v2/maxhours" # GET
+MAX_HOURS_PATH = f"{METER_VALUE_API_URL}/api/v2/maxhours"  # GET
 
 GRID_TARIFF_API_URL: str = f"{API_BASE}/grid-tariff"
 API_HEADERS = {
@@ -26,9 +126,7 @@ API_HEADERS = {
 PING_PATH = f"{GRID_TARIFF_API_URL}/Ping"  # GET
 SECURE_PATH = f"{GRID_TARIFF_API_URL}/Secure"  # GET
 TARIFFTYPES_PATH = f"{GRID_TARIFF_API_URL}/digin/api/1/tarifftype"  # GET - {v}
-# TODO add tariffKey and range
 TARIFFQUERY_PATH = f"{GRID_TARIFF_API_URL}/digin/api/1/tariffquery"  # ?TariffKey={TariffKey}[&Range][&StartTime][&EndTime]" # GET
 METERINGPOINT_PATH = (
     f"{GRID_TARIFF_API_URL}/digin/api/1/tariffquery/meteringpointsgridtariffs"  # POST
 )
-
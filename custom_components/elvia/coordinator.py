@@ -1,27 +1,71 @@
 """Elvia data coordinator."""
 
-from typing import Any
+from typing import Any, Callable
 
-from time import localtime
+import asyncio
 from datetime import timedelta, datetime
+from math import isnan
+from time import perf_counter
 
 from aiohttp.client_exceptions import ClientConnectorError
 from voluptuous.error import Error
 
 from homeassistant.const import STATE_UNKNOWN
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-
-from .api import ElviaApiClient
-from .const import DOMAIN, LOGGER
-from .models import EnergyPrice, GridTariffCollection, HourPrice, PriceLevel, TariffType
+from homeassistant.util import dt as dt_util
+
+from .api import ApiClientException, ElviaApiClient
+from .backfill import StatisticsSink, TariffBackfill
+from .capacity import CapacityProjection, CapacityProjector, levels_from_collection
+from .catalog import async_get_catalog
+from .clock import Clock
+from .columnar import LocalTariffStore
+from .const import (
+    DOMAIN,
+    EVENT_PRICE_CHANGED,
+    LOGGER,
+    PRICE_QUERY_MAX_FETCH,
+    REFRESH_RETRY_DELAY,
+    STORAGE_VERSION,
+    SOURCE_MAXHOURS,
+    SOURCE_TARIFF,
+    SOURCE_TARIFFTYPE,
+    TARIFFTYPE_REFRESH_INTERVAL,
+)
+from .guard import CapacityGuard
+from .history import MaxHoursHistory
+from .metrics import ElviaMetrics
+from .models import GridTariffCollection, MaxHours, MaxHoursAggregate, TariffType
+from .parsing import ParseRunner
+from .scheduler import DEFAULT_POLICIES, RefreshScheduler
+from .synthesis import TariffPattern
+from .timeline import TariffSlot, TariffTimeline, slot_seconds
+
+
+def _fixed_price_level_id(collection: GridTariffCollection | None) -> str | None:
+    """Return the metering point's current fixed price level id."""
+    if collection is None or not collection.meteringPointsAndPriceLevels:
+        return None
+    return collection.meteringPointsAndPriceLevels[0].currentFixedPriceLevel.levelId
+
+
+def _build_timeline(
+    data: GridTariffCollection,
+) -> tuple[TariffTimeline, list[dict[str, Any]]]:
+    """Build the tariff timeline and its attribute list."""
+    timeline = TariffTimeline.from_collection(data)
+    return timeline, timeline.as_price_list()
 
 
 class ElviaDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching from Elvia data API."""
 
-    last_hour_fetched: int or None = None
+    # Index of the tariff slot the current values were last resolved for
+    last_slot_fetched: int or None = None
 
     tariffType: TariffType or None = None
 
@@ -31,22 +75,68 @@ class ElviaDataUpdateCoordinator(DataUpdateCoordinator):
     fixed_price_level: int or None = None
 
     tariff_prices: Any or None = None
-
-    maxhours: Any or None = None
+    timeline: TariffTimeline or None = None
+    # Last timeline fetched to answer a price query outside the cached day
+    _query_timeline: TariffTimeline or None = None
+    # Next slot with a different price, and the timer that fires at its start
+    # (or at the end of the timeline when no change is left in it)
+    next_change: TariffSlot or None = None
+    _unsub_price_change: CALLBACK_TYPE or None = None
+    _price_timer_at: datetime or None = None
+    # Price at the end of the timeline, while the next day's price is not known yet
+    _price_before_gap: float or None = None
+
+    maxhours: MaxHours or None = None
+    # Current month's top-3 max-hour average and its end-of-month projection
+    capacity_average: float or None = None
+    projection: CapacityProjection or None = None
+    profile_report: dict[str, Any] or None = None
     mapped_maxhours: Any or None = None
-    meteringpoint: GridTariffCollection
-
+    meteringpoint: GridTariffCollection or None = None
+    # When a tariff fetch was last forced because the timeline ran out
+    _tariff_forced_at: datetime or None = None
 
     def __init__(
         self,
         hass: HomeAssistant,
         api: ElviaApiClient,
         tariffType: TariffType,
+        clock: Clock | None = None,
     ) -> None:
         """Initialize."""
 
         self.api = api
+        # Everything time-dependent goes through the clock, see clock.py
+        self.clock = clock or Clock()
+        self.metrics: ElviaMetrics = getattr(api, "metrics", None) or ElviaMetrics()
+        self.parser: ParseRunner = getattr(api, "parser", None) or ParseRunner()
         self.device_info = tariffType
+        self.tariffType = tariffType
+        self.history = MaxHoursHistory(hass, str(api._metering_point_id))
+        self.capacity = CapacityProjector()
+        self.guard = CapacityGuard()
+        self.pattern = TariffPattern(hass, str(api._metering_point_id))
+        self.local_store = LocalTariffStore(hass, str(api._metering_point_id))
+        # Today's timeline, so the current hour is known right after a restart
+        self._timeline_store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.timeline.{api._metering_point_id}"
+        )
+        self.backfill = TariffBackfill(
+            hass,
+            api,
+            str(api._metering_point_id),
+            [StatisticsSink(hass, str(api._metering_point_id)), self.local_store],
+        )
+
+        # Tariff type was just fetched during setup, so it is first due in a week.
+        self.scheduler = RefreshScheduler()
+        for policy in DEFAULT_POLICIES:
+            first_due = (
+                self.clock.now() + TARIFFTYPE_REFRESH_INTERVAL
+                if policy.name == SOURCE_TARIFFTYPE
+                else None
+            )
+            self.scheduler.register(policy, first_due)
 
         self._attr_device_info = DeviceInfo(
             name=self.device_info.title,
@@ -66,90 +156,497 @@ class ElviaDataUpdateCoordinator(DataUpdateCoordinator):
     async def _async_update_data(self) -> dict[str, Any] | None:
         """Update data via library."""
 
-        # Only update values once every hour, at the start of the hour.
-        current_hour = datetime.now().time().hour
-        if current_hour == self.last_hour_fetched:
-            # Already fetched for this hour — return the last known data instead
+        now = self.clock.now()
+
+        # The tariff timeline only covers the fetched day; refetch as soon as it runs out,
+        # but no more than once per retry delay if the fetch fails or still misses now.
+        if (
+            self.timeline is not None
+            and not self.timeline.covers(now)
+            and (
+                self._tariff_forced_at is None
+                or now - self._tariff_forced_at >= REFRESH_RETRY_DELAY
+            )
+        ):
+            self._tariff_forced_at = now
+            self.scheduler.force(SOURCE_TARIFF)
+
+        due = self.scheduler.due(now)
+        current_slot = int(now.timestamp()) // self.slot_seconds
+        if not due and current_slot == self.last_slot_fetched:
+            # Nothing due and still the same slot — return the last known data instead
             return getattr(self, "data", None)
 
-        self.last_hour_fetched = current_hour
-
-        try:
+        self.last_slot_fetched = current_slot
+
+        start = perf_counter()
+
+        errors: list[Exception] = []
+        for source in due:
+            try:
+                hint = await self._async_refresh_source(source)
+            except (
+                ApiClientException,
+                Error,
+                ClientConnectorError,
+                KeyError,
+                TypeError,
+            ) as error:
+                LOGGER.warning("Refreshing %s failed: %s", source, error)
+                self.scheduler.mark_failed(source, now)
+                self.metrics.increment("retries", source)
+                errors.append(error)
+            else:
+                self.scheduler.mark_done(source, now, hint)
+
+        if errors and (self.data is None or len(errors) == len(due)):
+            LOGGER.error("Update error %s", errors[0])
+            raise UpdateFailed(errors[0]) from errors[0]
+
+        # Resolve the current hour from the cached timeline, no network needed.
+        self.map_current_values(now)
+        self.update_projection(now)
+
+        self.metrics.observe("refresh_ms", "total", (perf_counter() - start) * 1000)
+
+        return self._build_data()
+
+    async def _async_refresh_source(self, source: str) -> Any:
+        """Fetch and map one data source. Returns a scheduling hint."""
+
+        if source == SOURCE_TARIFF:
+            # Always fetched: the capacity level, and with it the fixed prices, can
+            # change any day. The learned pattern only answers unpublished days.
             self.meteringpoint = await self.api.meteringpoint()
+            with self.metrics.timer("map_ms", source):
+                await self.map_meteringpoint_values(self.meteringpoint)
+            if self.timeline is not None:
+                try:
+                    await self.local_store.async_write(self.timeline.slots)
+                except (OSError, TypeError, ValueError) as error:
+                    # The local history is a convenience; never fail the refresh over it.
+                    LOGGER.warning("Storing tariff history failed: %s", error)
+                await self._timeline_store.async_save(
+                    {"slots": self.timeline.as_rows()}
+                )
+            return None
+
+        if source == SOURCE_MAXHOURS:
             self.maxhours = await self.api.maxhours()
+            with self.metrics.timer("map_ms", source):
+                await self.map_maxhour_values(self.maxhours)
+            return self.maxhours_calculated_time()
+
+        if source == SOURCE_TARIFFTYPE:
+            catalog = async_get_catalog(self.hass)
+            tariff_type = await catalog.async_get(self.api, self.tariffType.tariffKey)
+            if tariff_type is not None:
+                self.tariffType = tariff_type
+            return catalog.expires_at
+
+        raise KeyError(source)
+
+    @property
+    def slot_seconds(self) -> int:
+        """Return the tariff slot length, e.g. 900 for 15-minute resolution."""
+        return slot_seconds(self.tariffType)
+
+    async def async_restore(self) -> bool:
+        """Resolve the current values from the timeline saved before a restart.
+
+        Returns True if the saved timeline covers now, so sensors have data
+        before the first fetch.
+        """
+        stored = await self._timeline_store.async_load()
+        if not stored:
+            return False
+
+        timeline = TariffTimeline.from_rows(stored.get("slots", []))
+        now = self.clock.now()
+        if not timeline.covers(now):
+            return False
+
+        self.timeline = timeline
+        self.tariff_prices = timeline.as_price_list()
+        self.map_current_values(now)
+        self.data = self._build_data()
+        return True
+
+    async def async_initial_refresh(self, semaphore: asyncio.Semaphore) -> None:
+        """Run the first refresh of a background setup, sharing a slot cap with other entries."""
+        queued = perf_counter()
+        async with semaphore:
+            self.metrics.observe(
+                "setup_wait_ms", "initial_refresh", (perf_counter() - queued) * 1000
+            )
+            with self.metrics.timer("setup_ms", "initial_refresh"):
+                await self.async_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Cancel the price change timer."""
+        await super().async_shutdown()
+        if self._unsub_price_change is not None:
+            self._unsub_price_change()
+            self._unsub_price_change = None
+
+    def _schedule_price_change(self, now: datetime) -> None:
+        """Arm a timer for the next price change, or for the end of the timeline."""
+        timeline = self.timeline
+        self.next_change = next_change = (
+            timeline.next_change(now) if timeline is not None else None
+        )
+        action: Callable[[datetime], None] | None = None
+        when: datetime | None = None
+        if next_change is not None:
+            action, when = self._async_price_changed, next_change.start
+        elif timeline is not None and timeline.slots and timeline.slots[-1].end > now:
+            # The next day's first slot may still change the price.
+            action, when = self._async_timeline_ended, timeline.slots[-1].end
+        if when == self._price_timer_at and self._unsub_price_change is not None:
+            return
+
+        if self._unsub_price_change is not None:
+            self._unsub_price_change()
+            self._unsub_price_change = None
+        self._price_timer_at = when
+        if action is not None:
+            self._unsub_price_change = self.clock.track_point_in_time(
+                self.hass, action, when
+            )
+
+    @callback
+    def _async_price_changed(self, now: datetime) -> None:
+        """Publish the new price exactly at the slot boundary."""
+        self._unsub_price_change = self._price_timer_at = None
+        slot = self.next_change
+        previous_price = self.energy_price
+        self.map_current_values(now)
+        if slot is None:
+            return
+
+        self._fire_price_changed(slot, previous_price)
+        self.async_set_updated_data(self._build_data())
+
+    @callback
+    def _async_timeline_ended(self, now: datetime) -> None:
+        """Compare the last price of the timeline with the next day's first slot.
+
+        The next day comes from a timeline refreshed ahead of time, or else from
+        the learned pattern; if neither knows it, the comparison waits for the
+        tariff refresh.
+        """
+        self._unsub_price_change = self._price_timer_at = None
+        previous_price = self.energy_price
+        if self.timeline is not None and self.timeline.covers(now):
+            slot = self.timeline.slot_at(now)
+            # Also arms the timer for the new timeline's next change.
+            self.map_current_values(now)
+        else:
+            synthesized = self.pattern.synthesize(dt_util.as_local(now).date())
+            if synthesized is None or (slot := synthesized.slot_at(now)) is None:
+                self._price_before_gap = previous_price
+                return
+            self._apply_slot(slot)
+
+        if slot.energy_price != previous_price:
+            self._fire_price_changed(slot, previous_price)
+        self.async_set_updated_data(self._build_data())
+
+    def _fire_price_changed(
+        self, slot: TariffSlot, previous_price: float | None
+    ) -> None:
+        self.hass.bus.async_fire(
+            EVENT_PRICE_CHANGED,
+            {
+                "config_entry_id": getattr(self.config_entry, "entry_id", None),
+                "previous_energy_price": previous_price,
+                "energy_price": slot.energy_price,
+                "fixed_price_hourly": slot.fixed_price_hourly,
+                "short_name": slot.short_name,
+                "is_public_holiday": slot.is_public_holiday,
+                "start": slot.start.isoformat(),
+                "end": slot.end.isoformat(),
+            },
+        )
 
-            await self.map_meteringpoint_values(self.meteringpoint)
-            await self.map_maxhour_values(self.maxhours)
+    async def async_profile_refresh(
+        self, top_n: int, force_fetch: bool = True
+    ) -> dict[str, Any]:
+        """Profile one refresh cycle and keep the report for diagnostics."""
 
-            # Build a flattened data dict for sensors to read safely.
-            data: dict[str, object] = {}
+        if force_fetch:
+            for source in (SOURCE_TARIFF, SOURCE_MAXHOURS):
+                self.scheduler.force(source)
 
-            # Keep raw objects available for diagnostics and other code.
-            data["meteringpoint"] = self.meteringpoint
-            data["maxhours"] = self.maxhours
-            data["tariff_prices"] = self.tariff_prices
+        # cProfile and tracemalloc are only loaded when a profile is asked for.
+        from .profiling import async_profile  # pylint: disable=import-outside-toplevel
 
-            # MPID (metering point id) for sensor-specific keys
-            mpid = str(self.api._metering_point_id) if hasattr(self.api, "_metering_point_id") else ""
+        self.profile_report = await async_profile(self.async_refresh, top_n)
+        return self.profile_report
 
-            # Core values
-            data["daily_tariff"] = self.energy_price
-            data[f"{mpid}_daily_tariff"] = self.energy_price
+    async def async_query_prices(
+        self, times: list[datetime], fetch: bool = True
+    ) -> list[dict[str, Any]]:
+        """Return the tariff at each time, in the order given.
 
-            data["fixed_price_hourly"] = self.fixed_price_hourly
-            data[f"{mpid}_fixed_price_hourly"] = self.fixed_price_hourly
+        Answered from the cached timeline first, then the local store (energy
+        price only), then the learned tariff pattern (marked as forecast), and
+        only then with one tariffquery covering what is left.
+        """
 
-            # Provide both a human-readable level info and the monthly numeric total
-            data["fixed_price_level"] = self.fixed_price_level_info
-            data[f"{mpid}_fixed_price_level"] = self.fixed_price_level_info
+        slots: list[TariffSlot | None] = (
+            self.timeline.slots_at(times)
+            if self.timeline is not None
+            else [None] * len(times)
+        )
+        if self._query_timeline is not None:
+            slots = [
+                slot or self._query_timeline.slot_at(when)
+                for slot, when in zip(slots, times)
+            ]
+
+        stored: dict[int, float] = {}
+        if any(slot is None for slot in slots):
+            stored = await self.hass.async_add_executor_job(
+                self._stored_prices,
+                [when for slot, when in zip(slots, times) if slot is None],
+            )
+
+        def unanswered() -> list[datetime]:
+            return [
+                when
+                for slot, when in zip(slots, times)
+                if slot is None and int(when.timestamp()) not in stored
+            ]
+
+        missing = unanswered()
+
+        # Days not fetched yet may follow from the learned tariff pattern.
+        forecast: list[bool] = [False] * len(times)
+        if missing:
+            await self.pattern.async_load()
+            days = {dt_util.as_local(when).date() for when in missing}
+            synthesized = {day: self.pattern.synthesize(day) for day in days}
+            for timeline in synthesized.values():
+                self.metrics.increment(
+                    "cache_hits" if timeline else "cache_misses", "synthesis"
+                )
+            for index, (slot, when) in enumerate(zip(slots, times)):
+                timeline = synthesized.get(dt_util.as_local(when).date())
+                if slot is None and timeline is not None:
+                    slots[index] = timeline.slot_at(when)
+                    forecast[index] = slots[index] is not None
+            missing = unanswered()
+
+        if missing and fetch:
+            self._query_timeline = await self._async_fetch_timeline(
+                min(missing), max(missing)
+            )
+            slots = [
+                slot or self._query_timeline.slot_at(when)
+                for slot, when in zip(slots, times)
+            ]
+
+        results = []
+        for slot, when, forecasted in zip(slots, times, forecast):
+            result: dict[str, Any] = {"time": when.isoformat()}
+            if slot is not None:
+                result.update(
+                    start=slot.start.isoformat(),
+                    end=slot.end.isoformat(),
+                    energy_price=slot.energy_price,
+                    fixed_price_hourly=slot.fixed_price_hourly,
+                    price_level=slot.fixed_price_level_info,
+                )
+                if forecasted:
+                    result["forecast"] = True
+            elif (price := stored.get(int(when.timestamp()))) is not None:
+                result["energy_price"] = price
+            results.append(result)
+        return results
+
+    async def async_store_consumption(self, energy: dict[int, float]) -> None:
+        """Add measured kWh per slot (keyed by slot start) to the local history."""
+        try:
+            await self.local_store.async_write_consumption(energy)
+        except (OSError, TypeError, ValueError) as error:
+            LOGGER.warning("Storing consumption history failed: %s", error)
+
+    def _stored_prices(self, times: list[datetime]) -> dict[int, float]:
+        """Look up energy prices in the local store. Runs in the executor."""
+        prices: dict[int, float] = {}
+        length = self.slot_seconds
+        for when in times:
+            timestamp = int(when.timestamp())
+            rows = self.local_store.store.range(timestamp - length + 1, timestamp + 1)
+            if len(rows.price) and not isnan(rows.price[-1]):
+                prices[timestamp] = rows.price[-1]
+        return prices
+
+    async def _async_fetch_timeline(
+        self, first: datetime, last: datetime
+    ) -> TariffTimeline:
+        """Fetch the whole local days spanning [first, last]."""
+        start = dt_util.start_of_local_day(dt_util.as_local(first))
+        end = dt_util.start_of_local_day(
+            dt_util.as_local(last).date() + timedelta(days=1)
+        )
+        if end - start > PRICE_QUERY_MAX_FETCH:
+            raise HomeAssistantError(
+                f"Cannot fetch more than {PRICE_QUERY_MAX_FETCH.days} days of tariffs"
+            )
+
+        level_id = _fixed_price_level_id(self.meteringpoint)
+        grid_tariff = await self.api.tariffquery(
+            self.tariffType.tariffKey, start=start, end=end
+        )
+        # Not learned from: past or next-month ranges would replace the current
+        # schedule and fixed prices, which only the daily fetch keeps up to date.
+        return await self.parser.run(
+            TariffTimeline.from_grid_tariff, grid_tariff, level_id
+        )
 
-            data["fixed_price_monthly"] = self.fixed_price_level
-            data[f"{mpid}_fixed_price_monthly"] = self.fixed_price_level
+    def maxhours_calculated_time(self) -> datetime | None:
+        """Return when Elvia last calculated the max-hours, if known."""
+        try:
+            calculated = self.maxhours.meteringpoints[0].maxHoursCalculatedTime
+        except (AttributeError, IndexError):
+            return None
+        return (
+            dt_util.parse_datetime(calculated) if isinstance(calculated, str) else None
+        )
 
-            # Average max-hours
-            avg_curr = None
-            avg_prev = None
-            if self.mapped_maxhours:
-                avg_curr = self.mapped_maxhours.get("current_month", {}).get("average")
-                avg_prev = self.mapped_maxhours.get("previous_month", {}).get("average")
+    def _build_data(self) -> dict[str, Any]:
+        """Build a flattened data dict for sensors to read safely."""
 
-            data["average_max_current"] = avg_curr
-            data[f"{mpid}_average_max_current"] = avg_curr
-            data["average_max_previous"] = avg_prev
-            data[f"{mpid}_average_max_previous"] = avg_prev
+        data: dict[str, object] = {}
 
-            # Max-hours (1..3) for current and previous months, with start/end attributes
-            for month_key, suffix in (("current_month", "current"), ("previous_month", "previous")):
-                month_data = self.mapped_maxhours.get(month_key, {}) if self.mapped_maxhours else {}
-                for i in range(1, 4):
-                    base_key = f"max_hours_{suffix}_{i}"
-                    mp_key = f"{mpid}_{base_key}"
+        # Keep raw objects available for diagnostics and other code.
+        data["meteringpoint"] = self.meteringpoint
+        data["maxhours"] = self.maxhours
+        data["tariff_prices"] = self.tariff_prices
+        data["tariff_timeline"] = (
+            self.timeline.as_compact() if self.timeline is not None else None
+        )
+        data["max_hours_history"] = [
+            {"month": month["month"], "average": month["average"]}
+            for month in self.history.months
+        ]
+
+        # MPID (metering point id) for sensor-specific keys
+        mpid = (
+            str(self.api._metering_point_id)
+            if hasattr(self.api, "_metering_point_id")
+            else ""
+        )
+
+        # Core values
+        data["daily_tariff"] = self.energy_price
+        data[f"{mpid}_daily_tariff"] = self.energy_price
+
+        data["fixed_price_hourly"] = self.fixed_price_hourly
+        data[f"{mpid}_fixed_price_hourly"] = self.fixed_price_hourly
 
-                    entry = month_data.get(str(i), {}) if isinstance(month_data, dict) else {}
+        # Provide both a human-readable level info and the monthly numeric total
+        data["fixed_price_level"] = self.fixed_price_level_info
+        data[f"{mpid}_fixed_price_level"] = self.fixed_price_level_info
 
-                    value = entry.get("value") if isinstance(entry, dict) else None
-                    start = entry.get("startTime") if isinstance(entry, dict) else None
-                    end = entry.get("endTime") if isinstance(entry, dict) else None
+        data["fixed_price_monthly"] = self.fixed_price_level
+        data[f"{mpid}_fixed_price_monthly"] = self.fixed_price_level
 
-                    data[base_key] = value
-                    data[mp_key] = value
-                    data[f"{base_key}_start"] = start
-                    data[f"{mp_key}_start"] = start
-                    data[f"{base_key}_end"] = end
-                    data[f"{mp_key}_end"] = end
+        # Next price change, from the cached timeline
+        next_change = self.next_change
+        data["next_price_change"] = next_change.start if next_change else None
+        data["next_energy_price"] = next_change.energy_price if next_change else None
+        data["next_price_short_name"] = next_change.short_name if next_change else None
 
-            return data
-        except (Error, ClientConnectorError) as error:
-            LOGGER.error("Update error %s", error)
-            raise UpdateFailed(error) from error
+        # End-of-month capacity projection
+        projection = self.projection
+        data["capacity_projected_average"] = projection.average if projection else None
+        data["capacity_projected_average_low"] = (
+            projection.average_low if projection else None
+        )
+        data["capacity_projected_average_high"] = (
+            projection.average_high if projection else None
+        )
+        data["capacity_projected_level"] = projection.level_info if projection else None
+        data["capacity_projected_cost"] = (
+            projection.monthly_cost if projection else None
+        )
+        data["capacity_projected_cost_low"] = (
+            projection.monthly_cost_low if projection else None
+        )
+        data["capacity_projected_cost_high"] = (
+            projection.monthly_cost_high if projection else None
+        )
+        data["capacity_month_progress"] = (
+            projection.month_progress if projection else None
+        )
 
-    def getMonth(self, object, index):
+        # Performance counters for the diagnostic sensors
+        refresh = self.metrics.histogram("refresh_ms", "total")
+        data["refresh_duration_ms"] = (
+            round(refresh.last, 1) if refresh and refresh.last is not None else None
+        )
+        latency = self.metrics.combined_percentile("request_latency_ms", 0.95)
+        data["api_latency_p95_ms"] = round(latency, 1) if latency is not None else None
+        data["api_latency_by_endpoint"] = {
+            label: round(histogram.percentile(0.95), 1)
+            for (name, label), histogram in self.metrics.histograms.items()
+            if name == "request_latency_ms"
+        }
+        data["api_requests"] = self.metrics.total("requests")
+        data["api_errors"] = self.metrics.total("errors")
+
+        # Average max-hours
+        avg_curr = None
+        avg_prev = None
+        if self.mapped_maxhours:
+            avg_curr = self.mapped_maxhours.get("current_month", {}).get("average")
+            avg_prev = self.mapped_maxhours.get("previous_month", {}).get("average")
+
+        data["average_max_current"] = avg_curr
+        data[f"{mpid}_average_max_current"] = avg_curr
+        data["average_max_previous"] = avg_prev
+        data[f"{mpid}_average_max_previous"] = avg_prev
+
+        # Max-hours (1..3) for current and previous months, with start/end attributes
+        for month_key, suffix in (
+            ("current_month", "current"),
+            ("previous_month", "previous"),
+        ):
+            month_data = (
+                self.mapped_maxhours.get(month_key, {}) if self.mapped_maxhours else {}
+            )
+            for i in range(1, 4):
+                base_key = f"max_hours_{suffix}_{i}"
+                mp_key = f"{mpid}_{base_key}"
+
+                entry = (
+                    month_data.get(str(i), {}) if isinstance(month_data, dict) else {}
+                )
+
+                value = entry.get("value") if isinstance(entry, dict) else None
+                start = entry.get("startTime") if isinstance(entry, dict) else None
+                end = entry.get("endTime") if isinstance(entry, dict) else None
+
+                data[base_key] = value
+                data[mp_key] = value
+                data[f"{base_key}_start"] = start
+                data[f"{mp_key}_start"] = start
+                data[f"{base_key}_end"] = end
+                data[f"{mp_key}_end"] = end
+
+        return data
+
+    def getMonth(self, aggregate: MaxHoursAggregate, index: int) -> dict[str, Any]:
         try:
+            max_hour = aggregate.maxHours[index]
             return {
-                "value": object['maxHours'][index]['value'],
-                "startTime": object['maxHours'][index]['startTime'],
-                "endTime": object['maxHours'][index]['endTime'],
-                "uom": object['maxHours'][index]['uom'],
+                "value": max_hour.value,
+                "startTime": max_hour.startTime,
+                "endTime": max_hour.endTime,
+                "uom": max_hour.uom,
             }
         except IndexError:
             LOGGER.debug("Maxhour not found for day %s in month", index)
@@ -160,91 +657,95 @@ class ElviaDataUpdateCoordinator(DataUpdateCoordinator):
                 "uom": "",
             }
 
-    async def map_maxhour_values(self, data) -> None:
+    async def map_maxhour_values(self, data: MaxHours) -> None:
 
         self.mapped_maxhours = {}
 
-        for aggregateMonth in data['meteringpoints'][0]['maxHoursAggregate']:
-            month = "current_month" if aggregateMonth['noOfMonthsBack'] == 0 else "previous_month"
+        meteringpoint = data.meteringpoints[0]
+        for aggregateMonth in meteringpoint.maxHoursAggregate:
+            month = (
+                "current_month"
+                if aggregateMonth.noOfMonthsBack == 0
+                else "previous_month"
+            )
             self.mapped_maxhours[month] = {
                 "1": self.getMonth(aggregateMonth, 2),
                 "2": self.getMonth(aggregateMonth, 1),
                 "3": self.getMonth(aggregateMonth, 0),
-                "average": aggregateMonth['averageValue'],
-                "uom": aggregateMonth['uom']
+                "average": aggregateMonth.averageValue,
+                "uom": aggregateMonth.uom,
             }
 
-    async def map_meteringpoint_values(self, data) -> None:
-        """Map values."""
-
-        current_datetime = datetime.now()
+        await self.history.async_load()
+        self.history.update(meteringpoint, self.clock.now())
 
-        zoneadjust = "+02:00" if localtime().tm_isdst > 0 else "+01:00"
-
-        pretty_now = (
-            str(current_datetime.year)
-            + "-"
-            + str(current_datetime.month).zfill(2)
-            + "-"
-            + str(current_datetime.day).zfill(2)
-            + "T"
-            + str(current_datetime.hour).zfill(2)
-            + ":"
-            + str(current_datetime.minute).zfill(2)
-            + ":"
-            + str(current_datetime.second).zfill(2)
-            + zoneadjust
+        current_month = self.clock.now().strftime("%Y-%m")
+        self.capacity.set_history(
+            month["average"]
+            for month in self.history.months
+            if month["month"] != current_month
         )
-
-        today_string = (
-            str(current_datetime.year)
-            + "-"
-            + str(current_datetime.month).zfill(2)
-            + "-"
-            + str(current_datetime.day).zfill(2)
+        current = next(
+            (
+                aggregate
+                for aggregate in meteringpoint.maxHoursAggregate
+                if aggregate.noOfMonthsBack == 0
+            ),
+            None,
         )
+        self.capacity_average = current.averageValue if current else None
+        if current:
+            self.guard.set_max_hours(
+                (start, max_hour.value)
+                for max_hour in current.maxHours
+                if (start := dt_util.parse_datetime(max_hour.startTime)) is not None
+            )
 
-        self.tariffType = data.gridTariff.tariffType
+    async def map_meteringpoint_values(self, data) -> None:
+        """Map values."""
 
-        tariff_price = data.gridTariff.tariffPrice
-
-        first_metering_point = next(data.meteringPointsAndPriceLevels)
-        fixed_price_level_id = first_metering_point.currentFixedPriceLevel.levelId
-
-        self.tariff_prices = []
-
-        for hour in tariff_price.hours:
-            start_time = hour.startTime
-            end_time = hour.expiredAt
-            value = hour.energyPrice.total
-
-            self.tariff_prices.append({
-                "startTime": start_time,
-                "endTime": end_time,
-                "total": value,
-            })
-
-            if start_time[0:10] == today_string:
-                if (pretty_now >= start_time) and (pretty_now < end_time):
-                    variable_price_per_hour = value
-                    for_loop_break = False
-
-                    for fixed_price_element in tariff_price.priceInfo.fixedPrices:
-                        if hour.fixedPrice.id == fixed_price_element.id:
-                            for price_levels_element in fixed_price_element.priceLevels:
-
-                                if price_levels_element.id == fixed_price_level_id:
-                                    hour_prices = next(price_levels_element.hourPrices)
-                                    fixed_price_per_hour = hour_prices.total
-                                    fixed_price_level_info = (
-                                        price_levels_element.levelInfo
-                                    )
-                                    fixed_price = price_levels_element.monthlyTotal
-                                    for_loop_break = True
-                                    break
-                            if for_loop_break is True:
-                                self.energy_price = variable_price_per_hour
-                                self.fixed_price_hourly = fixed_price_per_hour
-                                self.fixed_price_level_info = fixed_price_level_info
-                                self.fixed_price_level = fixed_price
-                                break
+        self.tariffType = data.gridTariff.tariffType
+        async_get_catalog(self.hass).add(self.tariffType)
+        self.capacity.set_levels(levels_from_collection(data))
+        self.guard.set_levels(self.capacity.levels)
+        await self.pattern.async_load()
+        self.pattern.learn(data.gridTariff, _fixed_price_level_id(data))
+        # Index construction follows the configured parse mode, like the parsing itself.
+        self.timeline, self.tariff_prices = await self.parser.run(_build_timeline, data)
+
+        self.map_current_values(self.clock.now())
+
+    def update_projection(self, now: datetime) -> None:
+        """Project the month's capacity level from the latest max-hours."""
+        if self.capacity_average is None:
+            self.projection = None
+            return
+        self.projection = self.capacity.project(self.capacity_average, now)
+
+    def map_current_values(self, now: datetime) -> None:
+        """Set the current-hour values from the cached timeline."""
+
+        if self.timeline is None:
+            return
+
+        self._schedule_price_change(now)
+
+        slot = self.timeline.slot_at(now)
+        if slot is None:
+            self.metrics.increment("cache_misses", "timeline")
+            return
+        self.metrics.increment("cache_hits", "timeline")
+
+        if self._price_before_gap is not None:
+            # The timeline ran out before the next day was known; compare now.
+            previous_price, self._price_before_gap = self._price_before_gap, None
+            if slot.energy_price != previous_price:
+                self._fire_price_changed(slot, previous_price)
+        self._apply_slot(slot)
+
+    def _apply_slot(self, slot: TariffSlot) -> None:
+        self.energy_price = slot.energy_price
+        if slot.fixed_price_hourly is not None:
+            self.fixed_price_hourly = slot.fixed_price_hourly
+            self.fixed_price_level_info = slot.fixed_price_level_info
+            self.fixed_price_level = slot.fixed_price_monthly
@@ -0,0 +1,197 @@
+"""Running energy cost for the Elvia integration.
+
+Consumption from a linked power (W, kW) or energy (Wh, kWh, MWh) sensor is
+priced with the grid tariff as each state change arrives. Power readings are
+integrated over the time since the previous reading and split at tariff slot
+boundaries, so every kWh gets the price of the slot it was used in. Energy
+readings are priced at the slot of the new reading. Each update only touches
+the slots it spans, so the cost stays O(1) per state change.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.const import (
+    ATTR_UNIT_OF_MEASUREMENT,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+)
+from homeassistant.core import State
+from homeassistant.util import dt as dt_util
+
+from .timeline import TariffTimeline
+
+POWER_UNITS = {"W": 0.001, "kW": 1.0}
+ENERGY_UNITS = {"Wh": 0.001, "kWh": 1.0, "MWh": 1000.0}
+
+READING_POWER = "power"
+READING_ENERGY = "energy"
+
+
+def reading_from_state(state: State | None) -> tuple[str, float] | None:
+    """Return ("power", kW) or ("energy", kWh) from a meter sensor state."""
+    if state is None or state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
+        return None
+    try:
+        value = float(state.state)
+    except ValueError:
+        return None
+    unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+    if unit in POWER_UNITS:
+        return READING_POWER, value * POWER_UNITS[unit]
+    if unit in ENERGY_UNITS:
+        return READING_ENERGY, value * ENERGY_UNITS[unit]
+    return None
+
+
+class CostAccumulator:
+    """Daily and monthly consumption and cost totals for one meter."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.day: str | None = None
+        self.month: str | None = None
+        self.cost_today = 0.0
+        self.cost_month = 0.0
+        self.energy_today = 0.0
+        # Consumption that fell in a slot without a known price
+        self.unpriced_energy_today = 0.0
+        self.last_time: datetime | None = None
+        self.last_power: float | None = None  # kW
+        self.last_energy: float | None = None  # kWh meter reading
+        # kWh per priced slot (epoch seconds of its start) not yet stored
+        self.slot_energy: dict[int, float] = {}
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the totals for storage."""
+        return {
+            "day": self.day,
+            "month": self.month,
+            "cost_today": self.cost_today,
+            "cost_month": self.cost_month,
+            "energy_today": self.energy_today,
+            "unpriced_energy_today": self.unpriced_energy_today,
+            "last_time": self.last_time.isoformat() if self.last_time else None,
+            "last_power": self.last_power,
+            "last_energy": self.last_energy,
+            "slot_energy": {
+                str(start): energy for start, energy in self.slot_energy.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> CostAccumulator:
+        """Restore totals saved with as_dict."""
+        accumulator = cls()
+        for key in (
+            "day",
+            "month",
+            "cost_today",
+            "cost_month",
+            "energy_today",
+            "unpriced_energy_today",
+            "last_power",
+            "last_energy",
+        ):
+            if key in data:
+                setattr(accumulator, key, data[key])
+        accumulator.slot_energy = {
+            int(start): energy for start, energy in data.get("slot_energy", {}).items()
+        }
+        if data.get("last_time"):
+            accumulator.last_time = dt_util.parse_datetime(data["last_time"])
+        return accumulator
+
+    def roll_over(self, when: datetime) -> None:
+        """Start new day and month totals when `when` is past them."""
+        local = dt_util.as_local(when)
+        day, month = local.strftime("%Y-%m-%d"), local.strftime("%Y-%m")
+        if self.day is not None and day < self.day:
+            # A late reading from before the last rollover; keep today's totals.
+            return
+        if month != self.month:
+            self.month, self.cost_month = month, 0.0
+        if day != self.day:
+            self.day = day
+            self.cost_today = self.energy_today = self.unpriced_energy_today = 0.0
+
+    def _add(
+        self, when: datetime, energy: float, timeline: TariffTimeline | None
+    ) -> None:
+        """Add energy (kWh) used at `when`."""
+        self.roll_over(when)
+        slot = timeline.slot_at(when) if timeline is not None else None
+        self.energy_today += energy
+        if slot is None:
+            self.unpriced_energy_today += energy
+            return
+        start = int(slot.start.timestamp())
+        self.slot_energy[start] = self.slot_energy.get(start, 0.0) + energy
+        cost = energy * slot.energy_price
+        self.cost_today += cost
+        self.cost_month += cost
+
+    def pop_finished_slots(self) -> dict[int, float]:
+        """Return and forget the energy of every slot but the newest one.
+
+        Readings arrive in time order, so only the newest slot can still grow.
+        """
+        if len(self.slot_energy) < 2:
+            return {}
+        newest = max(self.slot_energy)
+        finished = {
+            start: energy
+            for start, energy in self.slot_energy.items()
+            if start != newest
+        }
+        self.slot_energy = {newest: self.slot_energy[newest]}
+        return finished
+
+    def add_power(
+        self, when: datetime, power: float, timeline: TariffTimeline | None
+    ) -> None:
+        """Integrate the previous power reading up to `when`, then keep `power` (kW)."""
+
+        if (
+            self.last_time is not None
+            and self.last_power is not None
+            and when > self.last_time
+        ):
+            start = self.last_time
+            while start < when:
+                # Split at tariff slot boundaries and local midnight.
+                end = min(
+                    when,
+                    dt_util.start_of_local_day(
+                        dt_util.as_local(start) + timedelta(days=1)
+                    ),
+                )
+                if (
+                    timeline is not None
+                    and (slot := timeline.slot_at(start)) is not None
+                ):
+                    end = min(end, slot.end)
+                hours = (end - start).total_seconds() / 3600
+                self._add(start, self.last_power * hours, timeline)
+                start = end
+        else:
+            self.roll_over(when)
+
+        self.last_time = when
+        self.last_power = power
+
+    def add_energy(
+        self, when: datetime, reading: float, timeline: TariffTimeline | None
+    ) -> None:
+        """Price the increase of a cumulative energy meter reading (kWh)."""
+
+        previous = self.last_energy
+        self.last_time = when
+        self.last_energy = reading
+        # A decrease is a meter reset; start counting from the new reading.
+        if previous is None or reading < previous:
+            self.roll_over(when)
+            return
+        self._add(when, reading - previous, timeline)
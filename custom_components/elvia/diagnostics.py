@@ -2,47 +2,91 @@
 
 from __future__ import annotations
 
-import json
-from typing import Any
+from functools import lru_cache
+from typing import Any, Callable
 
+import attr
+
+from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_API_KEY
 from homeassistant.core import HomeAssistant
 
-from custom_components.elvia.const import DOMAIN
+from custom_components.elvia.const import (
+    CONF_METERING_POINT_ID,
+    CONF_TOKEN,
+    DIAGNOSTICS_MAX_ITEMS,
+    DOMAIN,
+)
 from custom_components.elvia.coordinator import ElviaDataUpdateCoordinator
 
+TO_REDACT = {
+    CONF_API_KEY,
+    CONF_TOKEN,
+    CONF_METERING_POINT_ID,
+    "meteringPointId",
+    "companyOrgNo",
+}
+
+
+def _cap(items: list[Any], convert: Callable[[Any], Any]) -> list[Any]:
+    """Convert at most DIAGNOSTICS_MAX_ITEMS items and note how many were left out."""
+    converted = [convert(item) for item in items[:DIAGNOSTICS_MAX_ITEMS]]
+    if len(items) > DIAGNOSTICS_MAX_ITEMS:
+        converted.append({"truncated": len(items) - DIAGNOSTICS_MAX_ITEMS})
+    return converted
+
+
+def _to_plain(value: Any) -> Any:
+    """Convert models, containers and scalars to JSON-friendly values."""
+    if attr.has(type(value)):
+        return _converter(type(value))(value)
+    if isinstance(value, dict):
+        return {key: _to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return _cap(list(value), _to_plain)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+@lru_cache(maxsize=None)
+def _converter(cls: type) -> Callable[[Any], dict[str, Any]]:
+    """Build, once per attrs class, a converter that skips attr.asdict's introspection."""
+    names = tuple(field.name for field in attr.fields(cls))
+
+    def convert(instance: Any) -> dict[str, Any]:
+        return {name: _to_plain(getattr(instance, name)) for name in names}
+
+    return convert
+
+
+def _export(snapshot: dict[str, Any]) -> dict[str, Any]:
+    """Serialize a snapshot of the coordinator. Runs in the executor."""
+    return async_redact_data(_to_plain(snapshot), TO_REDACT)
+
 
 async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, config_entry: ConfigEntry
 ) -> dict:
     """Return diagnostics for a config entry."""
 
-    diagnostics: dict[str, Any] = {}
-
     coordinator: ElviaDataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
-    # Coordinator.data is a flattened dict (see coordinator._async_update_data).
-    # Try to obtain the raw meteringpoint/GridTariffCollection from coordinator attributes
-    # or from the flattened dict (key "meteringpoint").
-    raw = getattr(coordinator, "meteringpoint", None)
-    if raw is None and isinstance(coordinator.data, dict):
-        raw = coordinator.data.get("meteringpoint")
-
-    if raw is None:
-        return diagnostics
-
-    # Be defensive: ensure the raw object contains the expected attributes
-    grid = getattr(raw, "gridTariff", None)
-    mp_and_levels = getattr(raw, "meteringPointsAndPriceLevels", None)
-
-    if grid is None:
-        # Nothing useful to return for diagnostics
-        return diagnostics
-
-    diagnostics["tariffPrice"] = json.dumps(grid.tariffPrice, default=str)
-    diagnostics["tariffType"] = json.dumps(grid.tariffType, default=str)
-    if mp_and_levels is not None:
-        diagnostics["meteringPointsAndPriceLevels"] = json.dumps(
-            mp_and_levels, default=str
-        )
-
-    return diagnostics
\ No newline at end of file
+
+    # Grab references on the event loop; converting them is left to the executor.
+    # Models are not mutated after parsing, and each refresh replaces them wholesale.
+    snapshot: dict[str, Any] = {
+        "entry": dict(config_entry.data),
+        "metrics": coordinator.metrics.as_dict(),
+        "schedule": coordinator.scheduler.as_dict(),
+        "backfill": coordinator.backfill.progress,
+        "request_queue": coordinator.api.queue.as_dict(),
+        "meteringpoint": coordinator.meteringpoint,
+        "maxhours": coordinator.maxhours,
+        "maxhours_history": coordinator.history.months,
+        "tariff_prices": coordinator.tariff_prices or [],
+    }
+    if coordinator.profile_report is not None:
+        snapshot["profile"] = coordinator.profile_report
+
+    return await hass.async_add_executor_job(_export, snapshot)
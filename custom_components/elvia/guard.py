@@ -0,0 +1,188 @@
+"""Live capacity guard for the Elvia integration.
+
+Elvia reports max hours some time after the hour has ended, which is too late
+to avoid a higher capacity step. The guard follows a live power or energy
+sensor instead. It projects the energy of the current clock hour from each
+reading, and compares that with how much energy the hour may use before the
+month's top-3 average passes the current level's `valueMax`.
+
+The limit only changes when the top-3 set or the levels change (at most once
+an hour). Each reading is O(1).
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Iterable, NamedTuple
+
+from homeassistant.util import dt as dt_util
+
+from .capacity import CapacityLevel
+
+# Warn when the projected hour reaches this share of the limit
+GUARD_MARGIN = 0.9
+
+
+class GuardStatus(NamedTuple):
+    """The guard's view of the current hour."""
+
+    hour_start: datetime
+    hour_energy: float  # kWh used so far this hour
+    projected: float  # kWh at the end of the hour at the current power
+    limit: (
+        float | None
+    )  # kWh the hour may reach without a level step; None at the top level
+    headroom_power: float | None  # average kW allowed for the rest of the hour
+    warning: bool  # projected >= GUARD_MARGIN * limit
+    exceeding: bool  # projected > limit
+
+
+def _hour_start(when: datetime) -> datetime:
+    # Norwegian UTC offsets are whole hours, so UTC hours are local hours.
+    return dt_util.as_utc(when).replace(minute=0, second=0, microsecond=0)
+
+
+class CapacityGuard:
+    """Projects the current hour against the month's capacity level."""
+
+    def __init__(self, margin: float = GUARD_MARGIN) -> None:
+        """Initialize."""
+        self.margin = margin
+        self.levels: list[CapacityLevel] = []
+        self.month: str | None = None
+        # Local day -> highest hourly kWh of that day, this month
+        self._days: dict[date, float] = {}
+        self._limits: dict[date, float | None] = {}
+        self.hour_start: datetime | None = None
+        self.hour_energy = 0.0
+        self.last_time: datetime | None = None
+        self.last_power: float | None = None  # kW
+        self.last_energy: float | None = None  # kWh meter reading
+
+    def set_levels(self, levels: list[CapacityLevel]) -> None:
+        """Use the capacity levels from the latest tariff."""
+        self.levels = levels
+        self._limits = {}
+
+    def set_max_hours(self, max_hours: Iterable[tuple[datetime, float]]) -> None:
+        """Merge this month's max hours as reported by Elvia."""
+        for start, value in max_hours:
+            self._add_hour(start, value)
+
+    def _add_hour(self, start: datetime, energy: float) -> None:
+        local = dt_util.as_local(start)
+        month = local.strftime("%Y-%m")
+        if month != self.month:
+            if self.month is not None and month < self.month:
+                return
+            self.month, self._days = month, {}
+        if energy > self._days.get(local.date(), 0.0):
+            self._days[local.date()] = energy
+            self._limits = {}
+
+    def limit_for(self, day: date) -> float | None:
+        """Return how much energy an hour of `day` may use without a level step."""
+
+        if day in self._limits:
+            return self._limits[day]
+
+        current = sorted(self._days.values(), reverse=True)[:3]
+        average = sum(current) / len(current) if current else 0.0
+        # If the hour makes the top-3, it joins the two highest other days.
+        others = sorted(
+            (value for key, value in self._days.items() if key != day), reverse=True
+        )[:2]
+
+        limit: float | None = None
+        for level in self.levels:
+            if level.value_min <= average < level.value_max:
+                if level.value_max != float("inf"):
+                    limit = level.value_max * (len(others) + 1) - sum(others)
+                break
+
+        self._limits[day] = limit
+        return limit
+
+    def _roll(self, when: datetime) -> None:
+        """Close the previous hour if `when` is in a new one."""
+        hour_start = _hour_start(when)
+        if hour_start == self.hour_start:
+            return
+        if self.hour_start is not None and self.hour_energy > 0:
+            self._add_hour(self.hour_start, self.hour_energy)
+        self.hour_start, self.hour_energy = hour_start, 0.0
+
+    def add_power(self, when: datetime, power: float) -> GuardStatus:
+        """Add a power reading (kW) and return the updated status."""
+
+        if (
+            self.last_time is not None
+            and self.last_power is not None
+            and when > self.last_time
+        ):
+            start = self.last_time
+            while start < when:
+                self._roll(start)
+                end = min(when, self.hour_start + timedelta(hours=1))
+                self.hour_energy += (
+                    self.last_power * (end - start).total_seconds() / 3600
+                )
+                start = end
+        self._roll(when)
+        self.last_time, self.last_power = when, power
+        return self.status(when)
+
+    def add_energy(self, when: datetime, reading: float) -> GuardStatus:
+        """Add a cumulative energy reading (kWh) and return the updated status."""
+
+        previous, previous_time = self.last_energy, self.last_time
+        self.last_energy = reading
+        power = None
+        if (
+            previous is not None
+            and previous_time is not None
+            and reading >= previous
+            and when > previous_time
+        ):
+            # The increase since the previous reading, as an average power
+            power = (reading - previous) / (
+                (when - previous_time).total_seconds() / 3600
+            )
+            self.last_power = power
+            self.add_power(when, power)
+        else:
+            self._roll(when)
+            self.last_time, self.last_power = when, power
+        return self.status(when)
+
+    def status(self, when: datetime) -> GuardStatus:
+        """Return the projection for the hour containing `when`.
+
+        The last power is assumed to continue since the last reading. Only the
+        next reading adds energy and closes the hour, so this can be called at
+        any time without attributing energy to the wrong hour.
+        """
+
+        hour_start = _hour_start(when)
+        hour_end = hour_start + timedelta(hours=1)
+        power = self.last_power or 0.0
+        used = self.hour_energy if hour_start == self.hour_start else 0.0
+        since = max(self.last_time or when, hour_start)
+        used += power * max(0.0, (when - since).total_seconds() / 3600)
+        remaining = max(0.0, (hour_end - when).total_seconds() / 3600)
+        projected = used + power * remaining
+        limit = self.limit_for(dt_util.as_local(when).date())
+
+        headroom = None
+        if limit is not None and remaining > 0:
+            headroom = max(0.0, (limit - used) / remaining)
+
+        return GuardStatus(
+            hour_start=hour_start,
+            hour_energy=round(used, 3),
+            projected=round(projected, 3),
+            limit=None if limit is None else round(limit, 3),
+            headroom_power=None if headroom is None else round(headroom, 3),
+            warning=limit is not None and projected >= self.margin * limit,
+            exceeding=limit is not None and projected > limit,
+        )
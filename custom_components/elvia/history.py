@@ -0,0 +1,131 @@
+"""Rolling max-hours history for the Elvia integration.
+
+The max-hours endpoint only returns the current and previous month. Each fetch
+is folded into a bounded, persisted per-MPID history so older months remain
+available without extra API calls.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    MAXHOURS_HISTORY_MONTHS,
+    MAXHOURS_HISTORY_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .models import MaxHoursAggregate, MaxHoursMeteringPoint
+
+
+def _month_key(reference: datetime, months_back: int) -> str:
+    """Return YYYY-MM for `months_back` months before `reference`."""
+    index = reference.year * 12 + reference.month - 1 - months_back
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _aggregate_month(aggregate: MaxHoursAggregate, reference: datetime) -> str:
+    """Return the month an aggregate belongs to."""
+    for hour in aggregate.maxHours:
+        start = dt_util.parse_datetime(hour.startTime)
+        if start is not None:
+            return f"{start.year:04d}-{start.month:02d}"
+    return _month_key(reference, aggregate.noOfMonthsBack)
+
+
+class MaxHoursHistory:
+    """Bounded ring buffer of monthly max-hours aggregates for one MPID."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        metering_point_id: str,
+        max_months: int = MAXHOURS_HISTORY_MONTHS,
+    ) -> None:
+        """Initialize."""
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.maxhours_history.{metering_point_id}"
+        )
+        self._months: deque[dict[str, Any]] = deque(maxlen=max_months)
+        self._loaded = False
+
+    @property
+    def months(self) -> list[dict[str, Any]]:
+        """Return the history, oldest month first."""
+        return list(self._months)
+
+    async def async_load(self) -> None:
+        """Load the persisted history once."""
+        if self._loaded:
+            return
+        self._loaded = True
+        stored = await self._store.async_load()
+        if stored:
+            self._months.extend(stored.get("months", []))
+
+    def update(
+        self, meteringpoint: MaxHoursMeteringPoint, now: datetime | None = None
+    ) -> bool:
+        """Fold a max-hours response into the history. Returns True if changed."""
+
+        reference = (
+            dt_util.parse_datetime(meteringpoint.maxHoursCalculatedTime or "")
+            or now
+            or dt_util.now()
+        )
+
+        changed = False
+        for aggregate in meteringpoint.maxHoursAggregate:
+            record = {
+                "month": _aggregate_month(aggregate, reference),
+                "average": aggregate.averageValue,
+                "uom": aggregate.uom,
+                "maxHours": [
+                    {
+                        "startTime": hour.startTime,
+                        "endTime": hour.endTime,
+                        "value": hour.value,
+                    }
+                    for hour in aggregate.maxHours
+                ],
+            }
+            changed |= self._upsert(record)
+
+        if changed:
+            self._store.async_delay_save(
+                self._data_to_save, MAXHOURS_HISTORY_SAVE_DELAY
+            )
+        return changed
+
+    def _upsert(self, record: dict[str, Any]) -> bool:
+        """Insert or replace a month, keeping months sorted and bounded."""
+
+        month = record["month"]
+        for index, existing in enumerate(self._months):
+            if existing["month"] == month:
+                if existing == record:
+                    return False
+                self._months[index] = record
+                return True
+            if existing["month"] > month:
+                if len(self._months) == self._months.maxlen:
+                    if index == 0:
+                        # Older than everything we keep
+                        return False
+                    self._months.popleft()
+                    index -= 1
+                self._months.insert(index, record)
+                return True
+
+        # Newest month; deque drops the oldest when full
+        self._months.append(record)
+        return True
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"months": list(self._months)}
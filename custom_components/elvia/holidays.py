@@ -0,0 +1,48 @@
+"""Norwegian public holiday calendar for the Elvia integration."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from functools import lru_cache
+
+
+def easter_sunday(year: int) -> date:
+    """Return Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7  # noqa: E741
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+@lru_cache(maxsize=8)
+def norwegian_holidays(year: int) -> frozenset[date]:
+    """Return the public holidays (helligdager) of a year."""
+    easter = easter_sunday(year)
+    return frozenset(
+        {
+            date(year, 1, 1),  # Nyttårsdag
+            easter - timedelta(days=3),  # Skjærtorsdag
+            easter - timedelta(days=2),  # Langfredag
+            easter,  # 1. påskedag
+            easter + timedelta(days=1),  # 2. påskedag
+            date(year, 5, 1),  # Arbeidernes dag
+            date(year, 5, 17),  # Grunnlovsdag
+            easter + timedelta(days=39),  # Kristi himmelfartsdag
+            easter + timedelta(days=49),  # 1. pinsedag
+            easter + timedelta(days=50),  # 2. pinsedag
+            date(year, 12, 25),  # 1. juledag
+            date(year, 12, 26),  # 2. juledag
+        }
+    )
+
+
+def is_public_holiday(day: date) -> bool:
+    """Return True if `day` is a Norwegian public holiday."""
+    return day in norwegian_holidays(day.year)
@@ -0,0 +1,209 @@
+"""Performance counters and histograms for the Elvia integration."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Iterator
+
+# Upper bounds; the last bucket is +Inf.
+MS_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000)
+BYTES_BUCKETS = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+HISTOGRAM_WINDOW = 256
+
+METRIC_HELP = {
+    "request_latency_ms": "API request latency in milliseconds",
+    "response_bytes": "API response body size in bytes",
+    "decode_ms": "Time spent decoding JSON in milliseconds",
+    "parse_ms": "Time spent turning a response into models in milliseconds",
+    "map_ms": "Time spent mapping models to sensor values in milliseconds",
+    "refresh_ms": "Duration of a coordinator refresh in milliseconds",
+    "setup_ms": "Time spent setting up a config entry in milliseconds",
+    "setup_wait_ms": "Time an initial refresh waited for a setup slot in milliseconds",
+    "timeout_ms": "Timeout applied to API requests in milliseconds",
+    "queue_wait_ms": "Time an API request waited for a request slot in milliseconds",
+    "requests": "API requests made",
+    "hedged_requests": "GET requests sent a second time after the p95 delay",
+    "hedge_wins": "Hedged requests answered first by the second request",
+    "throttled": "API requests answered with 429 Too Many Requests",
+    "errors": "API requests that failed",
+    "retries": "Refreshes retried after a failure",
+    "cache_hits": "Lookups served from a cache",
+    "cache_misses": "Lookups that needed the network",
+}
+
+
+class Histogram:
+    """Bucketed histogram that also keeps a window of recent samples."""
+
+    __slots__ = ("buckets", "counts", "count", "total", "maximum", "recent")
+
+    def __init__(self, buckets: tuple[float, ...] = MS_BUCKETS) -> None:
+        """Initialize."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.recent: deque[float] = deque(maxlen=HISTOGRAM_WINDOW)
+
+    def observe(self, value: float) -> None:
+        """Record a sample."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+        self.recent.append(value)
+
+    def percentile(self, quantile: float) -> float | None:
+        """Return a percentile (0-1) over the recent window."""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    @property
+    def last(self) -> float | None:
+        """Return the most recent sample."""
+        return self.recent[-1] if self.recent else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a summary for diagnostics."""
+        summary: dict[str, Any] = {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+            "max": self.maximum,
+        }
+        return {
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in summary.items()
+        }
+
+
+class ElviaMetrics:
+    """Counters and histograms for one API client and its coordinator.
+
+    Histograms and counters are keyed by (metric name, label); the label is the
+    endpoint, data source or cache name.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.counters: defaultdict[tuple[str, str], int] = defaultdict(int)
+
+    def observe(self, name: str, label: str, value: float) -> None:
+        """Record a histogram sample."""
+        key = (name, label)
+        if (histogram := self.histograms.get(key)) is None:
+            buckets = BYTES_BUCKETS if name.endswith("bytes") else MS_BUCKETS
+            histogram = self.histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+    def increment(self, name: str, label: str, amount: int = 1) -> None:
+        """Increment a counter."""
+        self.counters[(name, label)] += amount
+
+    @contextmanager
+    def timer(self, name: str, label: str) -> Iterator[None]:
+        """Record the duration of a block in milliseconds."""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, label, (perf_counter() - start) * 1000)
+
+    def histogram(self, name: str, label: str) -> Histogram | None:
+        """Return a histogram if it has samples."""
+        return self.histograms.get((name, label))
+
+    def percentile(self, name: str, label: str, quantile: float) -> float | None:
+        """Return a percentile for one histogram."""
+        histogram = self.histograms.get((name, label))
+        return histogram.percentile(quantile) if histogram else None
+
+    def combined_percentile(self, name: str, quantile: float) -> float | None:
+        """Return a percentile over the recent samples of all labels."""
+        samples = sorted(
+            value
+            for (metric, _), histogram in self.histograms.items()
+            if metric == name
+            for value in histogram.recent
+        )
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(quantile * len(samples)))]
+
+    def total(self, name: str) -> int:
+        """Return a counter summed over all labels."""
+        return sum(
+            value for (metric, _), value in self.counters.items() if metric == name
+        )
+
+    def cache_hit_rate(self, label: str) -> float | None:
+        """Return the hit rate for one cache."""
+        hits = self.counters.get(("cache_hits", label), 0)
+        misses = self.counters.get(("cache_misses", label), 0)
+        return round(hits / (hits + misses), 3) if hits + misses else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all metrics for diagnostics."""
+        histograms: dict[str, dict[str, Any]] = defaultdict(dict)
+        for (name, label), histogram in sorted(self.histograms.items()):
+            histograms[name][label] = histogram.as_dict()
+        counters: dict[str, dict[str, int]] = defaultdict(dict)
+        for (name, label), value in sorted(self.counters.items()):
+            counters[name][label] = value
+        caches = {label for (name, label) in self.counters if name.startswith("cache_")}
+        return {
+            "histograms": dict(histograms),
+            "counters": dict(counters),
+            "cache_hit_rate": {
+                label: self.cache_hit_rate(label) for label in sorted(caches)
+            },
+        }
+
+
+def as_prometheus(metrics_by_entry: dict[str, ElviaMetrics]) -> str:
+    """Render metrics in the Prometheus text exposition format."""
+
+    # Samples of one metric must be contiguous, so group across entries first.
+    families: dict[str, tuple[str, str, list[str]]] = {}
+
+    def family(metric: str, name: str, kind: str) -> list[str]:
+        if metric not in families:
+            families[metric] = (name, kind, [])
+        return families[metric][2]
+
+    for entry_id, metrics in metrics_by_entry.items():
+        for (name, label), value in sorted(metrics.counters.items()):
+            metric = f"elvia_{name}_total"
+            family(metric, name, "counter").append(
+                f'{metric}{{entry="{entry_id}",label="{label}"}} {value}'
+            )
+
+        for (name, label), histogram in sorted(metrics.histograms.items()):
+            metric = f"elvia_{name}"
+            samples = family(metric, name, "histogram")
+            labels = f'entry="{entry_id}",label="{label}"'
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                samples.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            samples.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            samples.append(f"{metric}_sum{{{labels}}} {round(histogram.total, 3)}")
+            samples.append(f"{metric}_count{{{labels}}} {histogram.count}")
+
+    lines: list[str] = []
+    for metric, (name, kind, samples) in families.items():
+        lines.append(f"# HELP {metric} {METRIC_HELP.get(name, name)}")
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(samples)
+
+    return "\n".join(lines) + "\n"
@@ -1,10 +1,20 @@
 """Asynchronous Python client for Elvia."""
 
+from __future__ import annotations
+
+from functools import lru_cache
+import sys
 from typing import Any, List, Dict
 
 import attr
 
-from .const import LOGGER
+from .const import FLYWEIGHT_CACHE_SIZE, LOGGER
+
+
+def _intern(value: Any) -> Any:
+    """Return the shared copy of a repeated string, e.g. a unit or currency."""
+    return sys.intern(value) if isinstance(value, str) else value
+
 
 @attr.s(auto_attribs=True)
 class FixedPriceConfiguration:
@@ -15,7 +25,7 @@ class FixedPriceConfiguration:
     allDaysPerMonth: bool
     maxhoursPerMonth: float
     months: float
-    #additionalProperties
+    # additionalProperties
 
     def to_json(self):
         return "FixedPriceConfiguration"
@@ -35,6 +45,7 @@ class FixedPriceConfiguration:
             months=float(data["months"]),
         )
 
+
 @attr.s(auto_attribs=True)
 class TariffType:
 
@@ -71,12 +82,15 @@ class TariffType:
             lastUpdated=data["lastUpdated"],
             usePublicHolidayPrices=bool(data["usePublicHolidayPrices"]),
             useWeekendPrices=bool(data["useWeekendPrices"]),
-            fixedPriceConfiguration=FixedPriceConfiguration.from_dict(data["fixedPriceConfiguration"]),
+            fixedPriceConfiguration=FixedPriceConfiguration.from_dict(
+                data["fixedPriceConfiguration"]
+            ),
             powerPriceConfiguration=data["powerPriceConfiguration"],
             resolution=float(data["resolution"]),
             description=data["description"],
         )
 
+
 @attr.s(auto_attribs=True)
 class HourPrice:
 
@@ -101,6 +115,7 @@ class HourPrice:
             totalExVat=float(data["totalExVat"]),
         )
 
+
 @attr.s(auto_attribs=True)
 class PriceLevel:
 
@@ -135,18 +150,19 @@ class PriceLevel:
             valueMax=data["valueMax"],
             nextIdDown=data["nextIdDown"],
             nextIdUp=data["nextIdUp"],
-            valueUnitOfMeasure=data["valueUnitOfMeasure"],
+            valueUnitOfMeasure=_intern(data["valueUnitOfMeasure"]),
             monthlyTotal=float(data["monthlyTotal"]),
             monthlyTotalExVat=float(data["monthlyTotalExVat"]),
             monthlyExTaxes=float(data["monthlyExTaxes"]),
             monthlyTaxes=float(data["monthlyTaxes"]),
-            monthlyUnitOfMeasure=data["monthlyUnitOfMeasure"],
-            hourPrices=(HourPrice.from_dict(price) for price in data["hourPrices"]),
+            monthlyUnitOfMeasure=_intern(data["monthlyUnitOfMeasure"]),
+            hourPrices=[HourPrice.from_dict(price) for price in data["hourPrices"]],
             levelInfo=data["levelInfo"],
-            currency=data["currency"],
-            monetaryUnitOfMeasure=data["monetaryUnitOfMeasure"],
+            currency=_intern(data["currency"]),
+            monetaryUnitOfMeasure=_intern(data["monetaryUnitOfMeasure"]),
         )
 
+
 @attr.s(auto_attribs=True)
 class FixedPrice:
 
@@ -168,9 +184,10 @@ class FixedPrice:
             id=data["id"],
             startDate=data["startDate"],
             endDate=data["endDate"],
-            priceLevels=(PriceLevel.from_dict(price) for price in data["priceLevels"]),
+            priceLevels=[PriceLevel.from_dict(price) for price in data["priceLevels"]],
         )
 
+
 @attr.s(auto_attribs=True)
 class EnergyPrice:
 
@@ -199,18 +216,20 @@ class EnergyPrice:
             id=data["id"],
             startDate=data["startDate"],
             endDate=data["endDate"],
-            season=data["season"],
-            level=data["level"],
+            season=_intern(data["season"]),
+            level=_intern(data["level"]),
             total=float(data["total"]),
             totalExVat=float(data["totalExVat"]),
             energyExTaxes=float(data["energyExTaxes"]),
             taxes=float(data["taxes"]),
-            currency=data["currency"],
-            monetaryUnitOfMeasure=data["monetaryUnitOfMeasure"],
+            currency=_intern(data["currency"]),
+            monetaryUnitOfMeasure=_intern(data["monetaryUnitOfMeasure"]),
         )
 
-@attr.s(auto_attribs=True)
+
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class FixedPriceHour:
+    """Shared by every hour with the same price; instances are immutable."""
 
     id: str
     hourId: str
@@ -224,13 +243,18 @@ class FixedPriceHour:
 
         LOGGER.debug("FixedPriceHour=%s", data)
 
-        return FixedPriceHour(
-            id=data["id"],
-            hourId=data["hourId"],
-        )
+        return FixedPriceHour.shared(data["id"], data["hourId"])
 
-@attr.s(auto_attribs=True)
+    @staticmethod
+    @lru_cache(maxsize=FLYWEIGHT_CACHE_SIZE)
+    def shared(id: str, hourId: str) -> "FixedPriceHour":
+        """Return the one FixedPriceHour for these values."""
+        return FixedPriceHour(id=_intern(id), hourId=_intern(hourId))
+
+
+@attr.s(auto_attribs=True, slots=True, frozen=True)
 class EnergyPriceHour:
+    """Shared by every hour with the same price; instances are immutable."""
 
     id: str
     total: float
@@ -245,16 +269,21 @@ class EnergyPriceHour:
 
         LOGGER.debug("EnergyPriceHour=%s", data)
 
-        return EnergyPriceHour(
-            id=data["id"],
-            total=float(data["total"]),
-            totalExVat=float(data["totalExVat"]),
+        return EnergyPriceHour.shared(
+            data["id"], float(data["total"]), float(data["totalExVat"])
         )
 
+    @staticmethod
+    @lru_cache(maxsize=FLYWEIGHT_CACHE_SIZE)
+    def shared(id: str, total: float, totalExVat: float) -> "EnergyPriceHour":
+        """Return the one EnergyPriceHour for these values."""
+        return EnergyPriceHour(id=_intern(id), total=total, totalExVat=totalExVat)
+
+
 @attr.s(auto_attribs=True)
 class PriceInfo:
 
-    #powerPrices: None
+    # powerPrices: None
     fixedPrices: List[FixedPrice]
     energyPrices: List[EnergyPrice]
 
@@ -268,11 +297,14 @@ class PriceInfo:
         LOGGER.debug("PriceInfo=%s", data)
 
         return PriceInfo(
-            fixedPrices=(FixedPrice.from_dict(price) for price in data["fixedPrices"]),
-            energyPrices=(EnergyPrice.from_dict(price) for price in data["energyPrices"]),
+            fixedPrices=[FixedPrice.from_dict(price) for price in data["fixedPrices"]],
+            energyPrices=[
+                EnergyPrice.from_dict(price) for price in data["energyPrices"]
+            ],
         )
 
-@attr.s(auto_attribs=True)
+
+@attr.s(auto_attribs=True, slots=True)
 class Hour:
 
     startTime: str
@@ -280,7 +312,7 @@ class Hour:
     shortName: str
     isPublicHoliday: bool
     fixedPrice: FixedPriceHour
-    powerPrice: str
+    powerPrice: FixedPriceHour | None
     energyPrice: EnergyPriceHour
 
     def to_json(self):
@@ -295,13 +327,19 @@ class Hour:
         return Hour(
             startTime=data["startTime"],
             expiredAt=data["expiredAt"],
-            shortName=data["shortName"],
+            shortName=_intern(data["shortName"]),
             isPublicHoliday=bool(data["isPublicHoliday"]),
             fixedPrice=FixedPriceHour.from_dict(data["fixedPrice"]),
-            powerPrice=data["powerPrice"],
+            # Same {id, hourId} shape as fixedPrice, when present.
+            powerPrice=(
+                FixedPriceHour.from_dict(data["powerPrice"])
+                if isinstance(data["powerPrice"], dict)
+                else data["powerPrice"]
+            ),
             energyPrice=EnergyPriceHour.from_dict(data["energyPrice"]),
         )
 
+
 @attr.s(auto_attribs=True)
 class TariffPrice:
 
@@ -318,10 +356,11 @@ class TariffPrice:
         LOGGER.debug("TariffPrice=%s", data)
 
         return TariffPrice(
-            hours=(Hour.from_dict(hour) for hour in data["hours"]),
+            hours=[Hour.from_dict(hour) for hour in data["hours"]],
             priceInfo=PriceInfo.from_dict(data["priceInfo"]),
         )
 
+
 @attr.s(auto_attribs=True)
 class GridTariff:
 
@@ -342,6 +381,7 @@ class GridTariff:
             tariffPrice=(TariffPrice.from_dict(data["tariffPrice"])),
         )
 
+
 @attr.s(auto_attribs=True)
 class CurrentFixedPriceLevel:
 
@@ -362,6 +402,7 @@ class CurrentFixedPriceLevel:
             levelId=data["levelId"],
         )
 
+
 @attr.s(auto_attribs=True)
 class MeteringPoints:
 
@@ -384,6 +425,7 @@ class MeteringPoints:
             lastUpdated=data["lastUpdated"],
         )
 
+
 @attr.s(auto_attribs=True)
 class MeteringPointsAndPriceLevels:
 
@@ -400,10 +442,16 @@ class MeteringPointsAndPriceLevels:
         LOGGER.debug("MeteringPointsAndPriceLevels=%s", data)
 
         return MeteringPointsAndPriceLevels(
-            currentFixedPriceLevel=CurrentFixedPriceLevel.from_dict(data["currentFixedPriceLevel"]),
-            meteringPoints=(MeteringPoints.from_dict(meteringpoint) for meteringpoint in data["meteringPoints"]),
+            currentFixedPriceLevel=CurrentFixedPriceLevel.from_dict(
+                data["currentFixedPriceLevel"]
+            ),
+            meteringPoints=[
+                MeteringPoints.from_dict(meteringpoint)
+                for meteringpoint in data["meteringPoints"]
+            ],
         )
 
+
 @attr.s(auto_attribs=True)
 class GridTariffCollection:
 
@@ -421,30 +469,135 @@ class GridTariffCollection:
 
         return GridTariffCollection(
             gridTariff=(GridTariff.from_dict(data["gridTariff"])),
-            meteringPointsAndPriceLevels=(MeteringPointsAndPriceLevels.from_dict(meteringpointandpricelevel) for meteringpointandpricelevel in data["meteringPointsAndPriceLevels"]),
+            meteringPointsAndPriceLevels=[
+                MeteringPointsAndPriceLevels.from_dict(meteringpointandpricelevel)
+                for meteringpointandpricelevel in data["meteringPointsAndPriceLevels"]
+            ],
         )
 
 
-#@attr.s(auto_attribs=True)
-#class MaxHours:
-
-    # meteringspoints[]
-        # meteringPointId
-        # customerContract
-            # startDate
-            # endDate
-        # maxHoursCalculatedTime
-        # maxHoursFromTime
-        # maxHoursToTime
-        # maxHoursAggregate[]
-            # averageValue
-            # maxHours[]
-                # startTime
-                # endTime
-                # value
-                # uom
-                # noOfMonthsBack
-                # production
-                # verified
-            # uom
-            # noOfMonthsBack
+@attr.s(auto_attribs=True, slots=True)
+class CustomerContract:
+
+    startDate: str | None
+    endDate: str | None
+
+    def to_json(self):
+        return "CustomerContract"
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "CustomerContract":
+        """Transform response to CustomerContract."""
+
+        return CustomerContract(
+            startDate=data.get("startDate"),
+            endDate=data.get("endDate"),
+        )
+
+
+@attr.s(auto_attribs=True, slots=True)
+class MaxHour:
+
+    startTime: str
+    endTime: str
+    value: float
+    uom: str
+    noOfMonthsBack: int
+    production: bool
+    verified: bool
+
+    def to_json(self):
+        return "MaxHour"
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "MaxHour":
+        """Transform response to MaxHour."""
+
+        return MaxHour(
+            startTime=data["startTime"],
+            endTime=data["endTime"],
+            value=float(data["value"]),
+            uom=_intern(data["uom"]),
+            noOfMonthsBack=int(data.get("noOfMonthsBack", 0)),
+            production=bool(data.get("production", False)),
+            verified=bool(data.get("verified", False)),
+        )
+
+
+@attr.s(auto_attribs=True, slots=True)
+class MaxHoursAggregate:
+
+    averageValue: float
+    maxHours: List[MaxHour]
+    uom: str
+    noOfMonthsBack: int
+
+    def to_json(self):
+        return "MaxHoursAggregate"
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "MaxHoursAggregate":
+        """Transform response to MaxHoursAggregate."""
+
+        LOGGER.debug("MaxHoursAggregate=%s", data)
+
+        return MaxHoursAggregate(
+            averageValue=float(data["averageValue"]),
+            maxHours=[MaxHour.from_dict(hour) for hour in data["maxHours"]],
+            uom=_intern(data["uom"]),
+            noOfMonthsBack=int(data["noOfMonthsBack"]),
+        )
+
+
+@attr.s(auto_attribs=True, slots=True)
+class MaxHoursMeteringPoint:
+
+    meteringPointId: str
+    customerContract: CustomerContract | None
+    maxHoursCalculatedTime: str | None
+    maxHoursFromTime: str | None
+    maxHoursToTime: str | None
+    maxHoursAggregate: List[MaxHoursAggregate]
+
+    def to_json(self):
+        return "MaxHoursMeteringPoint"
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "MaxHoursMeteringPoint":
+        """Transform response to MaxHoursMeteringPoint."""
+
+        contract = data.get("customerContract")
+
+        return MaxHoursMeteringPoint(
+            meteringPointId=data["meteringPointId"],
+            customerContract=CustomerContract.from_dict(contract) if contract else None,
+            maxHoursCalculatedTime=data.get("maxHoursCalculatedTime"),
+            maxHoursFromTime=data.get("maxHoursFromTime"),
+            maxHoursToTime=data.get("maxHoursToTime"),
+            maxHoursAggregate=[
+                MaxHoursAggregate.from_dict(aggregate)
+                for aggregate in data.get("maxHoursAggregate", [])
+            ],
+        )
+
+
+@attr.s(auto_attribs=True, slots=True)
+class MaxHours:
+
+    meteringpoints: List[MaxHoursMeteringPoint]
+
+    def to_json(self):
+        return "MaxHours"
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "MaxHours":
+        """Transform response to MaxHours."""
+
+        LOGGER.debug("MaxHours=%s", data)
+
+        return MaxHours(
+            meteringpoints=[
+                MaxHoursMeteringPoint.from_dict(meteringpoint)
+                for meteringpoint in data["meteringpoints"]
+            ],
+        )
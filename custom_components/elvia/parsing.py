@@ -0,0 +1,122 @@
+"""Response parsing for the Elvia integration.
+
+Parsers turn a raw response body into models. They are plain module-level
+functions so a ParseRunner can run them inline, in a thread or in a separate
+process, keeping the event loop responsive when payloads grow.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+import json
+from typing import TYPE_CHECKING, Any, Callable, List, TypeVar
+
+from .const import (
+    LOGGER,
+    PARSE_MODE_INLINE,
+    PARSE_MODE_PROCESS,
+    PARSE_MODE_THREAD,
+    PROCESS_PARSE_MIN_BYTES,
+)
+from .models import GridTariff, GridTariffCollection, MaxHours, TariffType
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+_T = TypeVar("_T")
+
+_process_pool: ProcessPoolExecutor | None = None
+
+
+def parse_tarifftypes(body: bytes) -> List[TariffType]:
+    """Parse a tarifftype response."""
+    return [
+        TariffType.from_dict(tariff_type)
+        for tariff_type in json.loads(body)["tariffTypes"]
+    ]
+
+
+def parse_tariffquery(body: bytes) -> GridTariff:
+    """Parse a tariffquery response."""
+    return GridTariff.from_dict(json.loads(body)["gridTariff"])
+
+
+def parse_meteringpoint(body: bytes) -> GridTariffCollection | None:
+    """Parse a meteringpointsgridtariffs response, keeping the first collection."""
+    for collection in json.loads(body)["gridTariffCollections"]:
+        return GridTariffCollection.from_dict(collection)
+    return None
+
+
+def parse_maxhours(body: bytes) -> MaxHours:
+    """Parse a maxhours response."""
+    return MaxHours.from_dict(json.loads(body))
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Return the process pool shared by all entries, created on first use."""
+    global _process_pool  # pylint: disable=global-statement
+    if _process_pool is None:
+        # Imported here so only the process parse mode pays for multiprocessing.
+        from concurrent.futures import (
+            ProcessPoolExecutor,
+        )  # pylint: disable=import-outside-toplevel
+        import multiprocessing  # pylint: disable=import-outside-toplevel
+
+        # spawn avoids forking Home Assistant's threads into the worker
+        _process_pool = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+def shutdown_process_pool() -> None:
+    """Stop the shared process pool, if it was started."""
+    global _process_pool  # pylint: disable=global-statement
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+class ParseRunner:
+    """Run parsers according to the configured parse mode.
+
+    `inline` parses on the event loop, `thread` in the default executor and
+    `process` in a worker process for bodies of PROCESS_PARSE_MIN_BYTES and up
+    (smaller ones go to a thread, where pickling would cost more than it saves).
+    """
+
+    def __init__(self, mode: str = PARSE_MODE_INLINE) -> None:
+        """Initialize."""
+        self.mode = mode
+
+    def _executor(self, body: Any) -> Executor | None:
+        if (
+            self.mode == PARSE_MODE_PROCESS
+            and isinstance(body, (bytes, bytearray))
+            and len(body) >= PROCESS_PARSE_MIN_BYTES
+        ):
+            return _get_process_pool()
+        return None
+
+    async def run(self, parser: Callable[..., _T], *args: Any) -> _T:
+        """Run a parser and return its result."""
+        if self.mode not in (PARSE_MODE_THREAD, PARSE_MODE_PROCESS):
+            return parser(*args)
+
+        executor = self._executor(args[0]) if args else None
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, parser, *args)
+        except RuntimeError as error:
+            # BrokenExecutor is a RuntimeError too
+            if executor is None:
+                raise
+            # The worker could not start or died; stop trying and use threads.
+            LOGGER.warning(
+                "Parsing in a worker process failed, using a thread: %s", error
+            )
+            shutdown_process_pool()
+            self.mode = PARSE_MODE_THREAD
+            return await loop.run_in_executor(None, parser, *args)
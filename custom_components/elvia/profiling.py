@@ -0,0 +1,88 @@
+"""Opt-in profiling of a single Elvia refresh cycle."""
+
+from __future__ import annotations
+
+import cProfile
+import pstats
+from time import perf_counter
+import tracemalloc
+from typing import Any, Awaitable, Callable
+
+from homeassistant.util import dt as dt_util
+
+
+def _hot_functions(profile: cProfile.Profile, top_n: int) -> list[dict[str, Any]]:
+    """Return the top-N functions by cumulative time."""
+    stats = pstats.Stats(profile)
+    rows = []
+    for (filename, line, function), (
+        _,
+        calls,
+        total,
+        cumulative,
+        _,
+    ) in stats.stats.items():
+        rows.append(
+            {
+                "function": f"{filename}:{line}({function})",
+                "calls": calls,
+                "total_ms": round(total * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+        )
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:top_n]
+
+
+def _allocations(snapshot: tracemalloc.Snapshot, top_n: int) -> list[dict[str, Any]]:
+    """Return the top-N allocation sites by size."""
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        )
+    )
+    return [
+        {
+            "location": str(stat.traceback[0]),
+            "size_kib": round(stat.size / 1024, 3),
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:top_n]
+    ]
+
+
+async def async_profile(
+    target: Callable[[], Awaitable[Any]], top_n: int
+) -> dict[str, Any]:
+    """Run `target` under cProfile and tracemalloc and summarize the result.
+
+    cProfile sees everything running on the event loop while `target` is
+    awaited, so other integrations may show up in the report.
+    """
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+    profile = cProfile.Profile()
+    start = perf_counter()
+    profile.enable()
+    try:
+        await target()
+    finally:
+        profile.disable()
+        duration = perf_counter() - start
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+
+    return {
+        "profiled_at": dt_util.utcnow().isoformat(),
+        "duration_ms": round(duration * 1000, 3),
+        "peak_memory_kib": round(peak / 1024, 3),
+        "hot_functions": _hot_functions(profile, top_n),
+        "allocations": _allocations(snapshot, top_n),
+    }
@@ -0,0 +1,200 @@
+"""Record and replay Elvia API traffic.
+
+With recording on, every request/response pair is appended to a JSON Lines
+file: method, URL, request body, status, latency and response body. Headers
+are never written, and the API key, token and metering point IDs are
+redacted, so a recording can be attached to a bug report.
+
+ReplaySession stands in for the aiohttp session of an ElviaApiClient and
+answers from a recording with the recorded latency, so benchmarks run offline
+against real payload sizes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict, deque
+import json
+import os
+import re
+import threading
+from time import perf_counter
+from typing import Any
+
+import aiohttp
+
+from .const import LOGGER, RECORD_MAX_BYTES
+
+REDACTED = "REDACTED"
+MPID_PLACEHOLDER = "REDACTED_MPID"
+# Norwegian metering point IDs (GS1, 18 digits)
+_MPID_PATTERN = re.compile(r"\b7070575\d{11}\b")
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if isinstance(value, str):
+        return value
+    return ""
+
+
+class Redactor:
+    """Removes secrets and metering point IDs from recorded text."""
+
+    def __init__(
+        self, secrets: list[str | None], metering_point_id: str | None
+    ) -> None:
+        """Initialize."""
+        self._secrets = [secret for secret in secrets if secret]
+        self._metering_point_id = metering_point_id
+
+    def __call__(self, text: str) -> str:
+        """Return `text` with secrets and MPIDs replaced."""
+        for secret in self._secrets:
+            text = text.replace(secret, REDACTED)
+        if self._metering_point_id:
+            text = text.replace(self._metering_point_id, MPID_PLACEHOLDER)
+        return _MPID_PATTERN.sub(MPID_PLACEHOLDER, text)
+
+
+class TrafficRecorder:
+    """Appends redacted exchanges to a JSON Lines file, off the event loop."""
+
+    def __init__(
+        self,
+        path: str,
+        redactor: Redactor,
+        max_bytes: int = RECORD_MAX_BYTES,
+    ) -> None:
+        """Initialize."""
+        self.path = path
+        self._redact = redactor
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._started = perf_counter()
+        self._full = False
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        request: Any,
+        status: int,
+        elapsed_ms: float,
+        body: bytes,
+    ) -> asyncio.Future | None:
+        """Queue one exchange for writing."""
+        if self._full:
+            return None
+        line = json.dumps(
+            {
+                "offset_ms": round((perf_counter() - self._started) * 1000, 1),
+                "method": method,
+                "url": self._redact(url),
+                "request": self._redact(_text(request)),
+                "status": status,
+                "elapsed_ms": round(elapsed_ms, 1),
+                "body": self._redact(_text(body)),
+            }
+        )
+        return asyncio.get_running_loop().run_in_executor(None, self._write, line)
+
+    def _write(self, line: str) -> None:
+        with self._lock:
+            if self._full:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                try:
+                    size = os.path.getsize(self.path)
+                except FileNotFoundError:
+                    size = 0
+                if size + len(line) > self._max_bytes:
+                    self._full = True
+                    LOGGER.info(
+                        "Traffic recording reached %s bytes, stopped", self._max_bytes
+                    )
+                    return
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(line + "\n")
+            except OSError as error:
+                # Nobody awaits the write; stop recording rather than fail every request.
+                self._full = True
+                LOGGER.warning(
+                    "Traffic recording stopped, writing %s failed: %s", self.path, error
+                )
+
+
+def load_recording(path: str) -> list[dict[str, Any]]:
+    """Return the exchanges of a recording, in recorded order."""
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class ReplayResponse:
+    """The parts of aiohttp.ClientResponse the API client reads."""
+
+    def __init__(self, status: int, body: bytes) -> None:
+        """Initialize."""
+        self.status = status
+        self._body = body
+
+    async def read(self) -> bytes:
+        """Return the body."""
+        return self._body
+
+
+class ReplaySession:
+    """Answers requests from a recording instead of the network.
+
+    Requests are matched on method, redacted URL and request body. Repeated
+    requests get the recorded responses in order, and the last one after that.
+    Each response is delayed by its recorded latency times `speed` (0 for none).
+    """
+
+    def __init__(
+        self,
+        exchanges: list[dict[str, Any]],
+        metering_point_id: str | None = None,
+        speed: float = 1.0,
+    ) -> None:
+        """Initialize."""
+        self._redact = Redactor([], metering_point_id)
+        self._metering_point_id = metering_point_id
+        self.speed = speed
+        self._responses: defaultdict[tuple[str, str, str], deque[dict[str, Any]]] = (
+            defaultdict(deque)
+        )
+        for exchange in exchanges:
+            self._responses[
+                self._key(exchange["method"], exchange["url"], exchange["request"])
+            ].append(exchange)
+
+    @classmethod
+    def from_file(
+        cls, path: str, metering_point_id: str | None = None, speed: float = 1.0
+    ) -> "ReplaySession":
+        """Load a recording."""
+        return cls(load_recording(path), metering_point_id, speed)
+
+    def _key(self, method: str, url: str, request: Any) -> tuple[str, str, str]:
+        return method.upper(), self._redact(url), self._redact(_text(request))
+
+    async def request(
+        self, method: str, url: str, headers: Any = None, data: Any = None
+    ) -> ReplayResponse:
+        """Return the recorded response for a request."""
+        responses = self._responses.get(self._key(method, url, data))
+        if not responses:
+            raise aiohttp.ClientConnectionError(
+                f"No recorded response for {method} {self._redact(url)}"
+            )
+        exchange = responses.popleft() if len(responses) > 1 else responses[0]
+
+        if self.speed > 0:
+            await asyncio.sleep(exchange["elapsed_ms"] / 1000 * self.speed)
+        body = exchange["body"]
+        if self._metering_point_id:
+            body = body.replace(MPID_PLACEHOLDER, self._metering_point_id)
+        return ReplayResponse(exchange["status"], body.encode("utf-8"))
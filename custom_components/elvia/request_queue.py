@@ -0,0 +1,225 @@
+"""Prioritized API request slots for the Elvia integration.
+
+All clients sharing an API key share one queue, and with it the key's quota.
+A request waits for one of a few slots. When a slot frees up, it goes to the
+most urgent waiter: interactive work (config flow, service calls) first, then
+the routine refresh, then background jobs such as the tariff backfill.
+Background work never takes the last slot. It also pauses while Elvia reports
+little quota left or answers 429.
+
+The priority is taken from the calling context, see `request_priority`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+import hashlib
+import heapq
+from itertools import count
+from time import monotonic
+from typing import Any, AsyncIterator, Iterator, Mapping
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    API_CONCURRENCY,
+    BACKGROUND_MIN_HEADROOM,
+    DATA_REQUEST_QUEUES,
+    LOGGER,
+    QUOTA_PAUSE,
+)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_REFRESH = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_REFRESH: "refresh",
+    PRIORITY_BACKGROUND: "background",
+}
+
+_priority: ContextVar[int] = ContextVar(
+    "elvia_request_priority", default=PRIORITY_REFRESH
+)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Run API requests made in this block (and tasks it starts) at `priority`."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    """Return the priority of requests made from the current context."""
+    return _priority.get()
+
+
+def _header(headers: Mapping[str, str], name: str) -> str | None:
+    # aiohttp headers are case-insensitive, plain dicts are not.
+    value = headers.get(name)
+    if value is None:
+        value = next((v for k, v in headers.items() if k.lower() == name), None)
+    return value
+
+
+class RequestQueue:
+    """Bounded, prioritized request slots for one API key."""
+
+    def __init__(self, concurrency: int = API_CONCURRENCY) -> None:
+        """Initialize."""
+        self.concurrency = concurrency
+        self.active = 0
+        self.active_background = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = count()
+        self._background_paused_until = 0.0
+        self._resume_handle: asyncio.TimerHandle | None = None
+
+    @property
+    def waiting(self) -> int:
+        """Return how many requests wait for a slot."""
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    @property
+    def background_paused(self) -> bool:
+        """Return True while background requests are held back for quota."""
+        return monotonic() < self._background_paused_until
+
+    def _can_start(self, priority: int) -> bool:
+        if self.active >= self.concurrency:
+            return False
+        if priority >= PRIORITY_BACKGROUND:
+            # Keep a slot free for the refresh and interactive requests.
+            if self.active_background >= max(1, self.concurrency - 1):
+                return False
+            if self.background_paused:
+                return False
+        return True
+
+    def _start(self, priority: int) -> None:
+        self.active += 1
+        if priority >= PRIORITY_BACKGROUND:
+            self.active_background += 1
+
+    def _release(self, priority: int) -> None:
+        self.active -= 1
+        if priority >= PRIORITY_BACKGROUND:
+            self.active_background -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to the most urgent waiters."""
+        if self._resume_handle is not None and not self.background_paused:
+            self._resume_handle.cancel()
+            self._resume_handle = None
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._can_start(priority):
+                # Everything behind the head is less urgent.
+                if self.background_paused and self._resume_handle is None:
+                    self._resume_handle = asyncio.get_running_loop().call_later(
+                        self._background_paused_until - monotonic(), self._resume
+                    )
+                return
+            heapq.heappop(self._waiters)
+            self._start(priority)
+            future.set_result(None)
+
+    def _resume(self) -> None:
+        self._resume_handle = None
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, priority: int | None = None) -> AsyncIterator[None]:
+        """Hold a request slot for the block."""
+        if priority is None:
+            priority = current_priority()
+
+        if not self._waiters and self._can_start(priority):
+            self._start(priority)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            # May go ahead of a head that cannot start, e.g. paused background work.
+            self._wake()
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # The slot was granted as we were cancelled.
+                    self._release(priority)
+                raise
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    def observe_response(self, status: int, headers: Mapping[str, str] | None) -> None:
+        """Pause background requests when the quota runs low."""
+        headers = headers or {}
+        pause: float | None = None
+        if status == 429:
+            retry_after = _header(headers, "retry-after")
+            pause = (
+                float(retry_after)
+                if retry_after and retry_after.isdigit()
+                else QUOTA_PAUSE.total_seconds()
+            )
+        else:
+            remaining = _header(headers, "x-ratelimit-remaining")
+            limit = _header(headers, "x-ratelimit-limit")
+            try:
+                headroom = (
+                    float(remaining) / float(limit) if remaining and limit else None
+                )
+            except (ValueError, ZeroDivisionError):
+                headroom = None
+            if headroom is not None and headroom < BACKGROUND_MIN_HEADROOM:
+                reset = _header(headers, "x-ratelimit-reset")
+                pause = (
+                    float(reset)
+                    if reset and reset.isdigit()
+                    else QUOTA_PAUSE.total_seconds()
+                )
+
+        if pause is None:
+            return
+        until = monotonic() + pause
+        if until <= self._background_paused_until:
+            return
+        LOGGER.debug("API quota low, pausing background requests for %ss", pause)
+        self._background_paused_until = until
+        if self._resume_handle is not None:
+            self._resume_handle.cancel()
+            self._resume_handle = None
+        # Reschedules the resume for the new end if background work waits.
+        self._wake()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the queue state for diagnostics."""
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "active_background": self.active_background,
+            "waiting": self.waiting,
+            "background_paused": self.background_paused,
+        }
+
+
+def async_get_request_queue(hass: HomeAssistant, api_key: str) -> RequestQueue:
+    """Return the queue shared by every client using `api_key`."""
+    queues: dict[str, RequestQueue] = hass.data.setdefault(DATA_REQUEST_QUEUES, {})
+    # Keyed by a digest so the key itself is not kept around.
+    digest = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    if digest not in queues:
+        queues[digest] = RequestQueue()
+    return queues[digest]
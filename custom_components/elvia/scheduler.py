@@ -0,0 +1,122 @@
+"""Refresh scheduling for the Elvia integration.
+
+Each data source (tariff prices, max-hours, tariff-type metadata) changes at its
+own pace, so each gets a policy deciding when it is next due. The coordinator
+ticks every minute and only fetches the sources the scheduler reports as due.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    MAXHOURS_REFRESH_DELAY,
+    MAXHOURS_REFRESH_INTERVAL,
+    REFRESH_RETRY_DELAY,
+    SOURCE_MAXHOURS,
+    SOURCE_TARIFF,
+    SOURCE_TARIFFTYPE,
+    TARIFF_REFRESH_OFFSET,
+    TARIFFTYPE_REFRESH_INTERVAL,
+)
+
+
+@dataclass
+class RefreshPolicy:
+    """When a data source should next be fetched.
+
+    `next_due` receives the time of the successful fetch and an optional hint
+    extracted from the payload (e.g. `maxHoursCalculatedTime`).
+    """
+
+    name: str
+    next_due: Callable[[datetime, Any], datetime]
+    retry_delay: timedelta = REFRESH_RETRY_DELAY
+
+
+def next_daily_tariff(now: datetime, hint: Any = None) -> datetime:
+    """Tariff prices are published per day; fetch again just after midnight."""
+    tomorrow = dt_util.start_of_local_day(now.date() + timedelta(days=1))
+    return tomorrow + TARIFF_REFRESH_OFFSET
+
+
+def next_maxhours(now: datetime, hint: Any = None) -> datetime:
+    """Max-hours are recalculated hourly; fetch shortly after the next run.
+
+    `hint` is the last `maxHoursCalculatedTime`. Without it, align to the top of
+    the next hour.
+    """
+    if isinstance(hint, datetime):
+        due = hint + MAXHOURS_REFRESH_INTERVAL + MAXHOURS_REFRESH_DELAY
+        # Elvia has not recalculated yet; poll again later rather than hammering.
+        if due <= now:
+            due = now + REFRESH_RETRY_DELAY
+        return due
+
+    top_of_hour = now.replace(minute=0, second=0, microsecond=0)
+    return top_of_hour + MAXHOURS_REFRESH_INTERVAL + MAXHOURS_REFRESH_DELAY
+
+
+def next_tarifftype(now: datetime, hint: Any = None) -> datetime:
+    """Tariff-type metadata almost never changes.
+
+    `hint` is when the shared tariff catalog expires; checking earlier than that
+    would only hit the cache.
+    """
+    if isinstance(hint, datetime) and now < hint < now + TARIFFTYPE_REFRESH_INTERVAL:
+        return hint
+    return now + TARIFFTYPE_REFRESH_INTERVAL
+
+
+DEFAULT_POLICIES = (
+    RefreshPolicy(SOURCE_TARIFF, next_daily_tariff),
+    RefreshPolicy(SOURCE_MAXHOURS, next_maxhours),
+    RefreshPolicy(SOURCE_TARIFFTYPE, next_tarifftype),
+)
+
+
+class RefreshScheduler:
+    """Track when each registered data source is due."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._policies: dict[str, RefreshPolicy] = {}
+        self._due: dict[str, datetime | None] = {}
+
+    def register(
+        self, policy: RefreshPolicy, first_due: datetime | None = None
+    ) -> None:
+        """Register a policy. A source without `first_due` is due immediately."""
+        self._policies[policy.name] = policy
+        self._due[policy.name] = first_due
+
+    def due(self, now: datetime) -> list[str]:
+        """Return the sources that should be fetched now, in registration order."""
+        return [name for name, due in self._due.items() if due is None or due <= now]
+
+    def mark_done(self, name: str, now: datetime, hint: Any = None) -> None:
+        """Record a successful fetch and schedule the next one."""
+        self._due[name] = self._policies[name].next_due(now, hint)
+
+    def mark_failed(self, name: str, now: datetime) -> None:
+        """Record a failed fetch and retry after the policy's delay."""
+        self._due[name] = now + self._policies[name].retry_delay
+
+    def force(self, name: str) -> None:
+        """Make a source due on the next tick."""
+        self._due[name] = None
+
+    def next_due(self, name: str) -> datetime | None:
+        """Return when a source is next due."""
+        return self._due.get(name)
+
+    def as_dict(self) -> dict[str, str | None]:
+        """Return the schedule for diagnostics."""
+        return {
+            name: due.isoformat() if due is not None else None
+            for name, due in self._due.items()
+        }
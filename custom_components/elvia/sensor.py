@@ -1,4 +1,3 @@
-
 """Elvia sensors for Home Assistant.
 
 Copilot fix for 2024.1 changes to Home Assistant, see https://developers.home-assistant.io/blog/2023/12/11/entity-description-changes/
@@ -17,27 +16,38 @@ References:
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Callable, Optional
+from datetime import datetime, timedelta
+from typing import Any, Callable
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorEntity,
+    SensorDeviceClass,
     SensorEntityDescription,
     SensorStateClass,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN
+from .const import CONF_CONSUMPTION_SENSOR, COST_SAVE_DELAY, DOMAIN, STORAGE_VERSION
+from .coordinator import ElviaDataUpdateCoordinator
+from .cost import READING_POWER, CostAccumulator, reading_from_state
 
 # --------------------------------------------------------------------------------------
 # Entity descriptions
 # --------------------------------------------------------------------------------------
 
+
 @dataclass(frozen=True, kw_only=True)
 class ElviaSensorEntityDescription(SensorEntityDescription):
     """Extended description holding a value extractor."""
+
     value_fn: Callable[[dict[str, Any], str], Any] | None = None
     # Optional attributes extractor
     attrs_fn: Callable[[dict[str, Any], str], dict[str, Any]] | None = None
@@ -63,7 +73,11 @@ DAILY_TARIFF = ElviaSensorEntityDescription(
     key="daily_tariff",
     name="Elvia Daily Tariff",
     state_class=SensorStateClass.MEASUREMENT,
-    value_fn=lambda d, mpid: _first_present(d, ["daily_tariff", f"{mpid}_daily_tariff"]),
+    value_fn=lambda d, mpid: _first_present(
+        d, ["daily_tariff", f"{mpid}_daily_tariff"]
+    ),
+    # Today's prices as parallel arrays, see TariffTimeline.as_compact
+    attrs_fn=lambda d, mpid: {"Prices": d.get("tariff_timeline")},
 )
 
 FIXED_PRICE_HOURLY = ElviaSensorEntityDescription(
@@ -93,13 +107,52 @@ FIXED_PRICE_MONTHLY = ElviaSensorEntityDescription(
     ),
 )
 
+NEXT_PRICE_CHANGE = ElviaSensorEntityDescription(
+    key="next_price_change",
+    name="Elvia Next Price Change",
+    device_class=SensorDeviceClass.TIMESTAMP,
+    value_fn=lambda d, mpid: d.get("next_price_change"),
+    attrs_fn=lambda d, mpid: {
+        "EnergyPrice": d.get("next_energy_price"),
+        "ShortName": d.get("next_price_short_name"),
+    },
+)
+
+PROJECTED_CAPACITY = ElviaSensorEntityDescription(
+    key="projected_capacity",
+    name="Elvia Projected Capacity (End of Month)",
+    state_class=SensorStateClass.MEASUREMENT,
+    value_fn=lambda d, mpid: d.get("capacity_projected_average"),
+    attrs_fn=lambda d, mpid: {
+        "Low": d.get("capacity_projected_average_low"),
+        "High": d.get("capacity_projected_average_high"),
+        "Level": d.get("capacity_projected_level"),
+        "MonthProgress": d.get("capacity_month_progress"),
+    },
+)
+
+PROJECTED_MONTHLY_COST = ElviaSensorEntityDescription(
+    key="projected_monthly_cost",
+    name="Elvia Projected Fixed Price Monthly",
+    state_class=SensorStateClass.MEASUREMENT,
+    value_fn=lambda d, mpid: d.get("capacity_projected_cost"),
+    attrs_fn=lambda d, mpid: {
+        "Low": d.get("capacity_projected_cost_low"),
+        "High": d.get("capacity_projected_cost_high"),
+        "Level": d.get("capacity_projected_level"),
+    },
+)
+
 AVG_MAX_CURRENT = ElviaSensorEntityDescription(
     key="max_hour_avg_current",
     name="Elvia Max Hour Average (Current Month)",
     state_class=SensorStateClass.MEASUREMENT,
     value_fn=lambda d, mpid: _first_present(
-        d, ["average_max_current", f"{mpid}_average_max_current", "max_hour_avg_current"]
+        d,
+        ["average_max_current", f"{mpid}_average_max_current", "max_hour_avg_current"],
     ),
+    # Monthly averages retained across fetches, oldest first
+    attrs_fn=lambda d, mpid: {"History": d.get("max_hours_history") or None},
 )
 
 AVG_MAX_PREVIOUS = ElviaSensorEntityDescription(
@@ -107,10 +160,16 @@ AVG_MAX_PREVIOUS = ElviaSensorEntityDescription(
     name="Elvia Max Hour Average (Previous Month)",
     state_class=SensorStateClass.MEASUREMENT,
     value_fn=lambda d, mpid: _first_present(
-        d, ["average_max_previous", f"{mpid}_average_max_previous", "max_hour_avg_previous"]
+        d,
+        [
+            "average_max_previous",
+            f"{mpid}_average_max_previous",
+            "max_hour_avg_previous",
+        ],
     ),
 )
 
+
 # Max-hours 1/2/3 for current & previous months.
 def _mk_maxhours_desc(n: int, is_current: bool) -> ElviaSensorEntityDescription:
     suffix = "current" if is_current else "previous"
@@ -119,13 +178,44 @@ def _mk_maxhours_desc(n: int, is_current: bool) -> ElviaSensorEntityDescription:
         key=f"{base_key}",
         name=f"Elvia Max Hours {n} ({'Current' if is_current else 'Previous'} Month)",
         state_class=SensorStateClass.MEASUREMENT,
-        value_fn=lambda d, mpid, bk=base_key: _first_present(
-            d, [bk, f"{mpid}_{bk}"]
-        ),
+        value_fn=lambda d, mpid, bk=base_key: _first_present(d, [bk, f"{mpid}_{bk}"]),
         attrs_fn=lambda d, mpid, bk=base_key: _attrs_window(d, bk),
     )
 
 
+# Performance diagnostics, disabled by default.
+REFRESH_DURATION = ElviaSensorEntityDescription(
+    key="refresh_duration",
+    name="Elvia Refresh Duration",
+    native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+    state_class=SensorStateClass.MEASUREMENT,
+    entity_category=EntityCategory.DIAGNOSTIC,
+    entity_registry_enabled_default=False,
+    value_fn=lambda d, mpid: d.get("refresh_duration_ms"),
+)
+
+API_LATENCY = ElviaSensorEntityDescription(
+    key="api_latency_p95",
+    name="Elvia API Latency p95",
+    native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+    state_class=SensorStateClass.MEASUREMENT,
+    entity_category=EntityCategory.DIAGNOSTIC,
+    entity_registry_enabled_default=False,
+    value_fn=lambda d, mpid: d.get("api_latency_p95_ms"),
+    attrs_fn=lambda d, mpid: d.get("api_latency_by_endpoint") or {},
+)
+
+API_REQUESTS = ElviaSensorEntityDescription(
+    key="api_requests",
+    name="Elvia API Requests",
+    state_class=SensorStateClass.TOTAL_INCREASING,
+    entity_category=EntityCategory.DIAGNOSTIC,
+    entity_registry_enabled_default=False,
+    value_fn=lambda d, mpid: d.get("api_requests"),
+    attrs_fn=lambda d, mpid: {"Errors": d.get("api_errors")},
+)
+
+
 MAXHOURS_CURR_1 = _mk_maxhours_desc(1, True)
 MAXHOURS_CURR_2 = _mk_maxhours_desc(2, True)
 MAXHOURS_CURR_3 = _mk_maxhours_desc(3, True)
@@ -138,6 +228,7 @@ MAXHOURS_PREV_3 = _mk_maxhours_desc(3, False)
 # Setup
 # --------------------------------------------------------------------------------------
 
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -146,7 +237,7 @@ async def async_setup_entry(
     """Set up Elvia sensors from a config entry."""
     # Coordinator may be stored directly, or inside a dict.
     stored = hass.data.get(DOMAIN, {}).get(entry.entry_id)
-    coordinator: CoordinatorEntity | None = None
+    coordinator: ElviaDataUpdateCoordinator | None = None
 
     if stored is None:
         # Nothing to set up (defensive).
@@ -175,6 +266,9 @@ async def async_setup_entry(
         FIXED_PRICE_HOURLY,
         FIXED_PRICE_LEVEL,
         FIXED_PRICE_MONTHLY,
+        NEXT_PRICE_CHANGE,
+        PROJECTED_CAPACITY,
+        PROJECTED_MONTHLY_COST,
         AVG_MAX_CURRENT,
         AVG_MAX_PREVIOUS,
         MAXHOURS_CURR_1,
@@ -183,9 +277,12 @@ async def async_setup_entry(
         MAXHOURS_PREV_1,
         MAXHOURS_PREV_2,
         MAXHOURS_PREV_3,
+        REFRESH_DURATION,
+        API_LATENCY,
+        API_REQUESTS,
     ]
 
-    entities: list[ElviaBaseSensor] = [
+    entities: list[SensorEntity] = [
         ElviaBaseSensor(
             coordinator=coordinator,
             description=desc,
@@ -195,6 +292,16 @@ async def async_setup_entry(
         for desc in descriptions
     ]
 
+    if consumption_sensor := entry.options.get(CONF_CONSUMPTION_SENSOR):
+        entities.append(
+            ElviaCostSensor(
+                coordinator=coordinator,
+                source_entity_id=consumption_sensor,
+                key_prefix="elvia",
+                metering_point_id=metering_point_id or "",
+            )
+        )
+
     async_add_entities(entities)
 
 
@@ -202,14 +309,23 @@ async def async_setup_entry(
 # Entities
 # --------------------------------------------------------------------------------------
 
-class ElviaBaseSensor(CoordinatorEntity, SensorEntity):
-    """Base class for Elvia sensors."""
+
+class ElviaBaseSensor(CoordinatorEntity, RestoreSensor):
+    """Base class for Elvia sensors.
+
+    The last value and attributes are restored after a restart and shown until the
+    first successful refresh, so a slow or failing first fetch leaves no gap.
+    """
 
     _attr_has_entity_name = True
+    # Large, slowly changing attributes are kept out of the recorder.
+    _unrecorded_attributes = frozenset({"History", "Prices"})
+    _restored_value: Any = None
+    _restored_attrs: dict[str, Any] | None = None
 
     def __init__(
         self,
-        coordinator: CoordinatorEntity,
+        coordinator: ElviaDataUpdateCoordinator,
         description: ElviaSensorEntityDescription,
         key_prefix: str,
         metering_point_id: str,
@@ -225,11 +341,57 @@ class ElviaBaseSensor(CoordinatorEntity, SensorEntity):
         if description.name:
             self._attr_name = description.name
 
+    async def async_added_to_hass(self) -> None:
+        """Restore the last known value and attributes."""
+        await super().async_added_to_hass()
+
+        if (last_data := await self.async_get_last_sensor_data()) is not None:
+            self._restored_value = last_data.native_value
+
+        desc = self.entity_description
+        last_state = await self.async_get_last_state()
+        if (
+            last_state is not None
+            and isinstance(desc, ElviaSensorEntityDescription)
+            and desc.attrs_fn is not None
+        ):
+            # Only our own attributes, not friendly_name, unit etc.
+            keys = desc.attrs_fn({}, self._metering_point_id) or {}
+            self._restored_attrs = {
+                key: last_state.attributes[key]
+                for key in keys
+                if key in last_state.attributes
+            }
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Drop the restored state once a refresh has succeeded."""
+        # Price change ticks also update listeners; only a refresh sets last_slot_fetched.
+        if (
+            self.coordinator.last_update_success
+            and getattr(self.coordinator, "last_slot_fetched", None) is not None
+        ):
+            self._restored_value = None
+            self._restored_attrs = None
+        super()._handle_coordinator_update()
+
+    @property
+    def available(self) -> bool:
+        """Stay available on a restored value until the first refresh."""
+        has_data = bool(getattr(self.coordinator, "data", None))
+        return super().available or (not has_data and self._restored_value is not None)
+
     @property
     def native_value(self) -> Any:
         """Return the sensor value based on coordinator data."""
+        value = self._value()
+        return self._restored_value if value is None else value
+
+    def _value(self) -> Any:
         data: dict[str, Any] = getattr(self.coordinator, "data", {}) or {}
-        if not data or not isinstance(self.entity_description, ElviaSensorEntityDescription):
+        if not data or not isinstance(
+            self.entity_description, ElviaSensorEntityDescription
+        ):
             return None
 
         value_fn = self.entity_description.value_fn
@@ -245,6 +407,9 @@ class ElviaBaseSensor(CoordinatorEntity, SensorEntity):
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return optional attributes (e.g., start/end window for max-hours sensors)."""
+        if self._value() is None:
+            return self._restored_attrs or None
+
         data: dict[str, Any] = getattr(self.coordinator, "data", {}) or {}
         desc = self.entity_description
         if not isinstance(desc, ElviaSensorEntityDescription) or desc.attrs_fn is None:
@@ -256,3 +421,123 @@ class ElviaBaseSensor(CoordinatorEntity, SensorEntity):
             return {k: v for k, v in attrs.items() if v is not None}
         except Exception:
             return None
+
+
+class ElviaCostSensor(CoordinatorEntity, SensorEntity):
+    """Grid cost of a linked meter's consumption today.
+
+    Updated on every state change of the source sensor, priced from the cached
+    tariff timeline, and reset at local midnight. Running totals are persisted
+    across restarts.
+    """
+
+    _attr_has_entity_name = True
+    _attr_name = "Elvia Energy Cost Today"
+    _attr_device_class = SensorDeviceClass.MONETARY
+    _attr_state_class = SensorStateClass.TOTAL
+    _attr_native_unit_of_measurement = "NOK"
+
+    def __init__(
+        self,
+        coordinator: ElviaDataUpdateCoordinator,
+        source_entity_id: str,
+        key_prefix: str,
+        metering_point_id: str,
+    ) -> None:
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{DOMAIN}_{key_prefix}_energy_cost_today"
+        self._source_entity_id = source_entity_id
+        self._accumulator = CostAccumulator()
+        self._store: Store = Store(
+            coordinator.hass, STORAGE_VERSION, f"{DOMAIN}.cost.{metering_point_id}"
+        )
+        self._cancel_midnight: CALLBACK_TYPE | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the running totals and follow the source sensor."""
+        await super().async_added_to_hass()
+        if stored := await self._store.async_load():
+            self._accumulator = CostAccumulator.from_dict(stored)
+            # Power was not measured while stopped; do not integrate across the gap.
+            self._accumulator.last_power = None
+        self.async_on_remove(
+            async_track_state_change_event(
+                self.hass, [self._source_entity_id], self._async_source_changed
+            )
+        )
+        self._schedule_midnight(self.coordinator.clock.now())
+        self.async_on_remove(self._cancel_scheduled_midnight)
+
+    @callback
+    def _cancel_scheduled_midnight(self) -> None:
+        if self._cancel_midnight is not None:
+            self._cancel_midnight()
+            self._cancel_midnight = None
+
+    @callback
+    def _schedule_midnight(self, now: datetime) -> None:
+        self._cancel_midnight = self.coordinator.clock.track_point_in_time(
+            self.hass,
+            self._async_midnight,
+            dt_util.start_of_local_day(
+                dt_util.as_local(now).date() + timedelta(days=1)
+            ),
+        )
+
+    @callback
+    def _async_midnight(self, now: datetime) -> None:
+        """Close the day's totals even when no reading arrives around midnight."""
+        self._schedule_midnight(now)
+        accumulator = self._accumulator
+        if accumulator.last_power is not None:
+            # Price the power since the last reading with the day it was used in.
+            accumulator.add_power(
+                now, accumulator.last_power, self.coordinator.timeline
+            )
+        accumulator.roll_over(now)
+        self._store.async_delay_save(accumulator.as_dict, COST_SAVE_DELAY)
+        self.async_write_ha_state()
+
+    @callback
+    def _async_source_changed(self, event: Event) -> None:
+        new_state = event.data.get("new_state")
+        if (reading := reading_from_state(new_state)) is None:
+            return
+
+        kind, value = reading
+        timeline = self.coordinator.timeline
+        if kind == READING_POWER:
+            self._accumulator.add_power(new_state.last_updated, value, timeline)
+        else:
+            self._accumulator.add_energy(new_state.last_updated, value, timeline)
+
+        if finished := self._accumulator.pop_finished_slots():
+            self.hass.async_create_task(
+                self.coordinator.async_store_consumption(finished)
+            )
+        self._store.async_delay_save(self._accumulator.as_dict, COST_SAVE_DELAY)
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> float | None:
+        """Return today's cost."""
+        if self._accumulator.day is None:
+            return None
+        return round(self._accumulator.cost_today, 4)
+
+    @property
+    def last_reset(self) -> datetime | None:
+        """Return the start of the day the total belongs to."""
+        if self._accumulator.day is None:
+            return None
+        return dt_util.start_of_local_day(dt_util.parse_date(self._accumulator.day))
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return month totals and consumption."""
+        return {
+            "CostMonth": round(self._accumulator.cost_month, 4),
+            "EnergyToday": round(self._accumulator.energy_today, 4),
+            "UnpricedEnergyToday": round(self._accumulator.unpriced_energy_today, 4),
+            "Source": self._source_entity_id,
+        }
@@ -0,0 +1,204 @@
+"""Services for the Elvia integration."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .api import ApiClientException
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_END,
+    ATTR_FETCH,
+    ATTR_FORCE_FETCH,
+    ATTR_START,
+    ATTR_TIMES,
+    ATTR_TOP_N,
+    BACKFILL_MAX_DAYS,
+    DOMAIN,
+    PRICE_QUERY_MAX_SLOTS,
+    SERVICE_BACKFILL_TARIFFS,
+    SERVICE_GET_TARIFF_PRICES,
+    SERVICE_PROFILE_REFRESH,
+)
+from .coordinator import ElviaDataUpdateCoordinator
+from .request_queue import PRIORITY_INTERACTIVE, request_priority
+
+PROFILE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_TOP_N, default=20): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=200)
+        ),
+        vol.Optional(ATTR_FORCE_FETCH, default=True): cv.boolean,
+    }
+)
+
+
+BACKFILL_TARIFFS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START): cv.date,
+        vol.Optional(ATTR_END): cv.date,
+    }
+)
+
+
+GET_TARIFF_PRICES_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+            vol.Exclusive(ATTR_TIMES, "query"): vol.All(cv.ensure_list, [cv.datetime]),
+            vol.Exclusive(ATTR_START, "query"): cv.datetime,
+            vol.Optional(ATTR_END): cv.datetime,
+            vol.Optional(ATTR_FETCH, default=True): cv.boolean,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_TIMES, ATTR_START),
+)
+
+
+def _query_times(data: dict[str, Any], slot_seconds: int) -> list[datetime]:
+    """Return the timestamps a price query asks for, as aware datetimes."""
+
+    def aware(when: datetime) -> datetime:
+        return when if when.tzinfo else when.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+    if ATTR_TIMES in data:
+        times = [aware(when) for when in data[ATTR_TIMES]]
+    else:
+        # One timestamp per slot in [start, end)
+        start = aware(data[ATTR_START])
+        end = aware(data[ATTR_END]) if ATTR_END in data else start + timedelta(days=1)
+        first = int(start.timestamp()) // slot_seconds * slot_seconds
+        times = [
+            dt_util.as_local(dt_util.utc_from_timestamp(timestamp))
+            for timestamp in range(first, int(end.timestamp()), slot_seconds)
+        ]
+
+    if len(times) > PRICE_QUERY_MAX_SLOTS:
+        raise ServiceValidationError(f"At most {PRICE_QUERY_MAX_SLOTS} prices per call")
+    return times
+
+
+def _coordinators(
+    hass: HomeAssistant, call: ServiceCall
+) -> dict[str, ElviaDataUpdateCoordinator]:
+    """Return the coordinators a service call targets."""
+    coordinators: dict[str, ElviaDataUpdateCoordinator] = hass.data.get(DOMAIN, {})
+    if (entry_id := call.data.get(ATTR_CONFIG_ENTRY_ID)) is None:
+        return dict(coordinators)
+    if entry_id not in coordinators:
+        raise ServiceValidationError(f"Unknown Elvia config entry {entry_id}")
+    return {entry_id: coordinators[entry_id]}
+
+
+async def _async_profile_refresh(call: ServiceCall) -> ServiceResponse:
+    """Profile one refresh cycle per targeted entry."""
+    reports: dict[str, Any] = {}
+    for entry_id, coordinator in _coordinators(call.hass, call).items():
+        with request_priority(PRIORITY_INTERACTIVE):
+            reports[entry_id] = await coordinator.async_profile_refresh(
+                call.data[ATTR_TOP_N], call.data[ATTR_FORCE_FETCH]
+            )
+    return reports
+
+
+async def _async_backfill_tariffs(call: ServiceCall) -> None:
+    """Start a historical tariff backfill per targeted entry."""
+    start = dt_util.start_of_local_day(call.data[ATTR_START])
+    end = (
+        dt_util.start_of_local_day(call.data[ATTR_END])
+        if ATTR_END in call.data
+        else dt_util.start_of_local_day()
+    )
+    if not start < end:
+        raise ServiceValidationError("start must be before end")
+    if end - start > timedelta(days=BACKFILL_MAX_DAYS):
+        raise ServiceValidationError(
+            f"At most {BACKFILL_MAX_DAYS} days can be backfilled"
+        )
+
+    coordinators = _coordinators(call.hass, call)
+    # Check every entry first, so a rejected call starts nothing.
+    for entry_id, coordinator in coordinators.items():
+        if coordinator.backfill.running:
+            raise ServiceValidationError(
+                f"A backfill is already running for {entry_id}"
+            )
+    for entry_id, coordinator in coordinators.items():
+        entry = call.hass.config_entries.async_get_entry(entry_id)
+        entry.async_create_background_task(
+            call.hass,
+            coordinator.backfill.async_run(
+                coordinator.tariffType.tariffKey, start, end
+            ),
+            f"{DOMAIN} backfill {entry_id}",
+        )
+
+
+async def _async_get_tariff_prices(call: ServiceCall) -> ServiceResponse:
+    """Answer a batch of price-at-time queries per targeted entry."""
+    prices: dict[str, Any] = {}
+    for entry_id, coordinator in _coordinators(call.hass, call).items():
+        # Ranges are expanded per entry, as tariffs may differ in resolution.
+        times = _query_times(call.data, coordinator.slot_seconds)
+        try:
+            with request_priority(PRIORITY_INTERACTIVE):
+                prices[entry_id] = await coordinator.async_query_prices(
+                    times, call.data[ATTR_FETCH]
+                )
+        except ApiClientException as error:
+            raise HomeAssistantError(f"Fetching tariffs failed: {error}") from error
+    return prices
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register services once for all entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_PROFILE_REFRESH):
+        return
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        _async_profile_refresh,
+        schema=PROFILE_REFRESH_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TARIFF_PRICES,
+        _async_get_tariff_prices,
+        schema=GET_TARIFF_PRICES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKFILL_TARIFFS,
+        _async_backfill_tariffs,
+        schema=BACKFILL_TARIFFS_SCHEMA,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove services when the last entry is unloaded."""
+    if hass.data.get(DOMAIN):
+        return
+    for service in (
+        SERVICE_PROFILE_REFRESH,
+        SERVICE_BACKFILL_TARIFFS,
+        SERVICE_GET_TARIFF_PRICES,
+    ):
+        hass.services.async_remove(DOMAIN, service)
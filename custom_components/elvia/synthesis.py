@@ -0,0 +1,196 @@
+"""Local tariff synthesis for the Elvia integration.
+
+A grid tariff is a fixed schedule: each slot of a weekday, weekend day or public
+holiday maps to an energy price and a fixed price, and those prices are valid
+for published date ranges (`priceInfo`). The schedule is learned from fetched
+tariffs and persisted, so days that have not been fetched can be built locally.
+A day is only synthesized when every price it needs is known to be valid on it,
+so the API is asked again once a validity window runs out.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, STORAGE_VERSION, TARIFF_PATTERN_SAVE_DELAY
+from .holidays import is_public_holiday
+from .models import GridTariff
+from .timeline import TariffSlot, TariffTimeline, fixed_price_levels
+
+DAY_WEEKDAY = "weekday"
+DAY_WEEKEND = "weekend"
+DAY_HOLIDAY = "holiday"
+
+
+def _validity(start: str | None, end: str | None) -> tuple[float, float] | None:
+    """Return a validity window as timestamps; dates are inclusive."""
+
+    def bound(value: str | None, next_day: bool) -> float | None:
+        if not value:
+            return None
+        if (when := dt_util.parse_datetime(value)) is not None:
+            return when.timestamp()
+        if (day := dt_util.parse_date(value)) is not None:
+            if next_day:
+                day += timedelta(days=1)
+            return dt_util.start_of_local_day(day).timestamp()
+        return None
+
+    start_ts, end_ts = bound(start, False), bound(end, True)
+    if start_ts is None or end_ts is None:
+        return None
+    return start_ts, end_ts
+
+
+class TariffPattern:
+    """Weekday/weekend/holiday tariff schedule for one metering point."""
+
+    def __init__(self, hass: HomeAssistant, metering_point_id: str) -> None:
+        """Initialize."""
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.tariff_pattern.{metering_point_id}"
+        )
+        self._data: dict[str, Any] = {
+            "use_weekend": True,
+            "use_holiday": True,
+            "fixed_month": None,
+            "energy": {},
+            "fixed": {},
+            "days": {},
+        }
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load the persisted pattern once."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if stored := await self._store.async_load():
+            self._data.update(stored)
+
+    def day_kind(self, day: date, is_holiday: bool | None = None) -> str:
+        """Return which schedule applies to a day."""
+        if is_holiday is None:
+            is_holiday = is_public_holiday(day)
+        if is_holiday and self._data["use_holiday"]:
+            return DAY_HOLIDAY
+        if day.weekday() >= 5 and self._data["use_weekend"]:
+            return DAY_WEEKEND
+        return DAY_WEEKDAY
+
+    def learn(self, grid_tariff: GridTariff, fixed_price_level_id: str | None) -> None:
+        """Fold a fetched tariff (one or more days) into the pattern."""
+
+        tariff_type = grid_tariff.tariffType
+        price_info = grid_tariff.tariffPrice.priceInfo
+        data = self._data
+        data["use_weekend"] = bool(tariff_type.useWeekendPrices)
+        data["use_holiday"] = bool(tariff_type.usePublicHolidayPrices)
+
+        for energy_price in price_info.energyPrices:
+            if window := _validity(energy_price.startDate, energy_price.endDate):
+                data["energy"][energy_price.id] = [*window, energy_price.total]
+
+        levels = fixed_price_levels(grid_tariff.tariffPrice, fixed_price_level_id)
+        for fixed_price in price_info.fixedPrices:
+            window = _validity(fixed_price.startDate, fixed_price.endDate)
+            if window and fixed_price.id in levels:
+                data["fixed"][fixed_price.id] = [*window, *levels[fixed_price.id]]
+
+        # Group slots per local day; only complete days become a schedule.
+        days: dict[date, list[list[Any]]] = {}
+        holidays: dict[date, bool] = {}
+        for hour in grid_tariff.tariffPrice.hours:
+            start = dt_util.parse_datetime(hour.startTime)
+            end = dt_util.parse_datetime(hour.expiredAt)
+            if start is None or end is None:
+                continue
+            local = dt_util.as_local(start)
+            minute = local.hour * 60 + local.minute
+            length = int((end - start).total_seconds() // 60)
+            days.setdefault(local.date(), []).append(
+                [
+                    minute,
+                    length,
+                    hour.energyPrice.id,
+                    hour.shortName,
+                    hour.fixedPrice.id,
+                ]
+            )
+            holidays[local.date()] = hour.isPublicHoliday
+
+        for day, slots in days.items():
+            if sum(slot[1] for slot in slots) == 24 * 60:
+                data["days"][self.day_kind(day, holidays[day])] = sorted(slots)
+                data["fixed_month"] = f"{day.year:04d}-{day.month:02d}"
+
+        self._store.async_delay_save(lambda: self._data, TARIFF_PATTERN_SAVE_DELAY)
+
+    def synthesize(self, day: date) -> TariffTimeline | None:
+        """Build a day's tariff locally, or None if the API must be asked.
+
+        Fixed prices depend on the month (days in month, capacity level), so
+        they are only filled in for the month they were learned in.
+        """
+
+        midnight = dt_util.start_of_local_day(day)
+        # Local datetimes share a tzinfo, so their difference ignores DST; compare instants.
+        day_seconds = (
+            dt_util.start_of_local_day(day + timedelta(days=1)).timestamp()
+            - midnight.timestamp()
+        )
+        if day_seconds != timedelta(days=1).total_seconds():
+            # Daylight saving changes shift the schedule; leave those days to the API.
+            return None
+        midnight_utc = dt_util.as_utc(midnight)
+
+        data = self._data
+        template = data["days"].get(self.day_kind(day))
+        if not template:
+            return None
+
+        same_month = data["fixed_month"] == f"{day.year:04d}-{day.month:02d}"
+        slots = []
+        for minute, length, energy_id, short_name, fixed_id in template:
+            start: datetime = dt_util.as_local(midnight_utc + timedelta(minutes=minute))
+            end = dt_util.as_local(midnight_utc + timedelta(minutes=minute + length))
+            energy = data["energy"].get(energy_id)
+            if (
+                energy is None
+                or not energy[0] <= start.timestamp() < end.timestamp() <= energy[1]
+            ):
+                return None
+
+            hourly = level_info = monthly = None
+            fixed = data["fixed"].get(fixed_id)
+            if same_month and fixed and fixed[0] <= start.timestamp() < fixed[1]:
+                hourly, level_info, monthly = fixed[2:]
+
+            slots.append(
+                TariffSlot(
+                    start=start,
+                    end=end,
+                    energy_price=energy[2],
+                    fixed_price_hourly=hourly,
+                    fixed_price_level_info=level_info,
+                    fixed_price_monthly=monthly,
+                    short_name=short_name,
+                    is_public_holiday=is_public_holiday(day),
+                )
+            )
+        return TariffTimeline(slots)
+
+    def forecast(self, first: date, days: int) -> list[TariffSlot]:
+        """Return the slots of up to `days` days from `first`, stopping at the first unknown day."""
+        slots: list[TariffSlot] = []
+        for offset in range(days):
+            timeline = self.synthesize(first + timedelta(days=offset))
+            if timeline is None:
+                break
+            slots.extend(timeline.slots)
+        return slots
@@ -0,0 +1,213 @@
+"""Indexed tariff timeline for the Elvia integration."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from homeassistant.util import dt as dt_util
+
+from .const import SLOT_SECONDS
+from .models import GridTariff, GridTariffCollection, TariffPrice, TariffType
+
+
+def slot_seconds(tariff_type: TariffType | None) -> int:
+    """Return the slot length of a tariff, from its resolution in minutes."""
+    try:
+        seconds = int(float(tariff_type.resolution) * 60)
+    except (AttributeError, TypeError, ValueError):
+        return SLOT_SECONDS
+    return seconds if seconds > 0 else SLOT_SECONDS
+
+
+class TariffSlot(NamedTuple):
+    """Prices valid for one tariff slot."""
+
+    start: datetime
+    end: datetime
+    energy_price: float
+    fixed_price_hourly: float | None
+    fixed_price_level_info: str | None
+    fixed_price_monthly: float | None
+    short_name: str
+    is_public_holiday: bool
+
+
+def fixed_price_levels(
+    tariff_price: TariffPrice, fixed_price_level_id: str | None
+) -> dict[str, tuple[float, str, float]]:
+    """Return fixedPrice.id -> (hourly total, level info, monthly total) for a level."""
+    levels: dict[str, tuple[float, str, float]] = {}
+    for fixed_price in tariff_price.priceInfo.fixedPrices:
+        for price_level in fixed_price.priceLevels:
+            if price_level.id == fixed_price_level_id:
+                levels[fixed_price.id] = (
+                    price_level.hourPrices[0].total,
+                    price_level.levelInfo,
+                    price_level.monthlyTotal,
+                )
+                break
+    return levels
+
+
+def _price_key(slot: TariffSlot) -> tuple[Any, ...]:
+    """Return what makes a slot price different from its neighbours."""
+    return (
+        slot.energy_price,
+        slot.fixed_price_hourly,
+        slot.short_name,
+        slot.is_public_holiday,
+    )
+
+
+class TariffTimeline:
+    """Time-sorted tariff slots with O(log n) lookup by timestamp.
+
+    Built once per tariff fetch, so the current values can be resolved on every
+    tick without another API call. Slots can be of any length, so hourly and
+    15-minute tariffs share the same code.
+    """
+
+    def __init__(self, slots: list[TariffSlot]) -> None:
+        """Initialize."""
+        self.slots = sorted(slots, key=lambda slot: slot.start)
+        self._starts = [slot.start.timestamp() for slot in self.slots]
+        self._ends = [slot.end.timestamp() for slot in self.slots]
+        self._compact: dict[str, Any] | None = None
+        # For each slot, the index of the next slot with different prices
+        self._next_change: list[int | None] = [None] * len(self.slots)
+        following: int | None = None
+        for index in range(len(self.slots) - 2, -1, -1):
+            if _price_key(self.slots[index]) != _price_key(self.slots[index + 1]):
+                following = index + 1
+            self._next_change[index] = following
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    @staticmethod
+    def from_collection(collection: GridTariffCollection) -> "TariffTimeline":
+        """Build a timeline from a meteringpoint response."""
+
+        first_metering_point = collection.meteringPointsAndPriceLevels[0]
+        return TariffTimeline.from_grid_tariff(
+            collection.gridTariff,
+            first_metering_point.currentFixedPriceLevel.levelId,
+        )
+
+    @staticmethod
+    def from_grid_tariff(
+        grid_tariff: GridTariff, fixed_price_level_id: str | None = None
+    ) -> "TariffTimeline":
+        """Build a timeline from a tariff, e.g. a tariffquery response.
+
+        Without a fixed price level only the energy prices are known.
+        """
+
+        tariff_price = grid_tariff.tariffPrice
+        fixed_levels = fixed_price_levels(tariff_price, fixed_price_level_id)
+
+        slots = []
+        for hour in tariff_price.hours:
+            start = dt_util.parse_datetime(hour.startTime)
+            end = dt_util.parse_datetime(hour.expiredAt)
+            if start is None or end is None:
+                continue
+            hourly, level_info, monthly = fixed_levels.get(
+                hour.fixedPrice.id, (None, None, None)
+            )
+            slots.append(
+                TariffSlot(
+                    start=start,
+                    end=end,
+                    energy_price=hour.energyPrice.total,
+                    fixed_price_hourly=hourly,
+                    fixed_price_level_info=level_info,
+                    fixed_price_monthly=monthly,
+                    short_name=hour.shortName,
+                    is_public_holiday=hour.isPublicHoliday,
+                )
+            )
+
+        return TariffTimeline(slots)
+
+    def as_rows(self) -> list[list[Any]]:
+        """Return the slots as JSON-serializable rows, see from_rows."""
+        return [
+            [slot.start.isoformat(), slot.end.isoformat(), *slot[2:]]
+            for slot in self.slots
+        ]
+
+    @staticmethod
+    def from_rows(rows: list[list[Any]]) -> "TariffTimeline":
+        """Build a timeline from rows saved with as_rows."""
+        slots = []
+        for start, end, *prices in rows:
+            start_time = dt_util.parse_datetime(start)
+            end_time = dt_util.parse_datetime(end)
+            if start_time is None or end_time is None:
+                continue
+            slots.append(TariffSlot(start_time, end_time, *prices))
+        return TariffTimeline(slots)
+
+    def index_at(self, when: datetime) -> int | None:
+        """Return the index of the slot covering `when`."""
+        timestamp = when.timestamp()
+        index = bisect_right(self._starts, timestamp) - 1
+        if index < 0 or timestamp >= self._ends[index]:
+            return None
+        return index
+
+    def slot_at(self, when: datetime) -> TariffSlot | None:
+        """Return the slot covering `when`."""
+        index = self.index_at(when)
+        return None if index is None else self.slots[index]
+
+    def slots_at(self, times: list[datetime]) -> list[TariffSlot | None]:
+        """Return the slot covering each time, in the order given."""
+        return [self.slot_at(when) for when in times]
+
+    def next_change(self, when: datetime) -> TariffSlot | None:
+        """Return the first later slot whose prices differ from those at `when`.
+
+        Adjacent slots with equal prices (e.g. every night hour) are not a change.
+        """
+        index = self.index_at(when)
+        if index is None:
+            # Not inside a slot: the next slot to start is the change.
+            following = bisect_right(self._starts, when.timestamp())
+            return self.slots[following] if following < len(self.slots) else None
+
+        following = self._next_change[index]
+        return None if following is None else self.slots[following]
+
+    def covers(self, when: datetime) -> bool:
+        """Return True if `when` falls within a known slot."""
+        return self.index_at(when) is not None
+
+    def as_compact(self) -> dict[str, Any]:
+        """Return the energy prices as parallel arrays, for state attributes.
+
+        `offsets` are minutes from `start` to each slot start, so a day of
+        15-minute slots is two short lists instead of 96 dicts.
+        """
+        if self._compact is None:
+            first = self._starts[0] if self._starts else 0
+            self._compact = {
+                "start": self.slots[0].start.isoformat() if self.slots else None,
+                "offsets": [int(start - first) // 60 for start in self._starts],
+                "prices": [slot.energy_price for slot in self.slots],
+            }
+        return self._compact
+
+    def as_price_list(self) -> list[dict[str, Any]]:
+        """Return the timeline in the `tariff_prices` attribute format."""
+        return [
+            {
+                "startTime": slot.start.isoformat(),
+                "endTime": slot.end.isoformat(),
+                "total": slot.energy_price,
+            }
+            for slot in self.slots
+        ]
@@ -0,0 +1,39 @@
+"""HTTP views for the Elvia integration."""
+
+from __future__ import annotations
+
+from aiohttp import web
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .metrics import as_prometheus
+
+
+class ElviaMetricsView(HomeAssistantView):
+    """Expose performance metrics for all entries in Prometheus text format.
+
+    Scrape `/api/elvia/metrics` with a long-lived access token as bearer token.
+    """
+
+    url = "/api/elvia/metrics"
+    name = "api:elvia:metrics"
+    requires_auth = True
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self.hass = hass
+
+    async def get(self, request: web.Request) -> web.Response:
+        """Return metrics."""
+        metrics = {
+            entry_id: coordinator.metrics
+            for entry_id, coordinator in self.hass.data.get(DOMAIN, {}).items()
+            if hasattr(coordinator, "metrics")
+        }
+        return web.Response(
+            text=as_prometheus(metrics),
+            content_type="text/plain",
+            charset="utf-8",
+        )
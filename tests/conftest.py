@@ -0,0 +1,53 @@
+"""Shared helpers for the Elvia tests."""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+
+from custom_components.elvia.clock import Clock
+from custom_components.elvia.coordinator import ElviaDataUpdateCoordinator
+from custom_components.elvia.timeline import TariffSlot
+
+
+def make_coordinator(
+    hass: Any = None,
+    api: Any = None,
+    clock: Clock | None = None,
+    metering_point_id: str = "MPID123",
+) -> ElviaDataUpdateCoordinator:
+    """Return a coordinator with a mocked hass and an API that is never called."""
+    return ElviaDataUpdateCoordinator(
+        hass=MagicMock() if hass is None else hass,
+        api=(
+            SimpleNamespace(_metering_point_id=metering_point_id)
+            if api is None
+            else api
+        ),
+        tariffType=SimpleNamespace(title="t", companyName="c", tariffKey="k"),
+        clock=clock,
+    )
+
+
+def make_slot(
+    start: datetime,
+    energy_price: float,
+    *,
+    length: timedelta = timedelta(hours=1),
+    fixed_price_hourly: float | None = None,
+    fixed_price_level_info: str | None = None,
+    fixed_price_monthly: float | None = None,
+    short_name: str = "Dag",
+    is_public_holiday: bool = False,
+) -> TariffSlot:
+    """Return a tariff slot from `start`, with only energy prices unless given."""
+    return TariffSlot(
+        start=start,
+        end=start + length,
+        energy_price=energy_price,
+        fixed_price_hourly=fixed_price_hourly,
+        fixed_price_level_info=fixed_price_level_info,
+        fixed_price_monthly=fixed_price_monthly,
+        short_name=short_name,
+        is_public_holiday=is_public_holiday,
+    )
@@ -0,0 +1,124 @@
+"""Tests for the Elvia historical tariff backfill."""
+
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.api import ApiClientException
+from custom_components.elvia.backfill import TariffBackfill
+from custom_components.elvia.const import ATTR_END, ATTR_START, DOMAIN
+from custom_components.elvia.parsing import ParseRunner
+from custom_components.elvia.services import _async_backfill_tariffs
+
+from .conftest import make_slot
+
+START = datetime(2024, 1, 1, tzinfo=dt_util.UTC)
+
+
+class FakeApi:
+    def __init__(self, fail_at=None):
+        self.parser = ParseRunner()
+        self.windows = []
+        self._fail_at = fail_at
+
+    async def tariffquery(self, tariff_key, start, end):
+        self.windows.append((start, end))
+        if start == self._fail_at:
+            raise ApiClientException("timeout")
+        return (start, end)
+
+
+class MemorySink:
+    def __init__(self):
+        self.slots = []
+
+    async def async_write(self, slots):
+        self.slots.extend(slots)
+
+
+def _timeline(window):
+    start, end = window
+    slots = []
+    while start < end:
+        slots.append(make_slot(start, 0.5))
+        start += timedelta(hours=1)
+    return MagicMock(slots=slots)
+
+
+@pytest.mark.asyncio
+async def test_backfill_pages_and_checkpoints_contiguous_range():
+    fail_at = START + timedelta(days=2)
+    api = FakeApi(fail_at=fail_at)
+    sink = MemorySink()
+    with patch("custom_components.elvia.backfill.Store") as store, patch(
+        "custom_components.elvia.backfill.TariffTimeline.from_grid_tariff", _timeline
+    ):
+        store.return_value.async_save = AsyncMock()
+        backfill = TariffBackfill(
+            MagicMock(), api, "MPID123", [sink], window=timedelta(days=1), concurrency=2
+        )
+        await backfill.async_run("key", START, START + timedelta(days=4))
+
+    assert len(api.windows) == 4
+    assert len(sink.slots) == 3 * 24
+    assert backfill.progress["failed"] == 1
+    # Checkpoint stops before the failed window so a resume refetches it
+    saved = store.return_value.async_save.call_args.args[0]
+    assert saved["done_until"] == fail_at.isoformat()
+
+
+class FailingSink(MemorySink):
+    async def async_write(self, slots):
+        if slots[0].start == START + timedelta(days=1):
+            raise OSError("disk full")
+        await super().async_write(slots)
+
+
+def _timeline_or_error(window):
+    if window[0] == START + timedelta(days=2):
+        raise ValueError("bad payload")
+    return _timeline(window)
+
+
+@pytest.mark.asyncio
+async def test_backfill_counts_parse_and_sink_errors_per_window():
+    api = FakeApi()
+    sink = FailingSink()
+    with patch("custom_components.elvia.backfill.Store") as store, patch(
+        "custom_components.elvia.backfill.TariffTimeline.from_grid_tariff",
+        _timeline_or_error,
+    ):
+        store.return_value.async_save = AsyncMock()
+        backfill = TariffBackfill(
+            MagicMock(), api, "MPID123", [sink], window=timedelta(days=1), concurrency=2
+        )
+        await backfill.async_run("key", START, START + timedelta(days=4))
+
+    assert len(api.windows) == 4
+    assert backfill.progress["failed"] == 2
+    assert len(sink.slots) == 2 * 24
+    assert backfill.progress["done_until"] == (START + timedelta(days=1)).isoformat()
+
+
+@pytest.mark.asyncio
+async def test_backfill_service_starts_nothing_if_any_entry_is_busy():
+    idle = SimpleNamespace(
+        backfill=MagicMock(running=False), tariffType=SimpleNamespace(tariffKey="k")
+    )
+    busy = SimpleNamespace(
+        backfill=MagicMock(running=True), tariffType=SimpleNamespace(tariffKey="k")
+    )
+    hass = MagicMock(data={DOMAIN: {"idle": idle, "busy": busy}})
+    call = SimpleNamespace(
+        hass=hass, data={ATTR_START: date(2024, 1, 1), ATTR_END: date(2024, 1, 8)}
+    )
+
+    with pytest.raises(ServiceValidationError):
+        await _async_backfill_tariffs(call)
+    hass.config_entries.async_get_entry.assert_not_called()
+    idle.backfill.async_run.assert_not_called()
@@ -0,0 +1,56 @@
+"""Tests for the Elvia capacity projection."""
+
+from datetime import datetime
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.capacity import (
+    CapacityLevel,
+    CapacityProjector,
+    month_progress,
+)
+
+LEVELS = [
+    CapacityLevel("1", 0, 2, 130.0, "0-2 kWh"),
+    CapacityLevel("2", 2, 5, 190.0, "2-5 kWh"),
+    CapacityLevel("3", 5, 10, 280.0, "5-10 kWh"),
+    CapacityLevel("4", 10, float("inf"), 415.0, "10+ kWh"),
+]
+
+
+def _at(day, hour=0):
+    return datetime(2024, 4, day, hour, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+def test_month_progress():
+    assert month_progress(_at(1)) == 0
+    assert round(month_progress(_at(16)), 2) == 0.5
+
+
+def test_projection_blends_history_and_never_drops_below_current():
+    projector = CapacityProjector()
+    projector.set_levels(LEVELS)
+    projector.set_history([6.0, 8.0, 7.0])
+
+    early = projector.project(3.0, _at(4))
+    assert early.average_low == 3.0
+    assert 6 < early.average < 7
+    assert early.level_info == "5-10 kWh"
+    assert early.monthly_cost == 280.0
+    assert early.monthly_cost_low == 190.0
+    assert early.average_high >= early.average
+
+    # A high month so far is not pulled down by calmer history
+    late = projector.project(11.0, _at(28))
+    assert late.average == 11.0
+    assert late.monthly_cost == 415.0
+
+
+def test_projection_without_history_is_current_average():
+    projector = CapacityProjector()
+    projector.set_levels(LEVELS)
+    projection = projector.project(4.2, _at(10))
+    assert (
+        projection.average == projection.average_low == projection.average_high == 4.2
+    )
+    assert projection.level_info == "2-5 kWh"
@@ -0,0 +1,42 @@
+"""Tests for the Elvia tariff-type catalog."""
+
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.elvia.catalog import TariffTypeCatalog
+from custom_components.elvia.metrics import ElviaMetrics
+from custom_components.elvia.models import TariffType
+
+SCHEMAS = Path(__file__).parent / "schemas"
+
+
+class FakeApi:
+    def __init__(self):
+        self.calls = 0
+        self.metrics = ElviaMetrics()
+
+    async def tarifftypes(self):
+        self.calls += 1
+        data = json.loads((SCHEMAS / "tarifftype.json").read_text())["tariffTypes"][0]
+        data["lastUpdated"] = "2020-01-01T00:00:00+01:00"
+        return [TariffType.from_dict(data)]
+
+
+@pytest.mark.asyncio
+async def test_catalog_is_shared_until_stale():
+    with patch("custom_components.elvia.catalog.Store") as store:
+        store.return_value.async_load = AsyncMock(return_value=None)
+        catalog = TariffTypeCatalog(MagicMock())
+
+    api = FakeApi()
+    assert (await catalog.async_get(api, "string")).tariffKey == "string"
+    assert (await catalog.async_get(api, "string")).tariffKey == "string"
+    # Unknown keys do not refetch a catalog fetched moments ago
+    assert await catalog.async_get(api, "unknown") is None
+
+    assert api.calls == 1
+    assert api.metrics.cache_hit_rate("tariff_catalog") == 0.667
+    assert catalog.is_fresh()
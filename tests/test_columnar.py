@@ -0,0 +1,88 @@
+"""Tests for the Elvia columnar history store."""
+
+from math import isnan
+import os
+
+import pytest
+
+from custom_components.elvia.columnar import ColumnarStore
+
+HOUR = 3600
+
+
+def test_append_merge_and_zero_copy_range(tmp_path):
+    store = ColumnarStore(str(tmp_path / "MPID123"))
+    base = 1_700_000_000 - 1_700_000_000 % HOUR
+
+    store.write([base + i * HOUR for i in range(24, 48)], [1.0] * 24)
+    # Older rows go through the merge path, values for known rows are written in place
+    store.write([base + i * HOUR for i in range(24)], [0.5] * 24)
+    consumption = tmp_path / "MPID123" / "consumption.d1"
+    inode = consumption.stat().st_ino
+    store.write([base + 30 * HOUR], consumption=[2.5])
+    assert consumption.stat().st_ino == inode
+
+    assert len(store) == 48
+    assert (tmp_path / "MPID123" / "start.q1").stat().st_size == 48 * 8
+
+    rows = store.range(base + 23 * HOUR, base + 31 * HOUR)
+    assert isinstance(rows.price, memoryview)
+    assert list(rows.start) == [base + i * HOUR for i in range(23, 31)]
+    assert list(rows.price) == [0.5] + [1.0] * 7
+    assert rows.consumption[-1] == 2.5
+    assert isnan(rows.consumption[0])
+
+    # Appending while a slice is held keeps the slice valid
+    store.write([base + 48 * HOUR], [2.0])
+    assert list(rows.price)[-1] == 1.0
+    assert store.last_start() == base + 48 * HOUR
+    store.close()
+
+
+def test_torn_append_is_truncated_on_load(tmp_path):
+    path = tmp_path / "MPID123"
+    store = ColumnarStore(str(path))
+    base = 1_700_000_000 - 1_700_000_000 % HOUR
+    store.write([base + i * HOUR for i in range(4)], [1.0] * 4)
+    store.close()
+
+    # A crash after the start column and half a price item were appended
+    with open(path / "start.q1", "ab") as file:
+        file.write((base + 4 * HOUR).to_bytes(8, "little"))
+    with open(path / "price.d1", "ab") as file:
+        file.write(b"\0" * 4)
+
+    store = ColumnarStore(str(path))
+    assert len(store) == 4
+    assert len(store.range(base, base + 10 * HOUR).price) == 4
+    store.write([base + 4 * HOUR], [2.0])
+    assert list(store.range(base, base + 10 * HOUR).price) == [1.0] * 4 + [2.0]
+    assert (path / "price.d1").stat().st_size == 5 * 8
+
+
+def test_interrupted_merge_is_finished_on_load(tmp_path, monkeypatch):
+    path = tmp_path / "MPID123"
+    store = ColumnarStore(str(path))
+    base = 1_700_000_000 - 1_700_000_000 % HOUR
+    store.write([base + i * HOUR for i in range(1, 4)], [1.0] * 3)
+
+    real_replace = os.replace
+    replaced = []
+
+    def failing_replace(source, target):
+        if len(replaced) == 1:
+            raise OSError("disk error")
+        replaced.append(target)
+        real_replace(source, target)
+
+    # An older row goes through the merge; fail between the start and price swaps.
+    monkeypatch.setattr("custom_components.elvia.columnar.os.replace", failing_replace)
+    with pytest.raises(OSError):
+        store.write([base], [0.5])
+    monkeypatch.undo()
+
+    store = ColumnarStore(str(path))
+    rows = store.range(base, base + 10 * HOUR)
+    assert list(rows.start) == [base + i * HOUR for i in range(4)]
+    assert list(rows.price) == [0.5, 1.0, 1.0, 1.0]
+    assert not list(path.glob("*.tmp")) and not (path / "merge.commit").exists()
@@ -0,0 +1,92 @@
+"""Tests for the running energy cost."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from custom_components.elvia.clock import VirtualClock
+from custom_components.elvia.cost import CostAccumulator
+from custom_components.elvia.sensor import ElviaCostSensor
+from custom_components.elvia.timeline import TariffTimeline
+
+from .conftest import make_slot
+
+START = datetime(2024, 5, 6, 22, 0, tzinfo=timezone.utc)
+
+
+def _timeline():
+    # 22:00-23:00 at 0.5, 23:00-00:00 at 0.25
+    return TariffTimeline(
+        [
+            make_slot(START, 0.5),
+            make_slot(START + timedelta(hours=1), 0.25, short_name="Natt"),
+        ]
+    )
+
+
+def test_power_is_split_at_slot_boundaries():
+    accumulator = CostAccumulator()
+    timeline = _timeline()
+    accumulator.add_power(START + timedelta(minutes=30), 2.0, timeline)
+    accumulator.add_power(START + timedelta(minutes=90), 1.0, timeline)
+
+    # 0.5 h at 0.5 + 0.5 h at 0.25, both at 2 kW
+    assert accumulator.energy_today == 2.0
+    assert accumulator.cost_today == 0.75
+    assert accumulator.cost_month == 0.75
+
+    # Only the slots before the newest one are finished
+    assert accumulator.pop_finished_slots() == {int(START.timestamp()): 1.0}
+    assert accumulator.pop_finished_slots() == {}
+    assert accumulator.slot_energy == {int(START.timestamp()) + 3600: 1.0}
+
+
+def test_energy_increase_reset_and_rollover():
+    accumulator = CostAccumulator()
+    timeline = _timeline()
+    accumulator.add_energy(START, 100.0, timeline)
+    accumulator.add_energy(START + timedelta(minutes=30), 102.0, timeline)
+    assert accumulator.cost_today == 1.0
+
+    # Meter reset: counted from the new reading
+    accumulator.add_energy(START + timedelta(minutes=40), 1.0, timeline)
+    assert accumulator.cost_today == 1.0
+
+    # No price after midnight; the day starts over and the month keeps going
+    accumulator.add_energy(START + timedelta(hours=3), 2.0, timeline)
+    assert accumulator.day == "2024-05-07"
+    assert accumulator.cost_today == 0.0
+    assert accumulator.unpriced_energy_today == 1.0
+    assert accumulator.cost_month == 1.0
+
+    restored = CostAccumulator.from_dict(accumulator.as_dict())
+    assert restored.as_dict() == accumulator.as_dict()
+
+
+def test_sensor_closes_the_day_at_midnight_without_a_reading():
+    clock = VirtualClock(START + timedelta(minutes=30))
+    coordinator = SimpleNamespace(hass=MagicMock(), clock=clock, timeline=_timeline())
+    sensor = ElviaCostSensor(coordinator, "sensor.power", "elvia", "MPID123")
+    sensor.hass = coordinator.hass
+    sensor._store = MagicMock()
+    sensor.async_write_ha_state = MagicMock()
+    sensor._accumulator.add_power(clock.now(), 2.0, coordinator.timeline)
+    sensor._schedule_midnight(clock.now())
+
+    clock.advance(timedelta(hours=2))
+    accumulator = sensor._accumulator
+    # 0.5 h at 0.5 and 1 h at 0.25, both at 2 kW, are counted for the old day
+    assert accumulator.cost_month == 1.0
+    assert accumulator.day == "2024-05-07"
+    assert sensor.native_value == 0.0
+    sensor.async_write_ha_state.assert_called_once()
+    assert clock.pending_timers == 1
+
+    # A late reading from before midnight does not reset the new day.
+    accumulator.add_energy(
+        START + timedelta(hours=1, minutes=59), 10.0, coordinator.timeline
+    )
+    assert accumulator.day == "2024-05-07"
+
+    sensor._cancel_scheduled_midnight()
+    assert clock.pending_timers == 0
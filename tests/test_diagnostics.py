@@ -0,0 +1,38 @@
+"""Tests for the Elvia diagnostics export."""
+
+import json
+from pathlib import Path
+
+from homeassistant.components.diagnostics import REDACTED
+
+from custom_components.elvia.const import DIAGNOSTICS_MAX_ITEMS
+from custom_components.elvia.diagnostics import _export
+from custom_components.elvia.models import GridTariffCollection
+
+SCHEMAS = Path(__file__).parent / "schemas"
+
+
+def test_export_serializes_models_and_redacts():
+    payload = json.loads((SCHEMAS / "meteringpointsgridtariffs.json").read_text())
+    collection = GridTariffCollection.from_dict(payload["gridTariffCollections"][0])
+
+    exported = _export(
+        {
+            "entry": {
+                "api_key": "secret",
+                "token": "secret",
+                "metering_point_id": "123",
+            },
+            "meteringpoint": collection,
+            "tariff_prices": [{"total": i} for i in range(DIAGNOSTICS_MAX_ITEMS + 5)],
+        }
+    )
+
+    assert set(exported["entry"].values()) == {REDACTED}
+    hours = exported["meteringpoint"]["gridTariff"]["tariffPrice"]["hours"]
+    assert hours[0]["energyPrice"]["total"] == 0.0
+    levels = exported["meteringpoint"]["meteringPointsAndPriceLevels"][0]
+    assert levels["meteringPoints"][0]["meteringPointId"] == REDACTED
+    assert exported["tariff_prices"][-1] == {"truncated": 5}
+    # Everything is plain JSON, no generator reprs
+    assert "generator" not in json.dumps(exported)
@@ -0,0 +1,105 @@
+"""Tests for the live capacity guard."""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.binary_sensor import ElviaCapacityGuardSensor
+from custom_components.elvia.capacity import CapacityLevel
+from custom_components.elvia.clock import VirtualClock
+from custom_components.elvia.const import EVENT_CAPACITY_GUARD
+from custom_components.elvia.guard import CapacityGuard
+
+LEVELS = [
+    CapacityLevel("1", 0, 2, 130.0, "0-2 kWh"),
+    CapacityLevel("2", 2, 5, 190.0, "2-5 kWh"),
+    CapacityLevel("3", 5, 10, 280.0, "5-10 kWh"),
+    CapacityLevel("4", 10, float("inf"), 415.0, "10+ kWh"),
+]
+
+
+def _at(day, hour, minute=0):
+    return datetime(2024, 4, day, hour, minute, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+
+
+def test_guard_projects_the_hour_against_the_level_limit():
+    guard = CapacityGuard()
+    guard.set_levels(LEVELS)
+    guard.set_max_hours([(_at(2, 18), 4.0), (_at(3, 7), 4.0), (_at(5, 20), 3.0)])
+
+    # Top-3 average 3.67 (2-5 kWh): today's hour may reach 5 * 3 - 8 = 7 kWh
+    status = guard.add_power(_at(10, 10), 4.0)
+    assert status.limit == 7.0
+    assert not status.warning
+
+    status = guard.add_power(_at(10, 10, 30), 12.0)
+    assert status.hour_energy == 2.0
+    assert status.projected == 8.0
+    assert status.warning and status.exceeding
+    assert status.headroom_power == 10.0
+
+    # The 8 kWh hour joins the top-3 and lifts the month into 5-10 kWh.
+    status = guard.add_power(_at(10, 11), 1.0)
+    assert status.hour_energy == 0.0
+    assert status.limit == 10 * 3 - 8.0
+    assert not status.warning
+
+
+def test_guard_from_energy_readings():
+    guard = CapacityGuard()
+    guard.set_levels(LEVELS)
+    start = _at(10, 10)
+    guard.add_energy(start, 100.0)
+    status = guard.add_energy(start + timedelta(minutes=15), 101.0)
+    # 1 kWh in 15 minutes is 4 kW; an empty month may reach 2 kWh
+    assert status.projected == 4.0
+    assert status.limit == 2.0
+    assert status.exceeding
+
+
+def test_status_between_readings_assumes_the_last_power():
+    guard = CapacityGuard()
+    guard.set_levels(LEVELS)
+    guard.add_power(_at(10, 10, 30), 4.0)
+
+    status = guard.status(_at(10, 11, 15))
+    assert status.hour_start == _at(10, 11)
+    assert status.hour_energy == 1.0
+    assert status.projected == 4.0
+    # The hour is left to the next reading to close.
+    assert guard.hour_start == _at(10, 10)
+    assert guard.add_power(_at(10, 11, 15), 4.0).hour_energy == 1.0
+
+
+def test_sensor_updates_between_readings_and_clears_at_the_hour():
+    clock = VirtualClock(_at(10, 10, 30))
+    guard = CapacityGuard()
+    guard.set_levels(LEVELS)
+    coordinator = SimpleNamespace(guard=guard, clock=clock, config_entry=None)
+    sensor = ElviaCapacityGuardSensor(coordinator, "sensor.power", "elvia")
+    sensor.hass = MagicMock()
+    sensor.async_write_ha_state = MagicMock()
+    sensor._schedule_update(clock.now())
+
+    # 6 kWh so far and 1 kW now: 6.5 kWh projected against an empty month's 2 kWh
+    guard.add_power(_at(10, 10), 12.0)
+    sensor._set_status(guard.add_power(_at(10, 10, 30), 1.0))
+    assert sensor.is_on
+
+    clock.advance(timedelta(minutes=10))
+    assert sensor.async_write_ha_state.call_count == 11
+    assert sensor.extra_state_attributes["HourEnergy"] == 6.167
+
+    sensor.hass.bus.async_fire.reset_mock()
+    clock.advance(timedelta(minutes=20))
+    assert not sensor.is_on
+    assert sensor.extra_state_attributes["Projected"] == 1.0
+    sensor.hass.bus.async_fire.assert_called_once()
+    event_type, data = sensor.hass.bus.async_fire.call_args.args
+    assert event_type == EVENT_CAPACITY_GUARD
+    assert data["warning"] is False and data["hour_start"] == _at(10, 11).isoformat()
+
+    sensor._cancel_scheduled_update()
+    assert clock.pending_timers == 0
@@ -0,0 +1,105 @@
+"""Tests for adaptive request timeouts and hedged GETs."""
+
+import asyncio
+from datetime import timedelta
+from time import perf_counter
+
+import pytest
+
+from custom_components.elvia.api import ApiClientException, ElviaApiClient
+from custom_components.elvia.const import MAX_HOURS_PATH
+
+
+class SlowFirstSession:
+    """The first request hangs, later ones answer at once."""
+
+    status = 200
+
+    def __init__(self):
+        self.requests = 0
+        self.cancelled = False
+
+    async def request(self, method, url, headers=None, data=None):
+        self.requests += 1
+        if self.requests == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+        return self
+
+    async def read(self):
+        return b"{}"
+
+
+def _client(hedge=False):
+    api = ElviaApiClient("key", "mpid", "token", SlowFirstSession(), hedge=hedge)
+    for _ in range(20):
+        api.metrics.observe("request_latency_ms", "maxhours", 10)
+    return api
+
+
+def test_timeout_follows_p99_within_bounds():
+    api = ElviaApiClient("key", "mpid", "token")
+    assert api.timeout_for("maxhours") == 20
+    for _ in range(20):
+        api.metrics.observe("request_latency_ms", "maxhours", 100)
+    assert api.timeout_for("maxhours") == 3
+    for _ in range(20):
+        api.metrics.observe("request_latency_ms", "maxhours", 2000)
+    assert api.timeout_for("maxhours") == 6
+
+
+@pytest.mark.asyncio
+async def test_hedged_get_answers_from_the_second_request():
+    api = _client(hedge=True)
+    start = perf_counter()
+    assert await api.get(MAX_HOURS_PATH) == {}
+    assert perf_counter() - start < 1
+    await asyncio.sleep(0)
+    assert api._session.cancelled
+    assert api.metrics.counters[("hedged_requests", "maxhours")] == 1
+    assert api.metrics.counters[("hedge_wins", "maxhours")] == 1
+
+
+@pytest.mark.asyncio
+async def test_posts_are_not_hedged():
+    api = _client(hedge=True)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(api.post(MAX_HOURS_PATH, "{}"), 0.5)
+    assert api._session.requests == 1
+
+
+class SlowSession:
+    """Always answers after 200 ms."""
+
+    status = 200
+
+    async def request(self, method, url, headers=None, data=None):
+        await asyncio.sleep(0.2)
+        return self
+
+    async def read(self):
+        return b"{}"
+
+
+@pytest.mark.asyncio
+async def test_timeout_recovers_when_latency_shifts_up(monkeypatch):
+    monkeypatch.setattr(
+        "custom_components.elvia.api.REQUEST_TIMEOUT_MIN", timedelta(milliseconds=50)
+    )
+    api = ElviaApiClient("key", "mpid", "token", SlowSession())
+    for _ in range(20):
+        api.metrics.observe("request_latency_ms", "maxhours", 10)
+    assert api.timeout_for("maxhours") == 0.05
+
+    failures = 0
+    while True:
+        try:
+            assert await api.get(MAX_HOURS_PATH) == {}
+            break
+        except ApiClientException:
+            failures += 1
+            assert failures < 5
+    assert api.timeout_for("maxhours") > 0.2
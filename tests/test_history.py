@@ -0,0 +1,57 @@
+"""Tests for the Elvia max-hours model and history."""
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from custom_components.elvia.history import MaxHoursHistory
+from custom_components.elvia.models import MaxHours, MaxHoursMeteringPoint
+
+SCHEMAS = Path(__file__).parent / "schemas"
+
+
+def _meteringpoint(month: int, average: float) -> MaxHoursMeteringPoint:
+    return MaxHoursMeteringPoint.from_dict(
+        {
+            "meteringPointId": "MPID123",
+            "maxHoursCalculatedTime": f"2024-{month:02d}-10T10:00:00+01:00",
+            "maxHoursAggregate": [
+                {
+                    "averageValue": average,
+                    "maxHours": [
+                        {
+                            "startTime": f"2024-{month:02d}-02T17:00:00+01:00",
+                            "endTime": f"2024-{month:02d}-02T18:00:00+01:00",
+                            "value": average,
+                            "uom": "kWh",
+                        }
+                    ],
+                    "uom": "kWh",
+                    "noOfMonthsBack": 0,
+                }
+            ],
+        }
+    )
+
+
+def test_maxhours_from_schema():
+    maxhours = MaxHours.from_dict(json.loads((SCHEMAS / "maxhours.json").read_text()))
+
+    aggregate = maxhours.meteringpoints[0].maxHoursAggregate[0]
+    assert aggregate.maxHours[0].value == 0.0
+    assert not hasattr(aggregate, "__dict__")
+
+
+def test_history_is_bounded_and_sorted():
+    with patch("custom_components.elvia.history.Store") as store:
+        history = MaxHoursHistory(MagicMock(), "MPID123", max_months=3)
+
+    for month in (2, 1, 3, 4):
+        history.update(_meteringpoint(month, float(month)))
+
+    assert [m["month"] for m in history.months] == ["2024-02", "2024-03", "2024-04"]
+    assert store.return_value.async_delay_save.called
+    # Refetching a known month replaces it in place
+    assert history.update(_meteringpoint(3, 3.5))
+    assert not history.update(_meteringpoint(3, 3.5))
+    assert history.months[1]["average"] == 3.5
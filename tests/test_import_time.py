@@ -0,0 +1,35 @@
+"""Guard the Elvia import path against heavy eager imports."""
+
+import json
+from pathlib import Path
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import json, sys
+import homeassistant.helpers.update_coordinator
+import custom_components.elvia, custom_components.elvia.sensor
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def test_opt_in_features_are_not_imported_eagerly():
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    modules = set(json.loads(output.splitlines()[-1]))
+
+    for name in (
+        "homeassistant.components.recorder",
+        "sqlalchemy",
+        "cProfile",
+        "tracemalloc",
+        "concurrent.futures.process",
+    ):
+        assert name not in modules
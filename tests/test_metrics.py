@@ -0,0 +1,34 @@
+"""Tests for the Elvia performance metrics."""
+
+from custom_components.elvia.api import endpoint_name
+from custom_components.elvia.const import MAX_HOURS_PATH
+from custom_components.elvia.metrics import ElviaMetrics, as_prometheus
+
+
+def test_endpoint_name_drops_query():
+    assert endpoint_name(f"{MAX_HOURS_PATH}?meteringPointIds=123") == "maxhours"
+
+
+def test_prometheus_groups_samples_per_metric():
+    first = ElviaMetrics()
+    second = ElviaMetrics()
+    for metrics, latency in ((first, 120), (second, 30)):
+        metrics.observe("request_latency_ms", "maxhours", latency)
+        metrics.increment("requests", "maxhours")
+
+    text = as_prometheus({"a": first, "b": second})
+
+    assert text.count("# TYPE elvia_request_latency_ms histogram") == 1
+    assert (
+        'elvia_request_latency_ms_bucket{entry="a",label="maxhours",le="100"} 0' in text
+    )
+    assert (
+        'elvia_request_latency_ms_bucket{entry="b",label="maxhours",le="100"} 1' in text
+    )
+    assert 'elvia_requests_total{entry="b",label="maxhours"} 1' in text
+    lines = text.splitlines()
+    # Both entries' samples follow the single header
+    requests = [
+        i for i, line in enumerate(lines) if line.startswith("elvia_requests_total")
+    ]
+    assert requests == list(range(requests[0], requests[0] + 2))
@@ -0,0 +1,44 @@
+"""Tests for Elvia response parsing."""
+
+from pathlib import Path
+import threading
+
+import pytest
+
+from custom_components.elvia.const import PARSE_MODE_INLINE, PARSE_MODE_THREAD
+from custom_components.elvia.parsing import (
+    ParseRunner,
+    parse_meteringpoint,
+    parse_tariffquery,
+)
+
+SCHEMAS = Path(__file__).parent / "schemas"
+
+
+@pytest.mark.asyncio
+async def test_thread_mode_parses_off_the_event_loop():
+    body = (SCHEMAS / "meteringpointsgridtariffs.json").read_bytes()
+    loop_thread = threading.get_ident()
+    threads = []
+
+    def parse(raw: bytes):
+        threads.append(threading.get_ident())
+        return parse_meteringpoint(raw)
+
+    inline = await ParseRunner(PARSE_MODE_INLINE).run(parse, body)
+    threaded = await ParseRunner(PARSE_MODE_THREAD).run(parse, body)
+
+    assert inline == threaded
+    assert threads[0] == loop_thread
+    assert threads[1] != loop_thread
+
+
+def test_hours_share_price_objects_across_payloads():
+    body = (SCHEMAS / "tariffquery.json").read_bytes()
+    first = parse_tariffquery(body).tariffPrice.hours[0]
+    second = parse_tariffquery(body).tariffPrice.hours[0]
+
+    assert first == second
+    assert first.energyPrice is second.energyPrice
+    assert first.fixedPrice is second.fixedPrice
+    assert first.shortName is second.shortName
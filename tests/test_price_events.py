@@ -0,0 +1,103 @@
+"""Tests for Elvia price change events."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.clock import VirtualClock
+from custom_components.elvia.const import EVENT_PRICE_CHANGED
+from custom_components.elvia.timeline import TariffTimeline
+
+from .conftest import make_coordinator, make_slot
+
+START = datetime(2024, 3, 5, tzinfo=dt_util.UTC)
+
+
+def _slot(hour, price, name):
+    return make_slot(START + timedelta(hours=hour), price, short_name=name)
+
+
+def _night(hour):
+    return hour < 6 or hour >= 22
+
+
+TIMELINE = TariffTimeline(
+    [
+        _slot(hour, 0.3 if _night(hour) else 0.4, "Natt" if _night(hour) else "Dag")
+        for hour in range(24)
+    ]
+)
+
+
+def test_next_change_skips_equal_neighbours():
+    assert TIMELINE.next_change(
+        START + timedelta(minutes=30)
+    ).start == START + timedelta(hours=6)
+    assert TIMELINE.next_change(START + timedelta(hours=7)).start == START + timedelta(
+        hours=22
+    )
+    assert TIMELINE.next_change(START + timedelta(hours=23)) is None
+    assert TIMELINE.next_change(START - timedelta(hours=1)).start == START
+
+
+def test_price_change_fires_event_at_boundary():
+    coordinator = make_coordinator()
+    coordinator.timeline = TIMELINE
+    with patch("custom_components.elvia.clock.async_track_point_in_time") as track:
+        coordinator.map_current_values(START + timedelta(hours=1))
+        assert track.call_args.args[2] == START + timedelta(hours=6)
+        assert coordinator.energy_price == 0.3
+
+        coordinator._async_price_changed(START + timedelta(hours=6))
+
+    event_type, event_data = coordinator.hass.bus.async_fire.call_args.args
+    assert event_type == EVENT_PRICE_CHANGED
+    assert event_data["previous_energy_price"] == 0.3
+    assert event_data["energy_price"] == 0.4
+    assert event_data["short_name"] == "Dag"
+    assert coordinator.energy_price == 0.4
+    # Re-armed for the evening change
+    assert track.call_args.args[2] == START + timedelta(hours=22)
+    assert coordinator.data["next_price_change"] == START + timedelta(hours=22)
+
+
+def test_price_change_across_midnight():
+    clock = VirtualClock(START + timedelta(hours=23))
+    coordinator = make_coordinator(clock=clock)
+    coordinator.timeline = TIMELINE
+    coordinator.map_current_values(clock.now())
+    # No change left today: armed for the end of the timeline
+    assert coordinator.next_change is None
+    assert clock.pending_timers == 1
+
+    # The learned pattern knows tomorrow starts at a different night price.
+    tomorrow = TariffTimeline([_slot(24, 0.25, "Natt")])
+    coordinator.pattern.synthesize = MagicMock(return_value=tomorrow)
+    clock.advance(timedelta(hours=1))
+    event_type, event_data = coordinator.hass.bus.async_fire.call_args.args
+    assert event_type == EVENT_PRICE_CHANGED
+    assert event_data["previous_energy_price"] == 0.3
+    assert event_data["energy_price"] == 0.25
+    assert event_data["start"] == (START + timedelta(hours=24)).isoformat()
+    assert coordinator.data["daily_tariff"] == 0.25
+
+
+def test_price_change_across_midnight_waits_for_the_refresh():
+    clock = VirtualClock(START + timedelta(hours=23))
+    coordinator = make_coordinator(clock=clock)
+    coordinator.timeline = TIMELINE
+    coordinator.map_current_values(clock.now())
+    coordinator.pattern.synthesize = MagicMock(return_value=None)
+    clock.advance(timedelta(hours=1))
+    coordinator.hass.bus.async_fire.assert_not_called()
+
+    # The refreshed timeline settles it.
+    coordinator.timeline = TariffTimeline(
+        [_slot(24, 0.25, "Natt"), _slot(25, 0.3, "Natt")]
+    )
+    coordinator.map_current_values(clock.now() + timedelta(minutes=1))
+    event_type, event_data = coordinator.hass.bus.async_fire.call_args.args
+    assert event_data["previous_energy_price"] == 0.3
+    assert event_data["energy_price"] == 0.25
+    assert coordinator.next_change.start == START + timedelta(hours=25)
@@ -0,0 +1,68 @@
+"""Tests for Elvia price-at-time queries."""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.columnar import ColumnarStore
+from custom_components.elvia.timeline import TariffTimeline
+
+from .conftest import make_coordinator, make_slot
+
+START = datetime(2024, 3, 5, tzinfo=dt_util.UTC)
+
+
+class FakeApi:
+    def __init__(self):
+        self._metering_point_id = "MPID123"
+        self.tariffquery = AsyncMock()
+
+
+def _coordinator(tmp_path):
+    hass = MagicMock()
+
+    async def executor(target, *args):
+        return target(*args)
+
+    hass.async_add_executor_job = executor
+    with patch("custom_components.elvia.synthesis.Store") as store:
+        store.return_value.async_load = AsyncMock(return_value=None)
+        coordinator = make_coordinator(hass=hass, api=FakeApi())
+    coordinator.timeline = TariffTimeline(
+        [
+            make_slot(
+                START + timedelta(hours=hour),
+                0.3 + hour / 100,
+                fixed_price_hourly=1.2,
+                fixed_price_level_info="5-10 kWh",
+                fixed_price_monthly=340.0,
+            )
+            for hour in range(24)
+        ]
+    )
+    coordinator.local_store._store = ColumnarStore(str(tmp_path))
+    return coordinator
+
+
+@pytest.mark.asyncio
+async def test_query_prices_from_timeline_and_store_without_api(tmp_path):
+    coordinator = _coordinator(tmp_path)
+    earlier = START - timedelta(days=1)
+    coordinator.local_store.store.write([int(earlier.timestamp())], [0.25])
+
+    times = [
+        START + timedelta(hours=17, minutes=30),
+        earlier + timedelta(minutes=15),
+        START - timedelta(days=10),
+    ]
+    prices = await coordinator.async_query_prices(times, fetch=False)
+
+    assert prices[0]["energy_price"] == 0.47
+    assert prices[0]["start"] == (START + timedelta(hours=17)).isoformat()
+    assert prices[0]["price_level"] == "5-10 kWh"
+    assert prices[1] == {"time": times[1].isoformat(), "energy_price": 0.25}
+    assert prices[2] == {"time": times[2].isoformat()}
+    coordinator.api.tariffquery.assert_not_called()
@@ -0,0 +1,24 @@
+"""Tests for Elvia refresh profiling."""
+
+import pytest
+
+from custom_components.elvia.profiling import async_profile
+
+
+def _build_payload():
+    return [{"hour": i, "total": i * 0.1} for i in range(5000)]
+
+
+@pytest.mark.asyncio
+async def test_profile_reports_hot_functions_and_allocations():
+    kept = []
+
+    async def refresh():
+        kept.append(_build_payload())
+
+    report = await async_profile(refresh, top_n=5)
+
+    assert len(report["hot_functions"]) <= 5
+    assert any("_build_payload" in row["function"] for row in report["hot_functions"])
+    assert any("test_profiling.py" in row["location"] for row in report["allocations"])
+    assert report["peak_memory_kib"] > 0
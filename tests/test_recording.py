@@ -0,0 +1,85 @@
+"""Tests for recording and replaying API traffic."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from custom_components.elvia.api import ElviaApiClient
+from custom_components.elvia.recording import Redactor, ReplaySession, TrafficRecorder
+
+SCHEMAS = Path(__file__).resolve().parent / "schemas"
+MPID = "707057500012345678"
+
+
+class FakeResponse:
+    status = 200
+
+    def __init__(self, body):
+        self._body = body
+
+    async def read(self):
+        return self._body
+
+
+class FakeSession:
+    def __init__(self, body):
+        self.body = body
+
+    async def request(self, method, url, headers, data):
+        assert headers["X-API-Key"] == "secret-key"
+        return FakeResponse(self.body)
+
+
+@pytest.mark.asyncio
+async def test_record_redacts_and_replays(tmp_path):
+    body = json.loads((SCHEMAS / "meteringpointsgridtariffs.json").read_text())
+    body["gridTariffCollections"][0]["meteringPointsAndPriceLevels"][0][
+        "meteringPoints"
+    ][0]["meteringPointId"] = MPID
+    path = str(tmp_path / "traffic.jsonl")
+    recorder = TrafficRecorder(path, Redactor(["secret-key", "secret-token"], MPID))
+    api = ElviaApiClient(
+        "secret-key",
+        MPID,
+        "secret-token",
+        FakeSession(json.dumps(body).encode()),
+        recorder=recorder,
+    )
+
+    recorder_calls = []
+    record = recorder.record
+    recorder.record = lambda *args: recorder_calls.append(record(*args))
+    await api.meteringpoint()
+    await recorder_calls[0]
+
+    recording = Path(path).read_text()
+    for secret in ("secret-key", "secret-token", MPID):
+        assert secret not in recording
+
+    # Another metering point replays the same recording with its own ID.
+    other = "707057500087654321"
+    replayed = ElviaApiClient(
+        "key", other, "token", ReplaySession.from_file(path, other, speed=0)
+    )
+    collection = await replayed.meteringpoint()
+    assert (
+        collection.meteringPointsAndPriceLevels[0].meteringPoints[0].meteringPointId
+        == other
+    )
+    assert (
+        replayed.metrics.histogram("response_bytes", "meteringpointsgridtariffs").last
+        > 1000
+    )
+
+
+@pytest.mark.asyncio
+async def test_write_errors_stop_the_recording(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    # The parent "directory" is a file, so every write fails
+    recorder = TrafficRecorder(str(blocker / "traffic.jsonl"), Redactor([], None))
+
+    await recorder.record("GET", "https://x/maxhours", None, 200, 1.0, b"{}")
+    assert recorder._full
+    assert recorder.record("GET", "https://x/maxhours", None, 200, 1.0, b"{}") is None
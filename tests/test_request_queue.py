@@ -0,0 +1,114 @@
+"""Tests for the prioritized request queue."""
+
+import asyncio
+
+import pytest
+
+from custom_components.elvia.api import ElviaApiClient
+from custom_components.elvia.const import MAX_HOURS_PATH
+from custom_components.elvia.request_queue import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_REFRESH,
+    RequestQueue,
+    request_priority,
+)
+
+
+async def _hold(queue, priority, order, release):
+    async with queue.slot(priority):
+        order.append(priority)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_free_slot_goes_to_the_most_urgent_waiter():
+    queue = RequestQueue(concurrency=1)
+    order = []
+    release = asyncio.Event()
+    tasks = [
+        asyncio.create_task(_hold(queue, priority, order, release))
+        for priority in (
+            PRIORITY_REFRESH,
+            PRIORITY_BACKGROUND,
+            PRIORITY_REFRESH,
+            PRIORITY_INTERACTIVE,
+        )
+    ]
+    await asyncio.sleep(0)
+    assert queue.active == 1 and queue.waiting == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert order == [
+        PRIORITY_REFRESH,
+        PRIORITY_INTERACTIVE,
+        PRIORITY_REFRESH,
+        PRIORITY_BACKGROUND,
+    ]
+    assert queue.active == 0
+
+
+@pytest.mark.asyncio
+async def test_background_leaves_a_slot_free():
+    queue = RequestQueue(concurrency=2)
+    order = []
+    release = asyncio.Event()
+    background = [
+        asyncio.create_task(_hold(queue, PRIORITY_BACKGROUND, order, release))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    assert queue.active_background == 1
+
+    refresh = asyncio.create_task(_hold(queue, PRIORITY_REFRESH, order, release))
+    await asyncio.sleep(0)
+    assert order == [PRIORITY_BACKGROUND, PRIORITY_REFRESH]
+    release.set()
+    await asyncio.gather(refresh, *background)
+
+
+@pytest.mark.asyncio
+async def test_background_pauses_while_quota_is_low():
+    queue = RequestQueue(concurrency=2)
+    queue.observe_response(
+        200, {"X-RateLimit-Remaining": "5", "X-RateLimit-Limit": "100"}
+    )
+    assert queue.background_paused
+
+    order = []
+    release = asyncio.Event()
+    release.set()
+    background = asyncio.create_task(_hold(queue, PRIORITY_BACKGROUND, order, release))
+    await _hold(queue, PRIORITY_REFRESH, order, release)
+    await asyncio.sleep(0)
+    assert order == [PRIORITY_REFRESH] and not background.done()
+
+    # The pause ends on its own.
+    queue._background_paused_until = 0
+    queue._wake()
+    await background
+    assert order == [PRIORITY_REFRESH, PRIORITY_BACKGROUND]
+
+
+class ThrottlingSession:
+    """Answers 429 with a Retry-After."""
+
+    status = 429
+    headers = {"Retry-After": "30"}
+
+    async def request(self, method, url, headers=None, data=None):
+        return self
+
+    async def read(self):
+        return b"{}"
+
+
+@pytest.mark.asyncio
+async def test_client_reports_throttling_to_the_queue():
+    api = ElviaApiClient("key", "mpid", "token", ThrottlingSession())
+    with request_priority(PRIORITY_INTERACTIVE):
+        await api.get(MAX_HOURS_PATH)
+    assert api.queue.background_paused
+    assert api.metrics.counters[("throttled", "maxhours")] == 1
+    assert api.metrics.histogram("queue_wait_ms", "interactive").count == 1
@@ -0,0 +1,55 @@
+"""Tests for resolution-generic tariff slots."""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.const import ATTR_START
+from custom_components.elvia.sensor import ElviaBaseSensor
+from custom_components.elvia.services import _query_times
+from custom_components.elvia.timeline import TariffTimeline, slot_seconds
+
+from .conftest import make_slot
+
+START = datetime(2025, 10, 1, tzinfo=dt_util.UTC)
+
+
+def test_slot_seconds_follows_tariff_resolution():
+    assert slot_seconds(SimpleNamespace(resolution=15.0)) == 900
+    assert slot_seconds(SimpleNamespace(resolution=60.0)) == 3600
+    # Unknown or missing resolution means hourly
+    assert slot_seconds(SimpleNamespace(resolution=0.0)) == 3600
+    assert slot_seconds(None) == 3600
+
+
+def test_quarter_hour_timeline_and_range_queries():
+    quarter = timedelta(minutes=15)
+    timeline = TariffTimeline(
+        [
+            make_slot(
+                START + index * quarter,
+                0.3 if index < 24 else 0.4,
+                length=quarter,
+                short_name="Natt" if index < 24 else "Dag",
+            )
+            for index in range(96)
+        ]
+    )
+
+    assert timeline.slot_at(START + timedelta(minutes=50)).start == START + 3 * quarter
+    assert timeline.next_change(START).start == START + timedelta(hours=6)
+    assert len(_query_times({ATTR_START: START}, 900)) == 96
+
+
+def test_compact_encoding_is_parallel_arrays():
+    quarter = timedelta(minutes=15)
+    timeline = TariffTimeline(
+        [make_slot(START + i * quarter, 0.1 * i, length=quarter) for i in range(3)]
+    )
+    assert timeline.as_compact() == {
+        "start": START.isoformat(),
+        "offsets": [0, 15, 30],
+        "prices": [0.0, 0.1, 0.2],
+    }
+    assert {"Prices", "History"} <= ElviaBaseSensor._unrecorded_attributes
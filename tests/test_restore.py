@@ -0,0 +1,97 @@
+"""Tests for restoring Elvia state after a restart."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from homeassistant.components.sensor import SensorExtraStoredData
+from homeassistant.core import State
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.sensor import (
+    DAILY_TARIFF,
+    MAXHOURS_CURR_1,
+    ElviaBaseSensor,
+)
+from custom_components.elvia.timeline import TariffTimeline
+
+from .conftest import make_coordinator, make_slot
+
+
+@pytest.mark.asyncio
+async def test_coordinator_restores_current_hour_from_saved_timeline():
+    hour = dt_util.now().replace(minute=0, second=0, microsecond=0)
+    saved = TariffTimeline(
+        [
+            make_slot(
+                hour,
+                0.42,
+                fixed_price_hourly=1.1,
+                fixed_price_level_info="5-10 kWh",
+                fixed_price_monthly=330.0,
+            )
+        ]
+    )
+    with patch("custom_components.elvia.coordinator.Store") as store, patch(
+        "custom_components.elvia.clock.async_track_point_in_time"
+    ):
+        store.return_value.async_load = AsyncMock(
+            return_value={"slots": saved.as_rows()}
+        )
+        coordinator = make_coordinator()
+        assert await coordinator.async_restore()
+
+    assert coordinator.timeline.slots == saved.slots
+    assert coordinator.data["daily_tariff"] == 0.42
+    assert coordinator.data["fixed_price_level"] == "5-10 kWh"
+
+
+@pytest.mark.asyncio
+async def test_sensor_shows_restored_state_until_coordinator_has_a_value():
+    coordinator = make_coordinator()
+    coordinator.data = None
+    coordinator.last_update_success = False
+    sensor = ElviaBaseSensor(coordinator, MAXHOURS_CURR_1, "elvia", "MPID123")
+    last_state = State(
+        "sensor.max_hours_1",
+        "7.5",
+        {"StartTime": "s1", "EndTime": "e1", "friendly_name": "Max"},
+    )
+    with patch(
+        "homeassistant.helpers.update_coordinator.CoordinatorEntity.async_added_to_hass",
+        AsyncMock(),
+    ), patch.object(
+        sensor,
+        "async_get_last_sensor_data",
+        AsyncMock(return_value=SensorExtraStoredData(7.5, None)),
+    ), patch.object(
+        sensor, "async_get_last_state", AsyncMock(return_value=last_state)
+    ):
+        await sensor.async_added_to_hass()
+
+    assert sensor.available
+    assert sensor.native_value == 7.5
+    assert sensor.extra_state_attributes == {"StartTime": "s1", "EndTime": "e1"}
+
+    # A price change tick before the first fetch keeps the restored state.
+    coordinator.last_update_success = True
+    coordinator.data = {"energy_price": 0.4}
+    with patch.object(sensor, "async_write_ha_state"):
+        sensor._handle_coordinator_update()
+    assert sensor.native_value == 7.5
+
+    coordinator.last_slot_fetched = 1
+    coordinator.data = {"max_hours_current_1": 9.0, "max_hours_current_1_start": "s2"}
+    with patch.object(sensor, "async_write_ha_state"):
+        sensor._handle_coordinator_update()
+    assert sensor.native_value == 9.0
+    assert sensor.extra_state_attributes == {"StartTime": "s2"}
+    # Legitimately empty after a refresh: no stale restored value.
+    coordinator.data = {"energy_price": 0.4}
+    assert sensor.native_value is None
+    assert sensor.extra_state_attributes is None
+    # Never restored, nothing to show
+    assert (
+        ElviaBaseSensor(coordinator, DAILY_TARIFF, "elvia", "MPID123").native_value
+        is None
+    )
@@ -0,0 +1,86 @@
+"""Tests for the Elvia refresh scheduler."""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.api import ApiClientException
+from custom_components.elvia.clock import VirtualClock
+from custom_components.elvia.const import (
+    SOURCE_MAXHOURS,
+    SOURCE_TARIFF,
+    SOURCE_TARIFFTYPE,
+)
+from custom_components.elvia.scheduler import DEFAULT_POLICIES, RefreshScheduler
+from custom_components.elvia.timeline import TariffTimeline
+
+from .conftest import make_coordinator
+
+
+def _scheduler(now: datetime) -> RefreshScheduler:
+    scheduler = RefreshScheduler()
+    for policy in DEFAULT_POLICIES:
+        first_due = (
+            now + timedelta(days=7) if policy.name == SOURCE_TARIFFTYPE else None
+        )
+        scheduler.register(policy, first_due)
+    return scheduler
+
+
+def test_sources_have_separate_cadences():
+    now = datetime(2024, 3, 5, 14, 2, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    scheduler = _scheduler(now)
+
+    assert scheduler.due(now) == [SOURCE_TARIFF, SOURCE_MAXHOURS]
+
+    calculated = now.replace(minute=0)
+    scheduler.mark_done(SOURCE_TARIFF, now)
+    scheduler.mark_done(SOURCE_MAXHOURS, now, calculated)
+
+    assert scheduler.due(now + timedelta(minutes=30)) == []
+    # Max-hours are due shortly after Elvia's next calculation
+    assert scheduler.due(now + timedelta(hours=1, minutes=9)) == [SOURCE_MAXHOURS]
+    # Tariff prices are due again after midnight
+    tomorrow = dt_util.start_of_local_day(now.date() + timedelta(days=1))
+    assert SOURCE_TARIFF in scheduler.due(tomorrow + timedelta(minutes=1))
+    assert SOURCE_TARIFFTYPE not in scheduler.due(tomorrow + timedelta(minutes=1))
+
+
+def test_failed_source_is_retried():
+    now = datetime(2024, 3, 5, 14, 2, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    scheduler = _scheduler(now)
+
+    scheduler.mark_failed(SOURCE_TARIFF, now)
+
+    assert SOURCE_TARIFF not in scheduler.due(now + timedelta(minutes=1))
+    assert SOURCE_TARIFF in scheduler.due(now + timedelta(minutes=5))
+
+
+@pytest.mark.asyncio
+async def test_stale_timeline_refetch_respects_retry_delay():
+    now = datetime(2024, 3, 6, 0, 1, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    clock = VirtualClock(now)
+    api = SimpleNamespace(
+        _metering_point_id="MPID123",
+        meteringpoint=AsyncMock(side_effect=ApiClientException("down")),
+    )
+    coordinator = make_coordinator(api=api, clock=clock)
+    coordinator.timeline = TariffTimeline([])  # yesterday's, covers nothing now
+    for source in (SOURCE_MAXHOURS, SOURCE_TARIFFTYPE):
+        coordinator.scheduler.mark_done(source, now)
+    coordinator.scheduler.mark_done(SOURCE_TARIFF, now)
+
+    for _ in range(30):
+        try:
+            await coordinator._async_update_data()
+        except UpdateFailed:
+            pass
+        clock.advance(timedelta(minutes=1))
+
+    # Once right away, then every five minutes, not on every one-minute tick.
+    assert api.meteringpoint.await_count == 6
@@ -0,0 +1,66 @@
+"""Tests for background setup of Elvia entries."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from homeassistant.const import CONF_API_KEY
+from homeassistant.exceptions import ConfigEntryNotReady
+
+from custom_components.elvia import async_setup_entry
+from custom_components.elvia.api import ApiClientException
+from custom_components.elvia.const import CONF_METERING_POINT_ID, CONF_TOKEN
+
+from .conftest import make_coordinator
+
+
+@pytest.mark.asyncio
+async def test_initial_refreshes_share_a_concurrency_cap():
+    in_flight = 0
+    peak = 0
+
+    async def slow_refresh():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+
+    coordinators = []
+    for index in range(5):
+        coordinator = make_coordinator(metering_point_id=f"MPID{index}")
+        coordinator.async_refresh = slow_refresh
+        coordinators.append(coordinator)
+
+    semaphore = asyncio.Semaphore(2)
+    await asyncio.gather(
+        *(coordinator.async_initial_refresh(semaphore) for coordinator in coordinators)
+    )
+
+    assert peak == 2
+    for coordinator in coordinators:
+        assert coordinator.metrics.histogram("setup_ms", "initial_refresh").count == 1
+    # The last entry had to wait for a slot
+    assert (
+        coordinators[-1].metrics.histogram("setup_wait_ms", "initial_refresh").last > 5
+    )
+
+
+@pytest.mark.asyncio
+async def test_unreachable_api_during_setup_is_retried():
+    hass = MagicMock(data={})
+    entry = MagicMock(
+        entry_id="entry",
+        data={
+            CONF_API_KEY: "key",
+            CONF_METERING_POINT_ID: "MPID123",
+            CONF_TOKEN: "token",
+        },
+        options={},
+    )
+    with patch("custom_components.elvia.async_get_clientsession"), patch(
+        "custom_components.elvia.ElviaApiClient.meteringpoint",
+        AsyncMock(side_effect=ApiClientException("timeout")),
+    ), pytest.raises(ConfigEntryNotReady):
+        await async_setup_entry(hass, entry)
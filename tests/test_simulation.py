@@ -0,0 +1,47 @@
+"""Run the coordinator on a virtual clock across a DST switch."""
+
+from datetime import date, datetime, timedelta
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.clock import VirtualClock
+
+SIMULATE = Path(__file__).resolve().parent.parent / "benchmarks" / "simulate.py"
+
+
+def test_virtual_clock_fires_timers_in_order():
+    clock = VirtualClock(datetime(2025, 3, 29, tzinfo=dt_util.UTC))
+    fired = []
+    clock.track_point_in_time(None, fired.append, clock.now() + timedelta(minutes=30))
+    cancel = clock.track_point_in_time(
+        None, fired.append, clock.now() + timedelta(minutes=10)
+    )
+    clock.track_point_in_time(None, fired.append, clock.now() + timedelta(minutes=20))
+    cancel()
+
+    clock.advance(timedelta(hours=1))
+    assert [when.minute for when in fired] == [20, 30]
+    assert clock.pending_timers == 0
+
+
+@pytest.mark.asyncio
+async def test_simulation_across_dst():
+    spec = importlib.util.spec_from_file_location("simulate", SIMULATE)
+    simulate = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(simulate)
+    time_zone = dt_util.DEFAULT_TIME_ZONE
+
+    report = await simulate.async_simulate(
+        meters=2, days=3, start=date(2025, 3, 29), tick=timedelta(minutes=15)
+    )
+
+    assert dt_util.DEFAULT_TIME_ZONE is time_zone
+    assert report["errors"] == 0
+    # One tariff fetch per local day: Saturday through Tuesday
+    assert report["api_calls"]["meteringpoint"] == 2 * 4
+    assert report["events"]["elvia_price_changed"] == 2 * 2
+    assert report["pending_timers"] <= 2
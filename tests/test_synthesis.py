@@ -0,0 +1,117 @@
+"""Tests for local tariff synthesis."""
+
+from datetime import date, timedelta
+from types import SimpleNamespace as NS
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.elvia.holidays import easter_sunday, is_public_holiday
+from custom_components.elvia.synthesis import TariffPattern
+
+
+def test_norwegian_holidays():
+    assert easter_sunday(2024) == date(2024, 3, 31)
+    assert easter_sunday(2025) == date(2025, 4, 20)
+    assert is_public_holiday(date(2024, 5, 9))  # Kristi himmelfartsdag
+    assert is_public_holiday(date(2024, 5, 17))
+    assert is_public_holiday(date(2025, 4, 17))  # Skjærtorsdag
+    assert not is_public_holiday(date(2024, 5, 16))
+
+
+def _weekday_tariff(day):
+    midnight = dt_util.start_of_local_day(day)
+    hours = []
+    for hour in range(24):
+        start = midnight + timedelta(hours=hour)
+        night = hour < 6 or hour >= 22
+        hours.append(
+            NS(
+                startTime=start.isoformat(),
+                expiredAt=(start + timedelta(hours=1)).isoformat(),
+                shortName="Natt" if night else "Dag",
+                isPublicHoliday=False,
+                fixedPrice=NS(id="fixed"),
+                energyPrice=NS(id="night" if night else "day", total=0.0),
+            )
+        )
+    level = NS(
+        id="level-3",
+        hourPrices=[NS(total=0.45)],
+        levelInfo="5-10 kWh",
+        monthlyTotal=335.0,
+    )
+    price_info = NS(
+        energyPrices=[
+            NS(id="night", startDate="2024-04-01", endDate="2024-06-30", total=0.31),
+            NS(id="day", startDate="2024-04-01", endDate="2024-06-30", total=0.42),
+        ],
+        fixedPrices=[
+            NS(
+                id="fixed",
+                startDate="2024-01-01",
+                endDate="2024-12-31",
+                priceLevels=[level],
+            )
+        ],
+    )
+    return NS(
+        tariffType=NS(useWeekendPrices=True, usePublicHolidayPrices=True),
+        tariffPrice=NS(hours=hours, priceInfo=price_info),
+    )
+
+
+def _pattern():
+    with patch("custom_components.elvia.synthesis.Store") as store:
+        store.return_value.async_load = AsyncMock(return_value=None)
+        return TariffPattern(MagicMock(), "MPID123")
+
+
+def test_weekday_pattern_synthesizes_future_weekdays_only():
+    pattern = _pattern()
+    pattern.learn(_weekday_tariff(date(2024, 5, 14)), "level-3")  # a Tuesday
+
+    timeline = pattern.synthesize(date(2024, 5, 22))  # the Wednesday after
+    assert len(timeline) == 24
+    noon = dt_util.start_of_local_day(date(2024, 5, 22)) + timedelta(hours=12)
+    slot = timeline.slot_at(noon)
+    assert (slot.energy_price, slot.short_name, slot.fixed_price_hourly) == (
+        0.42,
+        "Dag",
+        0.45,
+    )
+    assert timeline.slot_at(noon - timedelta(hours=10)).energy_price == 0.31
+
+    # Next month: energy prices still valid, fixed prices need the API
+    assert pattern.synthesize(date(2024, 6, 5)).slots[0].fixed_price_hourly is None
+    # Weekends and holidays were never seen; outside the validity window is unknown
+    assert pattern.synthesize(date(2024, 5, 18)) is None
+    assert pattern.synthesize(date(2024, 5, 17)) is None
+    assert pattern.synthesize(date(2024, 7, 3)) is None
+    assert (
+        len(pattern.forecast(date(2024, 5, 13), 7)) == 4 * 24
+    )  # Mon-Thu, stops at 17 May
+
+
+def test_dst_days_are_left_to_the_api():
+    time_zone = dt_util.DEFAULT_TIME_ZONE
+    dt_util.set_default_time_zone(dt_util.get_time_zone("Europe/Oslo"))
+    try:
+        pattern = _pattern()
+        pattern.learn(_weekday_tariff(date(2024, 10, 22)), "level-3")
+        pattern._data["energy"] = {
+            key: [0, 2e9, total]
+            for key, (_, _, total) in pattern._data["energy"].items()
+        }
+
+        # Apply the weekday schedule to Sundays too, to reach the 25-hour 27 October.
+        pattern._data["use_weekend"] = False
+
+        assert pattern.synthesize(date(2024, 10, 27)) is None
+        timeline = pattern.synthesize(date(2024, 10, 28))
+        assert len(timeline) == 24
+        assert all(
+            slot.end - slot.start == timedelta(hours=1) for slot in timeline.slots
+        )
+    finally:
+        dt_util.set_default_time_zone(time_zone)